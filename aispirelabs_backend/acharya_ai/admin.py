@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Interview, Feedback, InterviewInvitation
+from .models import Interview, Feedback, InterviewInvitation, BankQuestion
 
 class InterviewAdmin(admin.ModelAdmin):
     list_display = ('id', 'title', 'role', 'type', 'level', 'user', 'created_at')
@@ -19,7 +19,14 @@ class FeedbackAdmin(admin.ModelAdmin):
     list_filter = ('total_score', 'created_at')
     readonly_fields = ('id', 'created_at')
 
+class BankQuestionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'role', 'level', 'type', 'text', 'created_at')
+    search_fields = ('text', 'role')
+    list_filter = ('level', 'type', 'created_at')
+    readonly_fields = ('id', 'text_hash', 'created_at')
+
 # Register your models here.
 admin.site.register(Interview, InterviewAdmin)
 admin.site.register(InterviewInvitation, InterviewInvitationAdmin)
-admin.site.register(Feedback, FeedbackAdmin)
\ No newline at end of file
+admin.site.register(Feedback, FeedbackAdmin)
+admin.site.register(BankQuestion, BankQuestionAdmin)
\ No newline at end of file
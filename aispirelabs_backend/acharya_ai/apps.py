@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class AcharyaAiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'acharya_ai'
+
+    def ready(self):
+        # Connect the receivers that keep the HR analytics rollups (and their caches) and the
+        # invitation token lookup cache up to date, and the one timing database queries
+        from . import rollups, company_analytics, invitations, metrics  # noqa: F401
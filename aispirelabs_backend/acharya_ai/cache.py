@@ -0,0 +1,177 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+
+class LRUCache:
+    """
+    A small thread-safe, process-local LRU cache with a per-entry TTL.
+    """
+
+    def __init__(self, max_entries=256, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            value, expires = item
+            if expires < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+def _cache_config():
+    config = {'enabled': True, 'ttl': 7 * 24 * 3600, 'memory_max_entries': 256, 'db_max_entries': 5000}
+    config.update(getattr(settings, 'AI_QUESTION_CACHE', {}))
+    return config
+
+
+_memory_cache = None
+_memory_cache_lock = threading.Lock()
+
+
+def _get_memory_cache():
+    global _memory_cache
+    if _memory_cache is None:
+        with _memory_cache_lock:
+            if _memory_cache is None:
+                config = _cache_config()
+                _memory_cache = LRUCache(max_entries=config['memory_max_entries'], ttl=config['ttl'])
+    return _memory_cache
+
+
+def normalize_tag(value):
+    return ' '.join(str(value).split()).casefold()
+
+
+def question_fingerprint(role, level, techstack, type, max_questions, model):
+    """
+    Stable hash of the inputs that determine a generated question set.
+
+    Case, surrounding whitespace and techstack order/duplicates don't change the
+    fingerprint, so equivalent interview configurations share one cache entry.
+    """
+    payload = {
+        'role': normalize_tag(role),
+        'level': normalize_tag(level),
+        'type': normalize_tag(type),
+        'techstack': sorted({normalize_tag(tech) for tech in techstack or []}),
+        'max_questions': int(max_questions),
+        'model': model,
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def get_cached_questions(fingerprint):
+    """
+    Look up a question set in the process-local tier, then the database tier.
+    Returns a fresh list, or None on a miss or when caching is disabled.
+    """
+    if not _cache_config()['enabled']:
+        return None
+
+    memory = _get_memory_cache()
+    questions = memory.get(fingerprint)
+    if questions is not None:
+        return list(questions)
+
+    from .models import QuestionCacheEntry
+
+    now = timezone.now()
+    entry = QuestionCacheEntry.objects.filter(
+        fingerprint=fingerprint, expires_at__gt=now
+    ).values('questions', 'expires_at').first()
+    if entry is None:
+        return None
+
+    QuestionCacheEntry.objects.filter(fingerprint=fingerprint).update(
+        hits=F('hits') + 1, last_used_at=now
+    )
+    remaining = (entry['expires_at'] - now).total_seconds()
+    memory.set(fingerprint, tuple(entry['questions']), ttl=remaining)
+    return list(entry['questions'])
+
+
+def store_questions(fingerprint, questions, model):
+    """
+    Save a generated question set in both tiers and evict expired/excess rows.
+    """
+    config = _cache_config()
+    if not config['enabled']:
+        return
+
+    from .models import QuestionCacheEntry
+
+    now = timezone.now()
+    QuestionCacheEntry.objects.update_or_create(
+        fingerprint=fingerprint,
+        defaults={
+            'model_name': model,
+            'questions': list(questions),
+            'last_used_at': now,
+            'expires_at': now + timedelta(seconds=config['ttl']),
+        }
+    )
+    _get_memory_cache().set(fingerprint, tuple(questions))
+    prune_question_cache(now=now)
+
+
+def prune_question_cache(now=None):
+    """
+    Delete expired entries and, beyond db_max_entries, the least recently used ones.
+    """
+    from .models import QuestionCacheEntry
+
+    config = _cache_config()
+    now = now or timezone.now()
+    QuestionCacheEntry.objects.filter(expires_at__lte=now).delete()
+
+    stale = QuestionCacheEntry.objects.order_by('-last_used_at').values_list(
+        'fingerprint', flat=True
+    )[config['db_max_entries']:]
+    stale = list(stale)
+    if stale:
+        QuestionCacheEntry.objects.filter(fingerprint__in=stale).delete()
+
+
+def clear_question_cache():
+    _get_memory_cache().clear()
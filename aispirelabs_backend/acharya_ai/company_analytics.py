@@ -0,0 +1,139 @@
+import hashlib
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+from django.db.models.signals import post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from users.models import User
+from .models import HRDailyRollup, HRRoleRollup
+from .rollups import ROLLUP_COUNTERS, SCORE_BUCKETS
+
+GENERATION_KEY = 'company-analytics:generation'
+# user id -> company, so invalidating on every rollup write doesn't cost a query each time.
+# Kept in the shared cache so a recruiter changing company is seen by every process.
+USER_COMPANY_KEY = 'company-analytics:user-company:{}'
+USER_COMPANY_SECONDS = 3600
+
+
+def _config():
+    config = {'cache_seconds': 300, 'chunk_size': 200, 'popular_roles': 10}
+    config.update(getattr(settings, 'AI_COMPANY_ANALYTICS', {}))
+    return config
+
+
+def company_cache_key(company):
+    generation = cache.get_or_set(GENERATION_KEY, 1, timeout=None)
+    digest = hashlib.sha256(company.encode('utf-8')).hexdigest()[:32]
+    return f'company-analytics:{generation}:{digest}'
+
+
+def company_recruiters(company):
+    return list(User.objects.filter(company=company, user_type='hr').values_list('id', flat=True))
+
+
+def compute_company_analytics(company):
+    """
+    Sum the HR rollups of every recruiter in `company`.
+
+    Recruiters are aggregated in chunks of `chunk_size` ids, so each query is a
+    bounded IN lookup on the (user, day) rollup index. The work grows with
+    recruiters x active days, never with the number of feedbacks.
+    """
+    config = _config()
+    recruiters = company_recruiters(company)
+    totals = dict.fromkeys(ROLLUP_COUNTERS, 0)
+    roles = Counter()
+
+    for start in range(0, len(recruiters), config['chunk_size']):
+        chunk = recruiters[start:start + config['chunk_size']]
+        sums = HRDailyRollup.objects.filter(user_id__in=chunk).aggregate(
+            **{name: Sum(name) for name in ROLLUP_COUNTERS}
+        )
+        for name in ROLLUP_COUNTERS:
+            totals[name] += sums[name] or 0
+        for row in HRRoleRollup.objects.filter(user_id__in=chunk, interviews__gt=0).values('role').annotate(
+            count=Sum('interviews')
+        ).order_by():
+            roles[row['role']] += row['count']
+
+    completion_rate = (
+        totals['invitations_completed'] / totals['invitations_sent'] * 100 if totals['invitations_sent'] else 0
+    )
+    average_score = totals['score_sum'] / totals['score_count'] if totals['score_count'] else 0
+
+    return {
+        'company': company,
+        'recruiters': len(recruiters),
+        'total_interviews': totals['interviews_created'],
+        'total_candidates': totals['invitations_sent'],
+        'completed_interviews': totals['invitations_completed'],
+        'completion_rate': round(completion_rate, 2),
+        'total_feedbacks': totals['feedbacks'],
+        'average_score': round(average_score, 2),
+        'score_distribution': [
+            {'range': f'{low}-{high}', 'count': totals[field]} for field, low, high in SCORE_BUCKETS
+        ],
+        'popular_roles': [
+            {'role': role, 'count': count} for role, count in roles.most_common(config['popular_roles'])
+        ],
+        'generated_at': timezone.now(),
+    }
+
+
+def get_company_analytics(company):
+    """
+    Cached company analytics. Returns (data, served_from_cache).
+    """
+    key = company_cache_key(company)
+    data = cache.get(key)
+    if data is not None:
+        return data, True
+    data = compute_company_analytics(company)
+    cache.set(key, data, timeout=_config()['cache_seconds'])
+    return data, False
+
+
+def invalidate_company(company):
+    if company:
+        cache.delete(company_cache_key(company))
+
+
+def invalidate_company_for_user(user_id):
+    if user_id is None:
+        return
+    key = USER_COMPANY_KEY.format(user_id)
+    company = cache.get(key)
+    if company is None:
+        company = User.objects.filter(id=user_id).values_list('company', flat=True).first() or ''
+        cache.set(key, company, timeout=USER_COMPANY_SECONDS)
+    invalidate_company(company)
+
+
+def invalidate_all_companies():
+    """
+    Drop every cached company result at once by moving to a new key generation.
+    """
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 2, timeout=None)
+
+
+@receiver(post_init, sender=User)
+def remember_user_company(sender, instance, **kwargs):
+    # Read from __dict__ so a deferred company field isn't fetched just to be remembered
+    instance._analytics_company = instance.__dict__.get('company')
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, **kwargs):
+    # A recruiter joining (or leaving) a company changes the totals of both companies
+    previous = getattr(instance, '_analytics_company', None)
+    cache.delete(USER_COMPANY_KEY.format(instance.id))
+    invalidate_company(previous)
+    invalidate_company(instance.company)
+    instance._analytics_company = instance.company
@@ -0,0 +1,104 @@
+import hashlib
+from functools import wraps
+
+from django.db.models import Count, Max, Q
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils import timezone
+from django.utils.http import http_date, quote_etag
+
+from .invitations import EXPIRABLE_STATUSES
+from .models import Interview
+
+
+def conditional(validator):
+    """
+    ETag / Last-Modified support for an APIView get() method.
+
+    `validator(request, *args, **kwargs)` runs one cheap aggregate query and
+    returns a dict of the values the response depends on (they must include
+    'last_modified', a datetime or None), or None to skip validation, e.g.
+    when the view is going to answer 403/404 anyway. Requests whose
+    If-None-Match / If-Modified-Since still match get a 304 without the view
+    running at all.
+
+    The ETag also covers row counts, so deletions change it; Last-Modified
+    can't see a deleted row, which is why clients should prefer the ETag.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            state = validator(request, *args, **kwargs)
+            if state is None:
+                return method(view, request, *args, **kwargs)
+
+            modified = state.get('last_modified')
+            last_modified = int(modified.timestamp()) if modified else None
+            etag = make_etag(request, state)
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = method(view, request, *args, **kwargs)
+                if response.status_code == 200:
+                    response['ETag'] = etag
+                    if last_modified is not None:
+                        response['Last-Modified'] = http_date(last_modified)
+            # Per-user data: caches may keep it, but must revalidate every time
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ['Authorization'])
+            return response
+        return wrapper
+    return decorator
+
+
+def make_etag(request, state):
+    """
+    Hash the validator values together with the user and the query string
+    (page cursor, ?fields=), which all change the representation.
+    """
+    parts = [str(request.user.pk), request.get_full_path()]
+    parts.extend(f"{key}={state[key]!r}" for key in sorted(state))
+    return quote_etag(hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()[:32])
+
+
+def latest(*values):
+    values = [value for value in values if value is not None]
+    return max(values) if values else None
+
+
+def interview_detail_validator(request, pk):
+    state = Interview.objects.filter(user=request.user, id=pk).aggregate(
+        updated=Max('updated_at'),
+        feedback_count=Count('feedbacks'),
+        feedback_created=Max('feedbacks__created_at'),
+        feedback_completed=Max('feedbacks__completed_at'),
+    )
+    if state['updated'] is None:
+        return None
+    state['last_modified'] = latest(state['updated'], state['feedback_created'], state['feedback_completed'])
+    return state
+
+
+def hr_interviews_validator(request):
+    if request.user.user_type != 'hr':
+        return None
+    state = Interview.objects.filter(user=request.user).aggregate(
+        updated=Max('updated_at'), interview_count=Count('id')
+    )
+    state['last_modified'] = state['updated']
+    return state
+
+
+def invitations_validator(request, interview_id):
+    state = Interview.objects.filter(user=request.user, id=interview_id).aggregate(
+        updated=Max('updated_at'),
+        invitation_count=Count('invitations'),
+        invitation_updated=Max('invitations__updated_at'),
+        # Lapsed invitations read as expired before the sweeper touches them, so they count too
+        invitation_lapsed=Count('invitations', filter=Q(
+            invitations__status__in=EXPIRABLE_STATUSES, invitations__expires_at__lte=timezone.now()
+        )),
+    )
+    if state['updated'] is None:
+        return None
+    state['last_modified'] = latest(state['updated'], state['invitation_updated'])
+    return state
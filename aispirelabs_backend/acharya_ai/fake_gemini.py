@@ -0,0 +1,275 @@
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+QUESTION_COUNT = re.compile(r"Generate (\d+) interview questions")
+MODEL_PATH = re.compile(r"^/v1beta/models/(?P<model>[^:/]+):(?P<method>generateContent|streamGenerateContent)$")
+
+SAMPLE_QUESTIONS = [
+    "Can you walk me through a recent project you are proud of?",
+    "How would you design a service that has to handle a sudden spike in traffic?",
+    "Tell me about a time you disagreed with a teammate and how you resolved it.",
+    "How do you decide what to test and what not to test?",
+    "What happens between typing a URL in the browser and the page rendering?",
+    "How would you find the cause of a slow database query in production?",
+    "Describe how you would explain a technical trade off to a non technical stakeholder.",
+    "What is the difference between a process and a thread?",
+    "How do you keep your skills up to date?",
+    "Tell me about a bug that took you a long time to find.",
+]
+SAMPLE_SENTENCES = [
+    "The candidate gave clear and structured answers.",
+    "Some answers lacked concrete examples.",
+    "Shows solid fundamentals for the role.",
+    "Would benefit from more depth on system design.",
+    "Communicated trade offs well.",
+]
+
+
+class FaultProfile:
+    """
+    Latency and failure settings for the fake server.
+
+    latency is one of 'fixed', 'uniform', 'normal' or 'lognormal'; latency_ms is
+    the mean (or the fixed value) and jitter_ms the spread. error_rate and
+    rate_limit_rate are the probabilities of answering a call with a 503 or a
+    429 instead of a result.
+    """
+
+    def __init__(self, latency='fixed', latency_ms=0, jitter_ms=0, error_rate=0.0,
+                 rate_limit_rate=0.0, stream_chunks=4, seed=None):
+        self.latency = latency
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.stream_chunks = max(1, stream_chunks)
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self):
+        """
+        Draw one response delay in seconds.
+        """
+        with self._lock:
+            if self.latency == 'uniform':
+                ms = self.random.uniform(self.latency_ms - self.jitter_ms, self.latency_ms + self.jitter_ms)
+            elif self.latency == 'normal':
+                ms = self.random.gauss(self.latency_ms, self.jitter_ms)
+            elif self.latency == 'lognormal' and self.latency_ms > 0:
+                # Parameterised so the distribution's mean and stddev match latency_ms / jitter_ms
+                variance = (self.jitter_ms / self.latency_ms) ** 2
+                sigma = math.sqrt(math.log1p(variance))
+                mu = math.log(self.latency_ms) - sigma ** 2 / 2
+                ms = self.random.lognormvariate(mu, sigma)
+            else:
+                ms = self.latency_ms
+        return max(0.0, ms) / 1000
+
+    def outcome(self):
+        """
+        Return 'rate_limited', 'error' or 'ok' for the next call.
+        """
+        with self._lock:
+            roll = self.random.random()
+        if roll < self.rate_limit_rate:
+            return 'rate_limited'
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 'error'
+        return 'ok'
+
+
+def prompt_text(body):
+    return "\n".join(
+        part.get('text', '')
+        for content in body.get('contents', [])
+        for part in content.get('parts', [])
+    )
+
+
+def fake_value(schema, prompt, rng, name=''):
+    """
+    Build a value that validates against a Gemini responseSchema (OpenAPI subset).
+    """
+    kind = str(schema.get('type', 'STRING')).upper()
+    if schema.get('enum'):
+        return rng.choice(schema['enum'])
+    if kind == 'OBJECT':
+        return {
+            key: fake_value(child, prompt, rng, name=key)
+            for key, child in schema.get('properties', {}).items()
+        }
+    if kind == 'ARRAY':
+        items = schema.get('items', {})
+        count = rng.randint(2, 4)
+        if name == 'questions':
+            match = QUESTION_COUNT.search(prompt)
+            count = int(match.group(1)) if match else 5
+            return [SAMPLE_QUESTIONS[i % len(SAMPLE_QUESTIONS)] for i in range(count)]
+        if name == 'categoryScores':
+            count = 5
+        return [fake_value(items, prompt, rng, name=name) for _ in range(count)]
+    if kind == 'INTEGER':
+        return rng.randint(40, 95)
+    if kind == 'NUMBER':
+        return round(rng.uniform(0, 1), 3)
+    if kind == 'BOOLEAN':
+        return rng.random() < 0.5
+    return rng.choice(SAMPLE_SENTENCES)
+
+
+def fake_response_text(body, rng):
+    """
+    JSON text for structured (responseSchema) calls, plain prose otherwise.
+    """
+    config = body.get('generationConfig', {})
+    schema = config.get('responseSchema')
+    if schema:
+        return json.dumps(fake_value(schema, prompt_text(body), rng))
+    return " ".join(rng.sample(SAMPLE_SENTENCES, 3))
+
+
+def response_payload(text, prompt, finished=True):
+    payload = {
+        'candidates': [{
+            'content': {'role': 'model', 'parts': [{'text': text}]},
+            'index': 0,
+        }],
+        'usageMetadata': {
+            'promptTokenCount': max(1, len(prompt) // 4),
+            'candidatesTokenCount': max(1, len(text) // 4),
+            'totalTokenCount': max(1, len(prompt) // 4) + max(1, len(text) // 4),
+        },
+    }
+    if finished:
+        payload['candidates'][0]['finishReason'] = 'STOP'
+    return payload
+
+
+class FakeGeminiHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_status(self, status, code, message, headers=None):
+        self.send_json(status, {'error': {'code': status, 'message': message, 'status': code}}, headers)
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/stats':
+            return self.send_json(200, self.server.snapshot())
+        self.send_error_status(404, 'NOT_FOUND', f'Unknown path {self.path}')
+
+    def do_POST(self):
+        match = MODEL_PATH.match(self.path.split('?', 1)[0])
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        if not match:
+            return self.send_error_status(404, 'NOT_FOUND', f'Unknown path {self.path}')
+        try:
+            body = json.loads(raw or b'{}')
+        except ValueError:
+            return self.send_error_status(400, 'INVALID_ARGUMENT', 'Request body is not valid JSON')
+
+        profile = self.server.profile
+        time.sleep(profile.delay())
+
+        outcome = profile.outcome()
+        self.server.count(outcome)
+        if outcome == 'rate_limited':
+            return self.send_error_status(
+                429, 'RESOURCE_EXHAUSTED', 'Fake quota exceeded', headers={'Retry-After': '1'}
+            )
+        if outcome == 'error':
+            return self.send_error_status(503, 'UNAVAILABLE', 'Fake upstream failure')
+
+        with self.server.rng_lock:
+            text = fake_response_text(body, self.server.rng)
+        prompt = prompt_text(body)
+        if match.group('method') == 'generateContent':
+            return self.send_json(200, response_payload(text, prompt))
+        self.stream(text, prompt)
+
+    def stream(self, text, prompt):
+        """
+        Answer streamGenerateContent as server-sent events, splitting the text into chunks.
+        """
+        chunks = self.server.profile.stream_chunks
+        size = max(1, -(-len(text) // chunks))
+        pieces = [text[i:i + size] for i in range(0, len(text), size)] or ['']
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        for index, piece in enumerate(pieces):
+            if index:
+                time.sleep(self.server.profile.delay() / len(pieces))
+            payload = response_payload(piece, prompt, finished=index == len(pieces) - 1)
+            self.wfile.write(f"data: {json.dumps(payload)}\r\n\r\n".encode('utf-8'))
+            self.wfile.flush()
+
+
+class FakeGeminiServer(ThreadingHTTPServer):
+    """
+    A local stand-in for the Gemini generateContent / streamGenerateContent REST
+    endpoints. Point GEMINI_BASE_URL at it (any GEMINI_API_KEY works) to exercise
+    the AI views without using real quota. GET /stats returns call counters.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', 0), profile=None, seed=None, verbose=False):
+        super().__init__(address, FakeGeminiHandler)
+        self.profile = profile or FaultProfile(seed=seed)
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.verbose = verbose
+        self._counts = {'ok': 0, 'error': 0, 'rate_limited': 0}
+        self._counts_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, outcome):
+        with self._counts_lock:
+            self._counts[outcome] += 1
+
+    def snapshot(self):
+        with self._counts_lock:
+            counts = dict(self._counts)
+        counts['total'] = sum(counts.values())
+        return counts
+
+    def start(self):
+        """
+        Serve from a background thread (for tests and scripted benchmarks).
+        """
+        self._thread = threading.Thread(target=self.serve_forever, name='fake-gemini', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join()
@@ -0,0 +1,100 @@
+from rest_framework.exceptions import ValidationError
+
+
+class Fieldset:
+    """
+    The response fields chosen with ?fields= and ?expand=.
+
+    `fields` keeps the endpoint's own field order. `nested` maps each selected
+    nested collection (e.g. an interview's 'feedbacks') to its chosen fields.
+    """
+
+    def __init__(self, fields, nested):
+        self.fields = tuple(fields)
+        self.nested = nested
+
+    def __contains__(self, name):
+        return name in self.fields
+
+    def without(self, *names):
+        return tuple(name for name in self.fields if name not in names)
+
+
+def _split(value):
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+def parse_fieldset(request, available, nested=None, always=('id',)):
+    """
+    Read ?fields=a,b,feedbacks.total_score and ?expand=c from the request.
+
+    Without ?fields= every available field is returned (heavy JSON columns
+    included), as before. ?fields= narrows the response to the listed fields
+    (plus `always`). ?expand= adds fields (typically the heavy JSON ones) on
+    top of a ?fields= selection; on its own it is only validated, since every
+    field is already returned. Nested collections accept "name" for all of
+    their fields or "name.field" for some of them. Unknown names are a 400.
+    """
+    nested = nested or {}
+    requested = _split(request.query_params.get('fields'))
+    expand = _split(request.query_params.get('expand'))
+    if not requested and not expand:
+        return Fieldset(list(available) + list(nested), {name: tuple(fields) for name, fields in nested.items()})
+
+    chosen = set(always)
+    chosen_nested = {}
+    unknown = []
+    for name in (requested or list(available) + list(nested)) + expand:
+        parent, _, child = name.partition('.')
+        if child and parent in nested and child in nested[parent]:
+            chosen.add(parent)
+            chosen_nested.setdefault(parent, set()).update(('id', child))
+        elif not child and name in nested:
+            chosen.add(name)
+            chosen_nested[name] = set(nested[name])
+        elif not child and name in available:
+            chosen.add(name)
+        else:
+            unknown.append(name)
+    if unknown:
+        raise ValidationError({'fields': [f"Unknown field(s): {', '.join(unknown)}"]})
+
+    fields = [name for name in list(available) + list(nested) if name in chosen]
+    return Fieldset(fields, {
+        name: tuple(field for field in nested[name] if field in selected)
+        for name, selected in chosen_nested.items()
+    })
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin: pass fields=[...] to drop every other declared field.
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+def serializer_fieldset(request, serializer_class):
+    """
+    parse_fieldset over the readable fields of a SparseFieldsetMixin serializer.
+    """
+    available = [name for name, field in serializer_class().fields.items() if not field.write_only]
+    return parse_fieldset(request, available)
+
+
+def only_columns(serializer_class, fieldset, always=('id', 'created_at')):
+    """
+    Model fields needed to render `fieldset` with `serializer_class`, for QuerySet.only().
+    Related attributes ("interview.title") become lookups ("interview__title").
+    """
+    serializer = serializer_class(fields=fieldset.fields)
+    columns = set(always)
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*':
+            continue
+        columns.add(field.source.replace('.', '__'))
+    return sorted(columns)
@@ -1,10 +1,17 @@
+import json
 import random
 import os
-import google.generativeai as genai
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import zip_longest
 from django.conf import settings
-from google import genai
 from pydantic import BaseModel
 from dotenv import load_dotenv
+from .cache import question_fingerprint, get_cached_questions, store_questions
+from .question_bank import bank_enabled, draw_questions, add_questions
+from .integrations import get_gemini
+from .metrics import AI_QUESTIONS_SERVED, record_fallback, record_usage, track_ai_call
+from .transcript import chunk_transcript, compact_transcript, transcript_tokens
 
 load_dotenv()
 
@@ -23,16 +30,6 @@ class FeedbackResponse(BaseModel):
     areasForImprovement: list[str]
     finalAssessment: str
 
-# Configure the Gemini API key
-try:
-    if os.getenv('GEMINI_API_KEY'):
-        client = genai.Client(api_key=os.getenv('GEMINI_API_KEY'))
-    else:
-        print("WARN: GEMINI_API_KEY not found in settings or environment variables.")
-except Exception as e:
-    print(f"Error configuring Gemini: {e}")
-
-
 def get_random_interview_cover():
     covers = [
         "/covers/adobe.png", "/covers/amazon.png", "/covers/apple.png",
@@ -41,15 +38,84 @@ def get_random_interview_cover():
     ]
     return random.choice(covers) if covers else "/covers/default.png"
 
-def generate_interview_questions_ai(role, level, techstack, type, max_questions):
+def get_gemini_model():
+    return os.getenv('GEMINI_MODEL', 'gemini-1.5-flash')
+
+
+def fallback_questions(role, type, techstack):
+    """
+    Generic questions served when Gemini can't generate any.
+    """
+    return [
+        f"Tell me about your experience with {role} roles.",
+        f"How would you approach a challenging {type} problem?",
+        f"What interests you most about working with {', '.join(techstack[:2])}?",
+        "Describe a project you're particularly proud of.",
+        "How do you stay updated with the latest technologies?"
+    ]
+
+
+def generate_interview_questions_ai(role, level, techstack, type, max_questions, use_cache=True):
     """
     Generate interview questions using Gemini AI based on role, level, tech stack, and type.
+
+    Questions are drawn at random from the question bank first and Gemini is only
+    asked for the shortfall; new questions are added back to the bank. When the
+    bank has nothing, whole sets are cached by a fingerprint of the inputs and
+    model. Pass use_cache=False to skip both and force a fresh generation.
+    Fallback questions are never stored.
     """
-    print(f"AI: Generating questions for role={role}, level={level}, techstack={techstack}, type={type}, max_questions={max_questions}")
+    model = get_gemini_model()
+    max_questions = int(max_questions)
+    fingerprint = question_fingerprint(role, level, techstack, type, max_questions, model)
+    use_bank = bank_enabled()
+
+    banked = []
+    if use_cache:
+        if use_bank:
+            banked = draw_questions(role, level, type, techstack, max_questions)
+            if len(banked) >= max_questions:
+                print(f"AI: Served {len(banked)} questions from the bank for role={role}, level={level}, type={type}")
+                AI_QUESTIONS_SERVED.inc(len(banked), source='bank')
+                return banked
+        if not banked:
+            cached = get_cached_questions(fingerprint)
+            if cached is not None:
+                print(f"AI: Question cache hit for role={role}, level={level}, type={type}")
+                AI_QUESTIONS_SERVED.inc(len(cached), source='cache')
+                return cached
+
+    shortfall = max_questions - len(banked)
+    print(f"AI: Generating {shortfall} questions for role={role}, level={level}, techstack={techstack}, type={type}, max_questions={max_questions}")
 
     try:
-        model = os.getenv('GEMINI_MODEL', 'gemini-1.5-flash')
-        prompt = f"""Generate {max_questions} interview questions for a {level} level {role} position.
+        # The model doesn't always stop at the number asked for
+        questions = request_interview_questions(model, role, level, techstack, type, shortfall, avoid=banked)[:shortfall]
+    except Exception as e:
+        print(f"Error during Gemini AI call for questions: {e}")
+        record_fallback('questions', model, e)
+        questions = (banked + fallback_questions(role, type, techstack))[:max_questions]
+        AI_QUESTIONS_SERVED.inc(len(banked), source='bank')
+        AI_QUESTIONS_SERVED.inc(len(questions) - len(banked), source='fallback')
+        return questions
+
+    try:
+        if use_bank:
+            add_questions(role, level, type, techstack, questions, model)
+        if not banked:
+            store_questions(fingerprint, questions, model)
+    except Exception as e:
+        print(f"WARN: Could not store generated questions: {e}")
+    AI_QUESTIONS_SERVED.inc(len(banked), source='bank')
+    AI_QUESTIONS_SERVED.inc(len(questions), source='model')
+    return banked + questions
+
+
+def request_interview_questions(model, role, level, techstack, type, max_questions, avoid=()):
+    """
+    Ask Gemini for a question list. Raises on any API or parsing error.
+    """
+    prompt = f"""Generate {max_questions} interview questions for a {level} level {role} position.
 
 Job Details:
 - Role: {role}
@@ -66,8 +132,11 @@ Requirements:
 6. Return exactly {max_questions} questions
 
 Return the questions as a JSON array of strings."""
+    if avoid:
+        prompt += "\n\nDo not repeat or closely paraphrase these existing questions:\n" + "\n".join(f"- {q}" for q in avoid)
 
-        response = client.models.generate_content(
+    with track_ai_call('questions', model):
+        response = get_gemini().generate_content(
             model=model, 
             contents=prompt, 
             config={
@@ -75,56 +144,78 @@ Return the questions as a JSON array of strings."""
                 "response_schema": InterviewQuestion
             }
         )
-        
-        import json
+        record_usage('questions', model, response)
+
         questions = json.loads(response.text)
         return questions['questions']
-        
-    except Exception as e:
-        print(f"Error during Gemini AI call for questions: {e}")
-        # Return fallback questions
-        fallback_questions = [
-            f"Tell me about your experience with {role} roles.",
-            f"How would you approach a challenging {type} problem?",
-            f"What interests you most about working with {', '.join(techstack[:2])}?",
-            "Describe a project you're particularly proud of.",
-            "How do you stay updated with the latest technologies?"
-        ]
-        return fallback_questions[:int(max_questions)]
 
 
-def generate_feedback_ai(transcript, interview_role="N/A"):
+FEEDBACK_REQUIRED_FIELDS = ["totalScore", "categoryScores", "strengths", "areasForImprovement", "finalAssessment"]
+
+
+def empty_transcript_feedback():
+    return {
+        "totalScore": 0,
+        "categoryScores": [
+            {"name": "Communication Skills", "score": 0, "comment": "No transcript available for evaluation."},
+            {"name": "Technical Knowledge", "score": 0, "comment": "No transcript available for evaluation."},
+            {"name": "Problem-Solving", "score": 0, "comment": "No transcript available for evaluation."},
+            {"name": "Cultural & Role Fit", "score": 0, "comment": "No transcript available for evaluation."},
+            {"name": "Confidence & Clarity", "score": 0, "comment": "No transcript available for evaluation."}
+        ],
+        "strengths": ["Unable to evaluate due to missing transcript"],
+        "areasForImprovement": ["Complete the interview to receive feedback"],
+        "finalAssessment": "No interview data available for assessment.",
+    }
+
+
+def fallback_feedback(error):
     """
-    Generate comprehensive interview feedback using Gemini AI based on the interview transcript.
+    Basic feedback structure returned when the AI evaluation fails. It is flagged
+    with "fallback" so it is stored as failed rather than as a real score.
     """
-    print(f"AI: Generating feedback for interview role: {interview_role}")
+    return {
+        "fallback": True,
+        "totalScore": 50,
+        "categoryScores": [
+            {"name": "Communication Skills", "score": 50, "comment": "Unable to fully evaluate due to processing error."},
+            {"name": "Technical Knowledge", "score": 50, "comment": "Unable to fully evaluate due to processing error."},
+            {"name": "Problem-Solving", "score": 50, "comment": "Unable to fully evaluate due to processing error."},
+            {"name": "Cultural & Role Fit", "score": 50, "comment": "Unable to fully evaluate due to processing error."},
+            {"name": "Confidence & Clarity", "score": 50, "comment": "Unable to fully evaluate due to processing error."}
+        ],
+        "strengths": ["Participated in the interview process"],
+        "areasForImprovement": ["Technical evaluation could not be completed due to system error"],
+        "finalAssessment": f"The interview evaluation encountered a technical issue. Please contact support for manual review. Error: {str(error)[:100]}",
+    }
 
-    if not transcript or len(transcript) == 0:
-        return {
-            "totalScore": 0,
-            "categoryScores": [
-                {"name": "Communication Skills", "score": 0, "comment": "No transcript available for evaluation."},
-                {"name": "Technical Knowledge", "score": 0, "comment": "No transcript available for evaluation."},
-                {"name": "Problem-Solving", "score": 0, "comment": "No transcript available for evaluation."},
-                {"name": "Cultural & Role Fit", "score": 0, "comment": "No transcript available for evaluation."},
-                {"name": "Confidence & Clarity", "score": 0, "comment": "No transcript available for evaluation."}
-            ],
-            "strengths": ["Unable to evaluate due to missing transcript"],
-            "areasForImprovement": ["Complete the interview to receive feedback"],
-            "finalAssessment": "No interview data available for assessment.",
-        }
 
+def validate_feedback(feedback_data):
+    if not isinstance(feedback_data, dict) or not all(k in feedback_data for k in FEEDBACK_REQUIRED_FIELDS):
+        raise ValueError("AI response missing required fields.")
+    return feedback_data
+
+
+def build_feedback_prompt(transcript, interview_role="N/A", part=None):
+    """
+    Build the scoring prompt. `part` is an optional (index, total) pair used when
+    one segment of a long interview is scored on its own.
+    """
     # Format transcript for analysis
     formatted_transcript = "\n".join([
         f"{'Interviewer' if item['role'] == 'interviewer' else 'Candidate'}: {item['content']}" 
         for item in transcript
     ])
 
-    try:
-        model = os.getenv('GEMINI_MODEL', 'gemini-1.5-flash')
-        
-        prompt = f"""You are an expert interview evaluator analyzing a job interview for the role of {interview_role}.
+    scope = ""
+    if part:
+        scope = f"""
+NOTE: This is part {part[0]} of {part[1]} of a longer interview. Evaluate only the evidence in this part
+and do not penalize the candidate for topics that may be covered in other parts.
+"""
 
+    prompt = f"""You are an expert interview evaluator analyzing a job interview for the role of {interview_role}.
+{scope}
 Please analyze the following interview transcript and provide comprehensive feedback:
 
 INTERVIEW TRANSCRIPT:
@@ -171,40 +262,164 @@ FEEDBACK REQUIREMENTS:
 - Base scores on actual performance demonstrated in the transcript
 
 Return your evaluation as a JSON object with the exact structure specified."""
+    return prompt
+
+
+def generate_feedback_ai(transcript, interview_role="N/A"):
+    """
+    Generate comprehensive interview feedback using Gemini AI based on the interview transcript.
+    """
+    print(f"AI: Generating feedback for interview role: {interview_role}")
+
+    budget = getattr(settings, 'AI_FEEDBACK_TOKEN_BUDGET', 12000)
+    turns = compact_transcript(transcript, budget)
+    if not turns:
+        return empty_transcript_feedback()
 
-        response = client.models.generate_content(
+    try:
+        if transcript_tokens(turns) > budget:
+            return generate_feedback_map_reduce(turns, interview_role, budget)
+
+        return score_transcript(turns, interview_role)
+        
+    except Exception as e:
+        print(f"Error during Gemini AI call for feedback: {e}")
+        record_fallback('feedback', get_gemini_model(), e)
+        
+        # Return a basic feedback structure with error handling
+        return fallback_feedback(e)
+
+
+_scoring_slots = None
+_scoring_slots_lock = threading.Lock()
+
+
+def scoring_slots():
+    """
+    The process-wide semaphore bounding concurrent Gemini scoring calls, sized by
+    AI_FEEDBACK_SCORING_CONCURRENCY. Whole transcripts and map chunks share it,
+    whether they are scored from the feedback pool, a request or an SSE stream.
+    """
+    global _scoring_slots
+    size = getattr(settings, 'AI_FEEDBACK_SCORING_CONCURRENCY', 4)
+    with _scoring_slots_lock:
+        if _scoring_slots is None or _scoring_slots[0] != size:
+            _scoring_slots = (size, threading.BoundedSemaphore(size))
+        return _scoring_slots[1]
+
+
+def score_transcript(turns, interview_role, part=None):
+    """
+    Score (part of) a transcript with one Gemini call. Raises on any error.
+    """
+    model = get_gemini_model()
+    operation = 'feedback_chunk' if part else 'feedback'
+    with scoring_slots(), track_ai_call(operation, model):
+        response = get_gemini().generate_content(
             model=model, 
-            contents=prompt, 
+            contents=build_feedback_prompt(turns, interview_role, part=part), 
             config={
                 "response_mime_type": "application/json",
                 "response_schema": FeedbackResponse
             }
         )
-        
-        import json
-        feedback_data = json.loads(response.text)
+        record_usage(operation, model, response)
         
         # Validate required fields
-        required_fields = ["totalScore", "categoryScores", "strengths", "areasForImprovement", "finalAssessment"]
-        if not all(k in feedback_data for k in required_fields):
-            raise ValueError("AI response missing required fields.")
-            
-        return feedback_data
-        
+        return validate_feedback(json.loads(response.text))
+
+
+def generate_feedback_map_reduce(turns, interview_role, budget):
+    """
+    Score a transcript that exceeds the token budget.
+
+    The transcript is packed into question/answer chunks within the budget.
+    Chunks are scored in parallel (up to AI_FEEDBACK_MAP_CONCURRENCY per
+    transcript, and within the process-wide scoring_slots()), and the results are merged into one FeedbackResponse-shaped dict, weighted by
+    chunk size.
+    """
+    chunks = chunk_transcript(turns, budget)
+    print(f"AI: Transcript of ~{transcript_tokens(turns)} tokens split into {len(chunks)} scoring chunks")
+
+    def score(index):
+        try:
+            return score_transcript(chunks[index], interview_role, part=(index + 1, len(chunks)))
+        except Exception as e:
+            print(f"Error scoring feedback chunk {index + 1}/{len(chunks)}: {e}")
+            record_fallback('feedback_chunk', get_gemini_model(), e)
+            return None
+
+    max_workers = max(1, min(getattr(settings, 'AI_FEEDBACK_MAP_CONCURRENCY', 4), len(chunks)))
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ai-feedback-map') as executor:
+        results = list(executor.map(score, range(len(chunks))))
+
+    scored = [(result, transcript_tokens(chunk)) for result, chunk in zip(results, chunks) if result]
+    if not scored:
+        raise ValueError("All transcript chunks failed to score.")
+    return merge_feedback(scored, interview_role)
+
+
+def _interleave_unique(lists, limit):
+    """
+    Round-robin over the lists so every chunk is represented, dropping duplicates.
+    """
+    merged, seen = [], set()
+    for items in zip_longest(*lists):
+        for item in items:
+            if item and item.casefold() not in seen:
+                seen.add(item.casefold())
+                merged.append(item)
+    return merged[:limit]
+
+
+def merge_feedback(scored, interview_role):
+    """
+    Combine per-chunk feedback dicts, given as (feedback, weight) pairs.
+    """
+    total_weight = sum(weight for _, weight in scored)
+
+    categories = {}
+    for feedback, weight in scored:
+        for category in feedback.get('categoryScores', []):
+            entry = categories.setdefault(category['name'], {'score': 0, 'weight': 0, 'comment': '', 'best': -1})
+            entry['score'] += category.get('score', 0) * weight
+            entry['weight'] += weight
+            if weight > entry['best']:
+                entry['best'], entry['comment'] = weight, category.get('comment', '')
+
+    merged = {
+        "totalScore": round(sum(f.get('totalScore', 0) * weight for f, weight in scored) / total_weight),
+        "categoryScores": [
+            {"name": name, "score": round(entry['score'] / entry['weight']), "comment": entry['comment']}
+            for name, entry in categories.items()
+        ],
+        "strengths": _interleave_unique([f.get('strengths', []) for f, _ in scored], 6),
+        "areasForImprovement": _interleave_unique([f.get('areasForImprovement', []) for f, _ in scored], 6),
+    }
+    merged["finalAssessment"] = summarize_assessments(scored, merged, interview_role)
+    return merged
+
+
+def summarize_assessments(scored, merged, interview_role):
+    """
+    Turn the per-chunk assessments into one final assessment with a small model call,
+    falling back to joining them when that fails.
+    """
+    assessments = [f.get('finalAssessment', '') for f, _ in scored]
+    try:
+        prompt = f"""You are an expert interview evaluator. A long interview for the role of {interview_role} was
+evaluated in {len(assessments)} consecutive parts. Combine the per-part assessments below into a single,
+concise overall assessment (one paragraph) with clear recommendations. Overall score: {merged['totalScore']}/100.
+
+PER-PART ASSESSMENTS:
+""" + "\n".join(f"{index + 1}. {text}" for index, text in enumerate(assessments))
+        model = get_gemini_model()
+        with track_ai_call('feedback_summary', model):
+            response = get_gemini().generate_content(model=model, contents=prompt)
+            record_usage('feedback_summary', model, response)
+        if response.text and response.text.strip():
+            return response.text.strip()
     except Exception as e:
-        print(f"Error during Gemini AI call for feedback: {e}")
-        
-        # Return a basic feedback structure with error handling
-        return {
-            "totalScore": 50,
-            "categoryScores": [
-                {"name": "Communication Skills", "score": 50, "comment": "Unable to fully evaluate due to processing error."},
-                {"name": "Technical Knowledge", "score": 50, "comment": "Unable to fully evaluate due to processing error."},
-                {"name": "Problem-Solving", "score": 50, "comment": "Unable to fully evaluate due to processing error."},
-                {"name": "Cultural & Role Fit", "score": 50, "comment": "Unable to fully evaluate due to processing error."},
-                {"name": "Confidence & Clarity", "score": 50, "comment": "Unable to fully evaluate due to processing error."}
-            ],
-            "strengths": ["Participated in the interview process"],
-            "areasForImprovement": ["Technical evaluation could not be completed due to system error"],
-            "finalAssessment": f"The interview evaluation encountered a technical issue. Please contact support for manual review. Error: {str(e)[:100]}",
-        }
\ No newline at end of file
+        print(f"Error summarizing chunked feedback: {e}")
+        record_fallback('feedback_summary', get_gemini_model(), e)
+    return " ".join(assessments)
@@ -1 +1,246 @@
-# This is an empty integrations.py file for the acharya_ai app.
+import os
+import random
+import threading
+import time
+
+import httpx
+from django.conf import settings
+from google import genai
+from google.genai import errors, types
+
+
+class GeminiUnavailable(Exception):
+    """Raised when a Gemini call is refused locally or cannot be completed in time."""
+
+
+class CircuitOpenError(GeminiUnavailable):
+    """Raised without touching the network while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Classic closed / open / half-open breaker.
+
+    After `failure_threshold` consecutive failures the circuit opens and every
+    call is refused for `reset_timeout` seconds. Then a single probe call is let
+    through: success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+            if self.state == 'half_open' and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self.opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def release(self):
+        """
+        Give back a half-open probe slot without recording an outcome.
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+    def snapshot(self):
+        with self._lock:
+            return {'state': self.state, 'failures': self.failures}
+
+
+def is_retryable(error):
+    """
+    Timeouts, transport errors, 5xx responses and rate limiting are worth retrying;
+    other client errors (bad request, auth) will fail the same way again.
+    """
+    if isinstance(error, (httpx.TimeoutException, httpx.TransportError)):
+        return True
+    if isinstance(error, errors.ServerError):
+        return True
+    if isinstance(error, errors.APIError):
+        return error.code in (408, 429)
+    return False
+
+
+class GeminiGateway:
+    """
+    Process-wide access point for Gemini generate_content calls.
+
+    The underlying genai.Client (and its pooled HTTP connections) is created on
+    first use and shared by all threads. Each call gets a per-attempt timeout
+    and an overall deadline, transient failures are retried with jittered
+    exponential backoff, and a circuit breaker fails calls immediately while
+    the upstream keeps failing.
+    """
+
+    def __init__(self, api_key=None, base_url=None, timeout=30.0, deadline=60.0,
+                 max_retries=2, backoff_base=0.5, backoff_max=8.0, breaker=None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self._client = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            api_key=getattr(settings, 'GEMINI_API_KEY', None) or os.getenv('GEMINI_API_KEY'),
+            base_url=getattr(settings, 'GEMINI_BASE_URL', None),
+            timeout=getattr(settings, 'GEMINI_TIMEOUT_SECONDS', 30.0),
+            deadline=getattr(settings, 'GEMINI_DEADLINE_SECONDS', 60.0),
+            max_retries=getattr(settings, 'GEMINI_MAX_RETRIES', 2),
+            backoff_base=getattr(settings, 'GEMINI_RETRY_BACKOFF_SECONDS', 0.5),
+            backoff_max=getattr(settings, 'GEMINI_RETRY_BACKOFF_MAX_SECONDS', 8.0),
+            breaker=CircuitBreaker(
+                failure_threshold=getattr(settings, 'GEMINI_BREAKER_FAILURE_THRESHOLD', 5),
+                reset_timeout=getattr(settings, 'GEMINI_BREAKER_RESET_SECONDS', 30.0),
+            ),
+        )
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    if not self.api_key:
+                        raise GeminiUnavailable("GEMINI_API_KEY is not configured")
+                    http_options = types.HttpOptions(
+                        timeout=int(self.timeout * 1000),
+                        base_url=self.base_url,
+                    )
+                    self._client = genai.Client(api_key=self.api_key, http_options=http_options)
+        return self._client
+
+    def backoff(self, attempt):
+        # "Full jitter": sleep a random time up to the exponential ceiling
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def generate_content(self, model, contents, config=None):
+        """
+        Call client.models.generate_content with deadlines, retries and the breaker.
+        Raises CircuitOpenError, GeminiUnavailable or the last upstream error.
+        """
+        client = self.client
+        if not self.breaker.allow():
+            raise CircuitOpenError("Gemini circuit breaker is open")
+
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.breaker.record_failure()
+                raise GeminiUnavailable("Gemini call deadline exceeded")
+
+            call_config = dict(config or {})
+            call_config['http_options'] = {'timeout': int(min(self.timeout, remaining) * 1000)}
+            try:
+                response = client.models.generate_content(model=model, contents=contents, config=call_config)
+            except Exception as e:
+                if not is_retryable(e):
+                    # The upstream answered, so this says nothing about its health
+                    self.breaker.record_success()
+                    raise
+                delay = self.backoff(attempt)
+                if attempt >= self.max_retries or time.monotonic() + delay >= deadline:
+                    self.breaker.record_failure()
+                    raise
+                print(f"WARN: Gemini call failed ({e}), retrying in {delay:.2f}s")
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            self.breaker.record_success()
+            return response
+
+    async def stream_content(self, model, contents, config=None):
+        """
+        Async generator over client.aio.models.generate_content_stream chunks.
+
+        Streams are not retried (chunks may already have been consumed), but they
+        honour the per-attempt timeout, the overall deadline and the breaker.
+        """
+        client = self.client
+        if not self.breaker.allow():
+            raise CircuitOpenError("Gemini circuit breaker is open")
+
+        deadline = time.monotonic() + self.deadline
+        call_config = dict(config or {})
+        call_config['http_options'] = {'timeout': int(self.timeout * 1000)}
+        recorded = False
+        try:
+            stream = await client.aio.models.generate_content_stream(model=model, contents=contents, config=call_config)
+            async for chunk in stream:
+                if time.monotonic() > deadline:
+                    raise GeminiUnavailable("Gemini stream deadline exceeded")
+                yield chunk
+        except Exception as e:
+            recorded = True
+            if is_retryable(e) or isinstance(e, GeminiUnavailable):
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            raise
+        else:
+            recorded = True
+            self.breaker.record_success()
+        finally:
+            if not recorded:
+                # The consumer went away mid-stream
+                self.breaker.release()
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gemini():
+    """
+    Return the shared GeminiGateway, built from settings on first use.
+    """
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = GeminiGateway.from_settings()
+    return _gateway
+
+
+def reset_gemini():
+    """
+    Drop the shared gateway so the next call rebuilds it (e.g. after settings change).
+    """
+    global _gateway
+    with _gateway_lock:
+        _gateway = None
@@ -0,0 +1,419 @@
+import base64
+import csv
+import io
+import re
+import secrets
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.base_user import BaseUserManager
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from users.models import OutboxEmail
+from users.outbox import enqueue_emails
+from .cache import LRUCache
+from .metrics import INVITATION_TOKEN_LOOKUPS
+from .models import InterviewInvitation, hash_invitation_token
+from .rollups import bump_daily, record_invitations, rollup_day
+from .tasks import schedule
+
+TOKEN_BYTES = 32
+# Statuses that turn into 'expired' once expires_at has passed
+EXPIRABLE_STATUSES = ('pending', 'accepted')
+# Columns invitation lists always select: the pagination keys plus what with_effective_status() reads
+INVITATION_COLUMNS = ('id', 'created_at', 'status', 'expires_at')
+# Tokens are URL-safe base64 (secrets.token_urlsafe); anything else can't match an invitation
+TOKEN_PATTERN = re.compile(r'[A-Za-z0-9_-]{1,255}')
+# Rows reported back individually by a CSV import; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+
+def generate_tokens(count):
+    """
+    `count` invitation tokens from a single urandom read, each in the same
+    format as secrets.token_urlsafe(32).
+    """
+    raw = secrets.token_bytes(TOKEN_BYTES * count)
+    return [
+        base64.urlsafe_b64encode(raw[start:start + TOKEN_BYTES]).rstrip(b'=').decode('ascii')
+        for start in range(0, len(raw), TOKEN_BYTES)
+    ]
+
+
+def normalize_email(email):
+    # The same normalization User emails get, so accepting an invitation matches
+    return BaseUserManager.normalize_email((email or '').strip())
+
+
+def invitation_expiry():
+    return timezone.now() + timedelta(days=getattr(settings, 'AI_INVITATION_DAYS', 30))
+
+
+def _token_cache_config():
+    config = {'max_entries': 4096, 'ttl': 30, 'negative_max_entries': 16384, 'negative_ttl': 300}
+    config.update(getattr(settings, 'AI_INVITATION_TOKEN_CACHE', {}))
+    return config
+
+
+_token_caches = None
+_token_caches_lock = threading.Lock()
+
+
+def _get_token_caches():
+    """
+    (found, missing): token hash -> invitation row, and token hashes known not to exist.
+    """
+    global _token_caches
+    if _token_caches is None:
+        with _token_caches_lock:
+            if _token_caches is None:
+                config = _token_cache_config()
+                _token_caches = (
+                    LRUCache(max_entries=config['max_entries'], ttl=config['ttl']),
+                    LRUCache(max_entries=config['negative_max_entries'], ttl=config['negative_ttl']),
+                )
+    return _token_caches
+
+
+def find_invitation_by_token(token):
+    """
+    The .values() row (with interview title and role) of the invitation with
+    `token`, or None if there is none.
+
+    The database lookup is one point read on the token_hash unique index. Found
+    rows are cached for a few seconds and unknown hashes for a few minutes,
+    process-locally, so bots repeating bad tokens are answered from memory and
+    malformed tokens never reach the database. Rows are dropped from the cache
+    when the invitation is saved or deleted; reads still compute the effective
+    status from expires_at, so a cached row never shows a lapsed invitation as
+    pending.
+    """
+    if not TOKEN_PATTERN.fullmatch(token):
+        INVITATION_TOKEN_LOOKUPS.inc(result='rejected')
+        return None
+    token_hash = hash_invitation_token(token)
+    found, missing = _get_token_caches()
+
+    row = found.get(token_hash)
+    if row is not None:
+        INVITATION_TOKEN_LOOKUPS.inc(result='cache_hit')
+        return row
+    if missing.get(token_hash):
+        INVITATION_TOKEN_LOOKUPS.inc(result='negative_cache_hit')
+        return None
+
+    from .read_serializers import values_serializer
+    from .serializers import InterviewInvitationSerializer
+
+    rows = list(values_serializer(InterviewInvitationSerializer).select(
+        InterviewInvitation.objects.filter(token_hash=token_hash), always=INVITATION_COLUMNS
+    ))
+    if not rows:
+        INVITATION_TOKEN_LOOKUPS.inc(result='not_found')
+        missing.set(token_hash, True)
+        return None
+    INVITATION_TOKEN_LOOKUPS.inc(result='found')
+    found.set(token_hash, rows[0])
+    return rows[0]
+
+
+def forget_invitation_tokens(token_hashes):
+    """
+    Drop cached lookups for these token hashes, after their invitations changed or were created.
+    """
+    found, missing = _get_token_caches()
+    for token_hash in token_hashes:
+        found.delete(token_hash)
+        missing.delete(token_hash)
+
+
+def forget_invitation(invitation_id):
+    """
+    Drop the cached token lookup of an invitation changed with a queryset update().
+
+    The token hash is read back from the row (a primary key lookup) rather than
+    remembered per id, which cache eviction could lose while the row itself is
+    still cached.
+    """
+    forget_invitation_tokens(InterviewInvitation.objects.filter(id=invitation_id).values_list('token_hash', flat=True))
+
+
+def clear_token_caches():
+    for lookup_cache in _get_token_caches():
+        lookup_cache.clear()
+
+
+@receiver(post_save, sender=InterviewInvitation)
+@receiver(post_delete, sender=InterviewInvitation)
+def invitation_changed(sender, instance, **kwargs):
+    forget_invitation_tokens([instance.token_hash])
+
+
+def effective_status(status, expires_at, now=None):
+    """
+    The status to show for an invitation: 'expired' once it has lapsed, even
+    if the sweeper hasn't updated the row yet.
+    """
+    if status in EXPIRABLE_STATUSES and expires_at <= (now or timezone.now()):
+        return 'expired'
+    return status
+
+
+def with_effective_status(data, rows):
+    """
+    Replace "status" in rendered invitations with the effective status of the
+    matching .values() rows (which must include status and expires_at).
+    """
+    now = timezone.now()
+    for item, row in zip(data, rows):
+        if 'status' in item:
+            item['status'] = effective_status(row['status'], row['expires_at'], now)
+    return data
+
+
+def expire_invitations(batch_size=None):
+    """
+    Mark lapsed invitations 'expired', batch_size rows per UPDATE. Returns how many.
+
+    Each batch picks ids through the (status, expires_at) index and updates
+    them in its own short statement, so the sweep never holds locks on a large
+    part of the table. Rows accepted or completed in between are left alone
+    because the UPDATE repeats the status filter.
+    """
+    batch_size = batch_size or getattr(settings, 'AI_INVITATION_SWEEP_BATCH', 1000)
+    now = timezone.now()
+    lapsed = InterviewInvitation.objects.filter(status__in=EXPIRABLE_STATUSES, expires_at__lte=now)
+    expired = 0
+    while True:
+        ids = list(lapsed.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            break
+        expired += lapsed.filter(id__in=ids).update(status='expired', updated_at=now)
+        if len(ids) < batch_size:
+            break
+    return expired
+
+
+def schedule_expiry_sweeps():
+    """
+    Run expire_invitations() every AI_INVITATION_SWEEP_SECONDS in this process
+    (off when 0, e.g. when the expire_invitations command runs from cron).
+    """
+    interval = getattr(settings, 'AI_INVITATION_SWEEP_SECONDS', 0)
+    if interval > 0:
+        return schedule('expire_invitations', interval, expire_invitations)
+    return None
+
+
+def _transition(invitation_id, *conditions, **changes):
+    """
+    Apply `changes` to the invitation in one UPDATE, only if it still matches
+    `conditions`. Returns whether it did.
+
+    The check and the write are a single statement, so of two concurrent
+    requests exactly one wins, without row locks or reading the row first.
+    Only a successful transition then reads the token hash, to drop its
+    cached lookup.
+    """
+    updated = InterviewInvitation.objects.filter(*conditions, id=invitation_id).update(
+        updated_at=timezone.now(), **changes
+    )
+    if updated:
+        forget_invitation(invitation_id)
+    return bool(updated)
+
+
+def accept_invitation(invitation_id, user):
+    """
+    pending -> accepted for `user`, if the invitation is theirs and hasn't lapsed. Uses up one attempt.
+    """
+    return _transition(
+        invitation_id, Q(candidate_email=user.email, status='pending', expires_at__gt=timezone.now()),
+        candidate=user, status='accepted', attempts_used=F('attempts_used') + 1,
+    )
+
+
+def complete_invitation(invitation_id):
+    """
+    accepted -> completed, counted in the owner's analytics rollup.
+    """
+    if not _transition(invitation_id, Q(status='accepted'), status='completed'):
+        return False
+    # update() sends no post_save, so count the completion here
+    owner_id = InterviewInvitation.objects.filter(id=invitation_id).values_list('interview__user_id', flat=True).first()
+    if owner_id:
+        bump_daily(owner_id, rollup_day(timezone.now()), invitations_completed=1)
+    return True
+
+
+def complete_candidate_invitation(interview, user):
+    """
+    Submitting an attempt completes the candidate's accepted invitation to the
+    interview, if any. Every feedback submission path (sync, async and SSE) calls this.
+    """
+    invitation_id = InterviewInvitation.objects.filter(
+        interview=interview, candidate_email=user.email, status='accepted'
+    ).values_list('id', flat=True).first()
+    if invitation_id:
+        complete_invitation(invitation_id)
+
+
+def revoke_invitation(invitation_id, owner):
+    """
+    pending/accepted -> revoked, for invitations to one of `owner`'s interviews.
+    """
+    return _transition(
+        invitation_id, Q(interview__user=owner, status__in=EXPIRABLE_STATUSES), status='revoked'
+    )
+
+
+def extend_invitation(invitation_id, owner, expires_at):
+    """
+    Move expires_at later for one of `owner`'s invitations that hasn't been
+    completed or revoked. An expired invitation becomes pending again.
+    """
+    return _transition(
+        invitation_id,
+        Q(interview__user=owner, status__in=EXPIRABLE_STATUSES + ('expired',), expires_at__lt=expires_at),
+        expires_at=expires_at,
+        status=Case(When(status='expired', then=Value('pending')), default=F('status')),
+    )
+
+
+def build_invitations(interview, emails, expires_at=None):
+    """
+    Unsaved invitations for `emails`, normalized and de-duplicated within the batch.
+    """
+    emails = list(dict.fromkeys(normalize_email(email) for email in emails if email))
+    expires_at = expires_at or invitation_expiry()
+    return [
+        InterviewInvitation(
+            interview=interview, candidate_email=email, invitation_token=token,
+            token_hash=hash_invitation_token(token), expires_at=expires_at,
+        )
+        for email, token in zip(emails, generate_tokens(len(emails)))
+    ]
+
+
+def invitation_email(invitation):
+    """
+    Unsaved outbox email telling the candidate about `invitation`.
+    """
+    interview = invitation.interview
+    link = f"{getattr(settings, 'FRONTEND_URL', '').rstrip('/')}/invitations/{invitation.invitation_token}"
+    body = (
+        f"Hi,\n\n"
+        f"You have been invited to a {interview.role} interview ({interview.title or interview.role}) on Acharya AI.\n"
+        f"It takes about {interview.time_limit} minutes and the invitation is valid until "
+        f"{invitation.expires_at:%d %B %Y}.\n\n"
+        f"Start here: {link}\n\n"
+        f"Best regards,\nAcharya AI Team\n"
+    )
+    return OutboxEmail(
+        kind='interview_invitation',
+        to_email=invitation.candidate_email,
+        subject=f"Interview invitation: {interview.title or interview.role}",
+        body=body,
+    )
+
+
+def save_invitations(invitations, owner_id, batch_size=500):
+    """
+    Insert built invitations with their outbox emails and rollup counts. Call inside a transaction.
+    """
+    InterviewInvitation.objects.bulk_create(invitations, batch_size=batch_size)
+    forget_invitation_tokens(invitation.token_hash for invitation in invitations)
+    enqueue_emails([invitation_email(invitation) for invitation in invitations])
+    # bulk_create sends no post_save, so update the analytics rollups here
+    record_invitations(invitations, owner_id)
+
+
+def create_invitations(interview, emails, batch_size=500):
+    """
+    Invite `emails` to `interview` with bulk INSERTs in one transaction.
+
+    Duplicates within `emails` and addresses already invited to the interview
+    are skipped, so the (interview, candidate_email) constraint isn't hit and
+    running the same list twice is harmless. Each new invitation's email is
+    queued in the outbox in the same transaction. Returns (created
+    invitations, number skipped).
+    """
+    candidates = build_invitations(interview, emails)
+    skipped = len(emails) - len(candidates)
+
+    with transaction.atomic():
+        invitations = []
+        for start in range(0, len(candidates), batch_size):
+            chunk = candidates[start:start + batch_size]
+            existing = set(InterviewInvitation.objects.filter(
+                interview=interview, candidate_email__in=[invitation.candidate_email for invitation in chunk]
+            ).values_list('candidate_email', flat=True))
+            invitations.extend(invitation for invitation in chunk if invitation.candidate_email not in existing)
+            skipped += len(existing)
+
+        save_invitations(invitations, interview.user_id, batch_size)
+    return invitations, skipped
+
+
+def read_csv_emails(upload):
+    """
+    Yield (row number, email) from an uploaded CSV, one row at a time.
+
+    Emails come from the "email" column when the first row is a header,
+    otherwise from the first column. The upload is read as a stream, so a
+    large file is never held in memory at once.
+    """
+    reader = csv.reader(io.TextIOWrapper(upload, encoding='utf-8-sig', newline=''))
+    column = 0
+    for number, row in enumerate(reader, start=1):
+        if number == 1:
+            header = [cell.strip().lower() for cell in row]
+            if 'email' in header:
+                column = header.index('email')
+                continue
+        if not row or not any(cell.strip() for cell in row):
+            continue
+        yield number, row[column].strip() if column < len(row) else ''
+
+
+def import_invitations(interview, upload, chunk_size=None):
+    """
+    Create invitations for every valid email in a CSV upload.
+
+    Rows are validated and inserted chunk_size at a time, each chunk in its own
+    transaction, so memory and lock time stay bounded for files with tens of
+    thousands of rows. Since existing invitations are skipped, an interrupted
+    import can simply be uploaded again.
+    """
+    chunk_size = chunk_size or getattr(settings, 'AI_INVITATION_IMPORT_CHUNK', 1000)
+    summary = {'rows': 0, 'created': 0, 'skipped': 0, 'invalid': 0, 'errors': []}
+    chunk = []
+
+    def flush():
+        created, skipped = create_invitations(interview, chunk)
+        summary['created'] += len(created)
+        summary['skipped'] += skipped
+        chunk.clear()
+
+    for number, email in read_csv_emails(upload):
+        summary['rows'] += 1
+        try:
+            validate_email(email)
+        except ValidationError:
+            summary['invalid'] += 1
+            if len(summary['errors']) < MAX_REPORTED_ERRORS:
+                summary['errors'].append({'row': number, 'value': email[:254], 'error': 'Enter a valid email address.'})
+            continue
+        chunk.append(email)
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+    return summary
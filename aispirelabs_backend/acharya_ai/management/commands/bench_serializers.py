@@ -0,0 +1,91 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from acharya_ai.models import Feedback, Interview, InterviewInvitation, hash_invitation_token
+from acharya_ai.read_serializers import values_serializer
+from acharya_ai.serializers import FeedbackSerializer, InterviewInvitationSerializer, InterviewSerializer
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare rows/second of the ModelSerializers and their values() based read "
+        "serializers on seeded data. Everything runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000, help="Rows seeded per model.")
+        parser.add_argument('--repeat', type=int, default=5, help="Runs per case; the best one is reported.")
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        with transaction.atomic():
+            interview = self.seed(rows)
+            cases = [
+                ('interviews', InterviewSerializer, Interview.objects.filter(user_id=interview.user_id)),
+                ('feedback', FeedbackSerializer, Feedback.objects.filter(interview=interview)),
+                ('invitations', InterviewInvitationSerializer, InterviewInvitation.objects.filter(interview=interview)),
+            ]
+            for name, serializer_class, queryset in cases:
+                model_rate, model_queries = self.measure(
+                    repeat, rows, lambda: serializer_class(list(queryset.all()), many=True).data
+                )
+                reader = values_serializer(serializer_class)
+                values_rate, values_queries = self.measure(
+                    repeat, rows, lambda: reader.to_representation_many(reader.select(queryset))
+                )
+                self.stdout.write(
+                    f"{name:<12} ModelSerializer {model_rate:>10,.0f} rows/s ({model_queries} queries)   "
+                    f"values {values_rate:>10,.0f} rows/s ({values_queries} queries)   "
+                    f"x{values_rate / model_rate:.1f}"
+                )
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def measure(repeat, rows, run):
+        best = None
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                run()
+                elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return rows / best, len(queries)
+
+    @staticmethod
+    def seed(rows):
+        now = timezone.now()
+        user = User(username='bench-serializers', email='bench-serializers@example.com', user_type='hr')
+        user.set_unusable_password()
+        user.save()
+        # bulk_create sends no signals, so the seeded rows don't touch the analytics rollups
+        interviews = Interview.objects.bulk_create([
+            Interview(
+                user=user, title=f"Interview {n}", role="Backend Engineer", type="technical", level="mid",
+                techstack=["Python", "Django"], questions=[f"Question {q}" for q in range(8)]
+            )
+            for n in range(rows)
+        ], batch_size=500)
+        interview = interviews[0]
+        InterviewInvitation.objects.bulk_create([
+            InterviewInvitation(
+                interview=interview, candidate_email=f"candidate{n}@example.com",
+                invitation_token=f"bench-serializers-{n}", token_hash=hash_invitation_token(f"bench-serializers-{n}"),
+                expires_at=now + timedelta(days=7)
+            )
+            for n in range(rows)
+        ], batch_size=500)
+        Feedback.objects.bulk_create([
+            Feedback(
+                interview=interview, user=user, total_score=70, completed_at=now,
+                category_scores=[{'name': 'Communication', 'score': 70, 'comment': 'Clear.'}] * 5,
+                strengths=["Clear answers"], areas_for_improvement=["More depth"], final_assessment="Solid."
+            )
+            for _ in range(rows)
+        ], batch_size=500)
+        return interview
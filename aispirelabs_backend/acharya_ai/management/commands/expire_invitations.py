@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from acharya_ai.invitations import expire_invitations
+
+
+class Command(BaseCommand):
+    help = (
+        "Mark lapsed interview invitations as expired in batched UPDATEs. "
+        "Runs once (for cron) unless --interval is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help="Invitations per UPDATE.")
+        parser.add_argument('--interval', type=float, help="Keep running, sweeping every this many seconds.")
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                expired = expire_invitations(options['batch_size'])
+                self.stdout.write(f"Expired {expired} invitation(s)")
+                if not options['interval']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+
+from acharya_ai.fake_gemini import FakeGeminiServer, FaultProfile
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a local fake Gemini API for load testing. Start the backend with "
+        "GEMINI_BASE_URL=http://<host>:<port> (and any GEMINI_API_KEY) to use it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument(
+            '--latency', choices=['fixed', 'uniform', 'normal', 'lognormal'], default='lognormal',
+            help="Response latency distribution."
+        )
+        parser.add_argument('--latency-ms', type=float, default=800, help="Mean (or fixed) latency in milliseconds.")
+        parser.add_argument('--jitter-ms', type=float, default=400, help="Latency spread in milliseconds.")
+        parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of calls answered with 503.")
+        parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="Fraction of calls answered with 429.")
+        parser.add_argument('--stream-chunks', type=int, default=4, help="Chunks per streamed response.")
+        parser.add_argument('--seed', type=int, default=None, help="Seed for reproducible runs.")
+        parser.add_argument('--verbose', action='store_true', help="Log every request.")
+
+    def handle(self, *args, **options):
+        profile = FaultProfile(
+            latency=options['latency'],
+            latency_ms=options['latency_ms'],
+            jitter_ms=options['jitter_ms'],
+            error_rate=options['error_rate'],
+            rate_limit_rate=options['rate_limit_rate'],
+            stream_chunks=options['stream_chunks'],
+            seed=options['seed'],
+        )
+        server = FakeGeminiServer(
+            (options['host'], options['port']), profile=profile, seed=options['seed'], verbose=options['verbose']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Fake Gemini listening on {server.base_url} "
+            f"({options['latency']} {options['latency_ms']:.0f}±{options['jitter_ms']:.0f}ms, "
+            f"errors {options['error_rate']:.0%}, rate limits {options['rate_limit_rate']:.0%}). "
+            f"Call counters at {server.base_url}/stats"
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"Served {server.snapshot()}")
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from acharya_ai.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the HR analytics rollup tables from interviews, invitations and feedback."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', action='append', dest='users', metavar='USER_ID',
+            help="Only rebuild rollups for this interview owner (repeatable)."
+        )
+
+    def handle(self, *args, **options):
+        rows = rebuild_rollups(user_ids=options['users'])
+        scope = f"{len(options['users'])} user(s)" if options['users'] else "all users"
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} daily rollup rows for {scope}"))
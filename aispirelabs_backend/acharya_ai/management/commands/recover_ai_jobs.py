@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from acharya_ai.tasks import recover_jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-queue background AI jobs lost with their process (restart, deploy), "
+        "or fail them once they are too old. Runs once (for cron) unless --interval is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, help="Keep running, sweeping every this many seconds.")
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                for kind, (requeued, failed) in recover_jobs().items():
+                    self.stdout.write(f"{kind}: requeued {requeued}, failed {failed}")
+                if not options['interval']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,383 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import httpx
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from google.genai import errors
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .integrations import CircuitOpenError, GeminiUnavailable
+
+
+class Metric:
+    """
+    Base for in-process metrics with a fixed set of label names.
+
+    Values live in this process only; with several server workers each one
+    exposes its own series, which Prometheus tells apart by instance.
+    """
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_series(key, value))
+        return lines
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _render_series(self, key, value):
+        return [f"{self.name}{format_labels(self.labelnames, key)} {format_value(value)}"]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=()):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, amount, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(self.buckets):
+                if amount <= bound:
+                    series['buckets'][index] += 1
+                    break
+            series['sum'] += amount
+            series['count'] += 1
+
+    def count(self, **labels):
+        with self._lock:
+            series = self._values.get(self._key(labels))
+            return series['count'] if series else 0
+
+    def _render_series(self, key, series):
+        lines = []
+        cumulative = 0
+        for bound, hits in zip(self.buckets, series['buckets']):
+            cumulative += hits
+            le = '+Inf' if bound == float('inf') else format_value(bound)
+            labels = format_labels(self.labelnames + ('le',), key + (le,))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {format_value(series['sum'])}")
+        lines.append(f"{self.name}_count{labels} {series['count']}")
+        return lines
+
+
+def format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(f'{name}={json.dumps(str(value))}' for name, value in zip(names, values))
+    return '{' + pairs + '}'
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector):
+        """
+        Register a callable run before each scrape, to refresh gauges from live state.
+        """
+        self.collectors.append(collector)
+        return collector
+
+    def render(self):
+        for collector in self.collectors:
+            try:
+                collector()
+            except Exception as e:
+                print(f"WARN: Metrics collector {collector.__name__} failed: {e}")
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        for metric in self.metrics:
+            metric.clear()
+
+
+REGISTRY = Registry()
+
+AI_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)
+HTTP_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+DB_LATENCY_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+AI_CALL_SECONDS = REGISTRY.register(Histogram(
+    'acharya_ai_call_duration_seconds', 'Duration of Gemini calls, including retries.',
+    ['operation', 'model', 'outcome'], AI_LATENCY_BUCKETS
+))
+AI_TOKENS = REGISTRY.register(Counter(
+    'acharya_ai_tokens_total', 'Tokens reported in Gemini usage metadata.',
+    ['operation', 'model', 'kind']
+))
+AI_ERRORS = REGISTRY.register(Counter(
+    'acharya_ai_errors_total', 'Failed Gemini calls by reason.',
+    ['operation', 'model', 'reason']
+))
+AI_FALLBACKS = REGISTRY.register(Counter(
+    'acharya_ai_fallbacks_total', 'AI results replaced by canned fallback content, by reason.',
+    ['operation', 'model', 'reason']
+))
+AI_QUESTIONS_SERVED = REGISTRY.register(Counter(
+    'acharya_ai_questions_served_total', 'Interview questions returned, by where they came from.',
+    ['source']
+))
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'acharya_http_request_duration_seconds', 'Time to produce a response (headers, for streaming responses).',
+    ['method', 'view', 'status'], HTTP_LATENCY_BUCKETS
+))
+DB_QUERY_SECONDS = REGISTRY.register(Histogram(
+    'acharya_db_query_duration_seconds', 'Duration of individual database queries made while serving requests.',
+    ['view'], DB_LATENCY_BUCKETS
+))
+INVITATION_TOKEN_LOOKUPS = REGISTRY.register(Counter(
+    'acharya_invitation_token_lookups_total', 'Invitation token lookups, by how they were answered.',
+    ['result']
+))
+AI_JOBS = REGISTRY.register(Gauge(
+    'acharya_ai_jobs', 'Jobs currently queued or running in each AI job pool.',
+    ['pool', 'state']
+))
+AI_JOBS_FINISHED = REGISTRY.register(Gauge(
+    'acharya_ai_jobs_finished', 'Jobs finished by each AI job pool since the process started.',
+    ['pool', 'result']
+))
+
+
+@REGISTRY.add_collector
+def collect_job_pools():
+    from .tasks import pool_stats
+
+    for stats in pool_stats():
+        AI_JOBS.set(stats['queued'], pool=stats['name'], state='queued')
+        AI_JOBS.set(stats['running'], pool=stats['name'], state='running')
+        for result in ('completed', 'failed', 'rejected', 'slow'):
+            AI_JOBS_FINISHED.set(stats[result], pool=stats['name'], result=result)
+
+
+def error_reason(error):
+    """
+    Short, low-cardinality label for why an AI call failed.
+    """
+    if isinstance(error, CircuitOpenError):
+        return 'circuit_open'
+    if isinstance(error, GeminiUnavailable):
+        return 'unavailable'
+    if isinstance(error, httpx.TimeoutException):
+        return 'timeout'
+    if isinstance(error, httpx.TransportError):
+        return 'transport'
+    if isinstance(error, errors.APIError):
+        if error.code == 429:
+            return 'rate_limited'
+        return 'server_error' if isinstance(error, errors.ServerError) else 'client_error'
+    if isinstance(error, (ValueError, KeyError, TypeError)):
+        # json.JSONDecodeError is a ValueError; validate_feedback raises ValueError too
+        return 'invalid_response'
+    return 'other'
+
+
+@contextmanager
+def track_ai_call(operation, model):
+    """
+    Time a Gemini call and count it as an error (by reason) if the block raises.
+    """
+    start = time.perf_counter()
+    outcome = 'success'
+    try:
+        yield
+    except Exception as e:
+        outcome = 'error'
+        AI_ERRORS.inc(operation=operation, model=model, reason=error_reason(e))
+        raise
+    finally:
+        AI_CALL_SECONDS.observe(time.perf_counter() - start, operation=operation, model=model, outcome=outcome)
+
+
+def record_usage(operation, model, response):
+    """
+    Count prompt/response tokens from a Gemini response's usage metadata, if present.
+    """
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is None:
+        return
+    for kind, attribute in (('prompt', 'prompt_token_count'), ('response', 'candidates_token_count')):
+        count = getattr(usage, attribute, None)
+        if isinstance(count, int) and count > 0:
+            AI_TOKENS.inc(count, operation=operation, model=model, kind=kind)
+
+
+def record_fallback(operation, model, error):
+    AI_FALLBACKS.inc(operation=operation, model=model, reason=error_reason(error))
+
+
+# Per-request list of query durations; sync_to_async copies the context into its worker
+# thread, so queries from sync views served under ASGI are timed too
+_request_queries = ContextVar('metrics_request_queries', default=None)
+
+
+def _time_query(execute, sql, params, many, context):
+    queries = _request_queries.get()
+    if queries is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        queries.append(time.perf_counter() - start)
+
+
+@receiver(connection_created)
+def install_query_timer(sender, connection, **kwargs):
+    # At the front, so an execute_wrapper() block the connection was opened in still pops its own wrapper
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _time_query)
+
+
+class MetricsMiddleware:
+    """
+    Record request latency and per-query database time, labelled by URL name.
+    Runs natively under both WSGI and ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            return self.get_response(request)
+
+        queries = []
+        token = _request_queries.set(queries)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        self.record(request, response, time.perf_counter() - start, queries)
+        return response
+
+    async def __acall__(self, request):
+        if not getattr(settings, 'METRICS_ENABLED', True):
+            return await self.get_response(request)
+
+        queries = []
+        token = _request_queries.set(queries)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_queries.reset(token)
+        self.record(request, response, time.perf_counter() - start, queries)
+        return response
+
+    @staticmethod
+    def record(request, response, elapsed, queries):
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name if match else None) or 'unmatched'
+        HTTP_REQUEST_SECONDS.observe(elapsed, method=request.method, view=view, status=response.status_code)
+        for duration in queries:
+            DB_QUERY_SECONDS.observe(duration, view=view)
+
+
+def metrics_authorized(request):
+    """
+    Scrapers send METRICS_AUTH_TOKEN as a bearer token; otherwise the request
+    must come from a staff user, signed in by session or JWT.
+    """
+    token = getattr(settings, 'METRICS_AUTH_TOKEN', None)
+    supplied = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+    if token and constant_time_compare(supplied, token):
+        return True
+
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        try:
+            result = JWTAuthentication().authenticate(request)
+        except AuthenticationFailed:
+            result = None
+        user = result[0] if result else None
+    return bool(user and user.is_active and user.is_staff)
+
+
+def metrics_view(request):
+    """
+    Prometheus text exposition of everything in REGISTRY. Closed unless
+    metrics_authorized(), or METRICS_PUBLIC is set to expose it to anyone.
+    """
+    if not getattr(settings, 'METRICS_PUBLIC', False) and not metrics_authorized(request):
+        return HttpResponse('Unauthorized\n', status=401, content_type='text/plain')
+    return HttpResponse(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
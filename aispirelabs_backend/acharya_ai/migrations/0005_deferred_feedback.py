@@ -0,0 +1,53 @@
+# Generated by Django 5.2.3 on 2026-10-16 20:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('acharya_ai', '0004_question_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedback',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='feedback',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('completed', 'Completed'), ('failed', 'Failed')], default='completed', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='feedback',
+            name='transcript',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AlterField(
+            model_name='feedback',
+            name='areas_for_improvement',
+            field=models.JSONField(default=list),
+        ),
+        migrations.AlterField(
+            model_name='feedback',
+            name='category_scores',
+            field=models.JSONField(default=list),
+        ),
+        migrations.AlterField(
+            model_name='feedback',
+            name='final_assessment',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AlterField(
+            model_name='feedback',
+            name='strengths',
+            field=models.JSONField(default=list),
+        ),
+        migrations.AlterField(
+            model_name='feedback',
+            name='total_score',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
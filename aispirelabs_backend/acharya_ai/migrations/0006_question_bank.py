@@ -0,0 +1,44 @@
+# Generated by Django 5.2.3 on 2026-10-16 20:38
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('acharya_ai', '0005_deferred_feedback'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankQuestion',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('text', models.TextField()),
+                ('text_hash', models.CharField(max_length=64)),
+                ('role', models.CharField(max_length=255)),
+                ('level', models.CharField(max_length=100)),
+                ('type', models.CharField(max_length=100)),
+                ('model_name', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['role', 'level', 'type', 'created_at'], name='bank_question_tags_idx')],
+                'unique_together': {('role', 'level', 'type', 'text_hash')},
+            },
+        ),
+        migrations.CreateModel(
+            name='BankQuestionTech',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50)),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='techs', to='acharya_ai.bankquestion')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['name', 'question'], name='bank_tech_name_idx')],
+                'unique_together': {('question', 'name')},
+            },
+        ),
+    ]
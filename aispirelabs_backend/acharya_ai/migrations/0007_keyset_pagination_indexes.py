@@ -0,0 +1,31 @@
+# Generated by Django 5.2.3 on 2026-10-16 20:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('acharya_ai', '0006_question_bank'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['interview', 'created_at', 'id'], name='feedback_interview_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['interview', 'user', 'created_at', 'id'], name='feedback_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='interview',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='interview_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='interviewinvitation',
+            index=models.Index(fields=['interview', 'created_at', 'id'], name='invitation_created_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-16 20:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('acharya_ai', '0007_keyset_pagination_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='interviewinvitation',
+            index=models.Index(fields=['interview', 'status'], name='invitation_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='interviewinvitation',
+            index=models.Index(fields=['candidate_email'], name='invitation_email_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.3 on 2026-10-16 20:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('acharya_ai', '0009_hr_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hrdailyrollup',
+            name='scores_0_19',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='hrdailyrollup',
+            name='scores_20_39',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='hrdailyrollup',
+            name='scores_40_59',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='hrdailyrollup',
+            name='scores_60_79',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='hrdailyrollup',
+            name='scores_80_100',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.3 on 2026-10-16 21:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('acharya_ai', '0010_rollup_score_buckets'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='interviewinvitation',
+            index=models.Index(fields=['status', 'expires_at'], name='invitation_expiry_idx'),
+        ),
+    ]
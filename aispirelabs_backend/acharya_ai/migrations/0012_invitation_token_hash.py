@@ -0,0 +1,31 @@
+import hashlib
+
+from django.db import migrations, models
+
+
+def fill_token_hashes(apps, schema_editor):
+    InterviewInvitation = apps.get_model('acharya_ai', 'InterviewInvitation')
+    pending = InterviewInvitation.objects.filter(token_hash__isnull=True).only('id', 'invitation_token')
+    while True:
+        batch = list(pending[:1000])
+        if not batch:
+            break
+        for invitation in batch:
+            invitation.token_hash = hashlib.sha256(invitation.invitation_token.encode('utf-8')).hexdigest()
+        InterviewInvitation.objects.bulk_update(batch, ['token_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('acharya_ai', '0011_invitation_expiry_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='interviewinvitation',
+            name='token_hash',
+            field=models.CharField(editable=False, max_length=64, null=True),
+        ),
+        migrations.RunPython(fill_token_hashes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Separate from the backfill in 0012 so the constraint changes run in their own transaction
+
+    dependencies = [
+        ('acharya_ai', '0012_invitation_token_hash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='interviewinvitation',
+            name='token_hash',
+            field=models.CharField(editable=False, max_length=64, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='interviewinvitation',
+            name='invitation_token',
+            field=models.CharField(max_length=255),
+        ),
+    ]
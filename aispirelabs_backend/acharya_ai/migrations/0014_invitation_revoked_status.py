@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-16 21:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('acharya_ai', '0013_invitation_token_hash_unique'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='interviewinvitation',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('accepted', 'Accepted'), ('completed', 'Completed'), ('expired', 'Expired'), ('revoked', 'Revoked')], default='pending', max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+def backfill_rollups(apps, schema_editor):
+    from acharya_ai.rollups import rebuild_rollups
+
+    rebuild_rollups(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('acharya_ai', '0016_interview_max_questions'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
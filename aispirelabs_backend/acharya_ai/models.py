@@ -1,5 +1,6 @@
 from django.db import models
 from users.models import User # Assuming User model is in 'users' app
+import hashlib
 import uuid
 
 class Interview(models.Model):
@@ -26,6 +27,7 @@ class Interview(models.Model):
     questions = models.JSONField() # Stores a list of question strings
     job_description = models.TextField(blank=True, null=True)
     finalized = models.BooleanField(default=True)
+    max_questions = models.IntegerField(null=True, blank=True) # Requested question count, so lost async generation can be re-queued
     cover_image = models.URLField(max_length=255, blank=True, null=True)
     
     # HR-specific fields
@@ -39,15 +41,31 @@ class Interview(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of a user's interviews on (created_at, id)
+            models.Index(fields=['user', 'created_at', 'id'], name='interview_user_created_idx'),
+            # Job recovery looks for interviews whose questions are still being generated
+            models.Index(fields=['updated_at'], condition=models.Q(finalized=False), name='interview_unfinalized_idx'),
+        ]
+
     def __str__(self):
         return f"Interview: {self.title or self.role} ({self.id})"
 
+def hash_invitation_token(token):
+    """
+    Fixed-length (SHA-256 hex) key that invitations are looked up by instead of the raw token.
+    """
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
 class InterviewInvitation(models.Model):
     STATUS_CHOICES = (
         ('pending', 'Pending'),
         ('accepted', 'Accepted'),
         ('completed', 'Completed'),
         ('expired', 'Expired'),
+        ('revoked', 'Revoked'),
     )
     
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -56,29 +74,144 @@ class InterviewInvitation(models.Model):
     candidate = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='interview_invitations')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     attempts_used = models.IntegerField(default=0)
-    invitation_token = models.CharField(max_length=255, unique=True)
+    invitation_token = models.CharField(max_length=255)
+    # Unique index for token lookups; it also keeps tokens unique
+    token_hash = models.CharField(max_length=64, unique=True, editable=False)
     expires_at = models.DateTimeField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         unique_together = ('interview', 'candidate_email')
+        indexes = [
+            models.Index(fields=['interview', 'created_at', 'id'], name='invitation_created_idx'),
+            models.Index(fields=['interview', 'status'], name='invitation_status_idx'),
+            models.Index(fields=['candidate_email'], name='invitation_email_idx'),
+            models.Index(fields=['status', 'expires_at'], name='invitation_expiry_idx'),
+        ]
     
+    def save(self, *args, **kwargs):
+        # bulk_create skips save(), so build_invitations() sets token_hash itself
+        self.token_hash = hash_invitation_token(self.invitation_token)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"Invitation for {self.candidate_email} to {self.interview.title}"
 
 class Feedback(models.Model):
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    )
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     interview = models.ForeignKey(Interview, on_delete=models.CASCADE, related_name='feedbacks')
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='feedbacks')
     invitation = models.ForeignKey(InterviewInvitation, on_delete=models.SET_NULL, null=True, blank=True, related_name='feedbacks')
-    total_score = models.IntegerField()
-    category_scores = models.JSONField() # Stores list of dicts: {name, score, comment}
-    strengths = models.JSONField() # Stores list of strings
-    areas_for_improvement = models.JSONField() # Stores list of strings
-    final_assessment = models.TextField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='completed') # 'pending' while AI scoring runs
+    transcript = models.JSONField(default=list, blank=True) # Stores list of dicts: {role, content}
+    total_score = models.IntegerField(null=True, blank=True) # Null until scored
+    category_scores = models.JSONField(default=list) # Stores list of dicts: {name, score, comment}
+    strengths = models.JSONField(default=list) # Stores list of strings
+    areas_for_improvement = models.JSONField(default=list) # Stores list of strings
+    final_assessment = models.TextField(blank=True, default='')
     attempt_number = models.IntegerField(default=1)
     created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    queued_at = models.DateTimeField(null=True, blank=True) # Last handed to a scoring job; recovery re-queues stale pending rows
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['interview', 'created_at', 'id'], name='feedback_interview_created_idx'),
+            models.Index(fields=['interview', 'user', 'created_at', 'id'], name='feedback_user_created_idx'),
+            models.Index(fields=['status', 'queued_at'], name='feedback_status_queued_idx'),
+        ]
 
     def __str__(self):
         return f"Feedback for Interview {self.interview.id} by User {self.user.username}"
+
+class QuestionCacheEntry(models.Model):
+    # sha256 of the normalized (role, level, type, techstack, max_questions, model) inputs
+    fingerprint = models.CharField(max_length=64, primary_key=True)
+    model_name = models.CharField(max_length=100)
+    questions = models.JSONField() # Stores a list of question strings
+    hits = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(db_index=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"Cached questions {self.fingerprint[:12]} ({self.model_name})"
+
+class BankQuestion(models.Model):
+    # Tags are stored normalized (casefolded, single-spaced) so lookups are exact matches
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    text = models.TextField()
+    text_hash = models.CharField(max_length=64) # sha256 of the normalized text
+    role = models.CharField(max_length=255)
+    level = models.CharField(max_length=100)
+    type = models.CharField(max_length=100)
+    model_name = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('role', 'level', 'type', 'text_hash')
+        indexes = [
+            models.Index(fields=['role', 'level', 'type', 'created_at'], name='bank_question_tags_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.role} ({self.level}, {self.type}): {self.text[:60]}"
+
+class BankQuestionTech(models.Model):
+    question = models.ForeignKey(BankQuestion, on_delete=models.CASCADE, related_name='techs')
+    name = models.CharField(max_length=50)
+
+    class Meta:
+        unique_together = ('question', 'name')
+        indexes = [
+            models.Index(fields=['name', 'question'], name='bank_tech_name_idx'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+class HRDailyRollup(models.Model):
+    # Per interview owner, per day counters maintained by acharya_ai.rollups;
+    # rebuild with `python manage.py rebuild_hr_rollups`
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_rollups')
+    day = models.DateField()
+    interviews_created = models.IntegerField(default=0)
+    invitations_sent = models.IntegerField(default=0)
+    invitations_completed = models.IntegerField(default=0) # Counted on the day the invitation was completed
+    feedbacks = models.IntegerField(default=0)
+    score_sum = models.BigIntegerField(default=0) # Sum of non-null feedback total_score
+    score_count = models.IntegerField(default=0)
+    # Score distribution of the same feedbacks (see rollups.SCORE_BUCKETS)
+    scores_0_19 = models.IntegerField(default=0)
+    scores_20_39 = models.IntegerField(default=0)
+    scores_40_59 = models.IntegerField(default=0)
+    scores_60_79 = models.IntegerField(default=0)
+    scores_80_100 = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('user', 'day')
+
+    def __str__(self):
+        return f"Rollup for {self.user_id} on {self.day}"
+
+class HRRoleRollup(models.Model):
+    # Interviews per (owner, role), for "popular roles" without a GROUP BY over all interviews
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='role_rollups')
+    role = models.CharField(max_length=255)
+    interviews = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('user', 'role')
+        indexes = [
+            models.Index(fields=['user', '-interviews'], name='role_rollup_popular_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.role}: {self.interviews}"
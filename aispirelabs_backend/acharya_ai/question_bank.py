@@ -0,0 +1,73 @@
+import hashlib
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .cache import normalize_tag
+from .models import BankQuestion, BankQuestionTech
+
+
+def _bank_config():
+    config = {'enabled': True, 'max_age_days': 180, 'candidate_limit': 500}
+    config.update(getattr(settings, 'AI_QUESTION_BANK', {}))
+    return config
+
+
+def bank_enabled():
+    return _bank_config()['enabled']
+
+
+def _tech_tag(tech):
+    # Truncated to the column width on both write and lookup, so long names still match
+    return normalize_tag(tech)[:BankQuestionTech._meta.get_field('name').max_length]
+
+
+def _text_hash(text):
+    return hashlib.sha256(normalize_tag(text).encode('utf-8')).hexdigest()
+
+
+def draw_questions(role, level, type, techstack, count):
+    """
+    Return up to `count` randomly chosen banked questions for this role, level and
+    type whose techstack tags are all within the requested techstack.
+    """
+    config = _bank_config()
+    techs = {_tech_tag(tech) for tech in techstack or []}
+    foreign_tech = BankQuestionTech.objects.filter(question=OuterRef('pk')).exclude(name__in=techs)
+
+    candidates = list(
+        BankQuestion.objects.filter(
+            role=normalize_tag(role),
+            level=normalize_tag(level),
+            type=normalize_tag(type),
+            created_at__gte=timezone.now() - timedelta(days=config['max_age_days']),
+        )
+        .filter(~Exists(foreign_tech))
+        .order_by('-created_at')
+        .values_list('text', flat=True)[:config['candidate_limit']]
+    )
+    return random.sample(candidates, min(int(count), len(candidates)))
+
+
+def add_questions(role, level, type, techstack, questions, model=''):
+    """
+    Store generated questions in the bank, skipping ones it already holds.
+    """
+    tags = {'role': normalize_tag(role), 'level': normalize_tag(level), 'type': normalize_tag(type)}
+    by_hash = {_text_hash(text): text for text in questions if text and text.strip()}
+    if not by_hash:
+        return
+
+    BankQuestion.objects.bulk_create(
+        [BankQuestion(text=text, text_hash=text_hash, model_name=model, **tags) for text_hash, text in by_hash.items()],
+        ignore_conflicts=True
+    )
+    question_ids = BankQuestion.objects.filter(text_hash__in=list(by_hash), **tags).values_list('id', flat=True)
+    techs = sorted({_tech_tag(tech) for tech in techstack or []})
+    BankQuestionTech.objects.bulk_create(
+        [BankQuestionTech(question_id=question_id, name=tech) for question_id in question_ids for tech in techs],
+        ignore_conflicts=True
+    )
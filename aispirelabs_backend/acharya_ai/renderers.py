@@ -0,0 +1,109 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # Optional: FastJSONRenderer falls back to DRF's encoder
+    orjson = None
+
+if orjson is not None:
+    # Z suffix for UTC, like DRF; dict keys that aren't strings (rare) are stringified
+    ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def dumps(data):
+    """
+    Encode `data` to compact UTF-8 JSON bytes, using orjson when available.
+
+    orjson handles UUIDs and datetimes natively; anything else it can't encode
+    (Decimal, lazy translation strings, ...) goes through DRF's JSONEncoder.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, default=JSONEncoder().default, option=ORJSON_OPTIONS)
+        except (orjson.JSONEncodeError, TypeError):
+            # e.g. integers over 64 bits; let the standard library deal with them
+            pass
+    return JSONRenderer().render(data)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer producing the same output through orjson. Indented output
+    (?indent= in the Accept header) still goes through DRF's renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+
+def wants_stream(request):
+    return request.query_params.get('stream', '').lower() == 'true'
+
+
+def stream_results(queryset, serializer, chunk_size=None):
+    """
+    Yield {"results": [...]} as JSON bytes for every row of `queryset`.
+
+    Rows are read with queryset.iterator() and serialized and encoded
+    `chunk_size` at a time, so memory stays flat however long the list is and
+    the first rows go out before the last ones are fetched.
+    """
+    chunk_size = chunk_size or getattr(settings, 'AI_STREAM_CHUNK_SIZE', 500)
+    yield b'{"results":['
+    separator = b''
+    batch = []
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        batch.append(serializer.to_representation(obj))
+        if len(batch) >= chunk_size:
+            yield separator + dumps(batch)[1:-1]
+            separator = b','
+            batch = []
+    if batch:
+        yield separator + dumps(batch)[1:-1]
+    yield b']}'
+
+
+async def astream_results(queryset, serializer, chunk_size=None):
+    """
+    stream_results() for ASGI, where Django would otherwise collect a sync
+    iterator into a list before sending anything.
+
+    Each chunk is fetched and encoded by the sync generator in the shared
+    thread-sensitive executor, so every step uses the same thread (and DB
+    connection and cursor) while the event loop sends what's ready.
+    """
+    chunks = stream_results(queryset, serializer, chunk_size)
+    next_chunk = sync_to_async(next)
+    try:
+        while (chunk := await next_chunk(chunks, None)) is not None:
+            yield chunk
+    finally:
+        # Releases the cursor when the client goes away mid-stream
+        await sync_to_async(chunks.close)()
+
+
+def served_async(request):
+    # DRF wraps the HttpRequest; ASGIRequest means the response is sent from the event loop
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
+
+
+class StreamingJSONResponse(StreamingHttpResponse):
+    """
+    {"results": [...]} streamed from `queryset`. Pass the request so that
+    under ASGI the body is an async iterator that is sent as it's produced.
+    """
+
+    def __init__(self, queryset, serializer, chunk_size=None, request=None, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        if request is not None and served_async(request):
+            content = astream_results(queryset, serializer, chunk_size)
+        else:
+            content = stream_results(queryset, serializer, chunk_size)
+        super().__init__(content, **kwargs)
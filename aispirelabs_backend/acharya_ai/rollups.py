@@ -0,0 +1,299 @@
+from collections import Counter
+from datetime import date, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Feedback, HRDailyRollup, HRRoleRollup, Interview, InterviewInvitation
+from .signals import feedback_completed
+
+# (field, lowest score, highest score) for the score distribution columns
+SCORE_BUCKETS = (
+    ('scores_0_19', 0, 19),
+    ('scores_20_39', 20, 39),
+    ('scores_40_59', 40, 59),
+    ('scores_60_79', 60, 79),
+    ('scores_80_100', 80, 100),
+)
+ROLLUP_COUNTERS = (
+    'interviews_created', 'invitations_sent', 'invitations_completed', 'feedbacks', 'score_sum', 'score_count',
+    *(field for field, _, _ in SCORE_BUCKETS)
+)
+
+
+def rollup_day(value):
+    return timezone.localdate(value) if value else timezone.localdate()
+
+
+def score_bucket(score):
+    for field, low, high in SCORE_BUCKETS:
+        if score <= high:
+            return field
+    return SCORE_BUCKETS[-1][0]
+
+
+def score_deltas(score, sign=1):
+    """
+    Counter changes for adding (or removing) one scored feedback.
+    """
+    if score is None:
+        return {}
+    return {'score_sum': sign * score, 'score_count': sign, score_bucket(score): sign}
+
+
+def _upsert(model, lookup, deltas):
+    """
+    Add `deltas` to the counters of the row matching `lookup`, creating it if needed.
+    Safe under concurrent writers: increments are applied with F() expressions.
+    """
+    deltas = {name: amount for name, amount in deltas.items() if amount}
+    if not deltas:
+        return
+    increments = {name: F(name) + amount for name, amount in deltas.items()}
+    if model.objects.filter(**lookup).update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        # Another writer created the row first
+        model.objects.filter(**lookup).update(**increments)
+
+
+def bump_daily(user_id, day, **deltas):
+    _upsert(HRDailyRollup, {'user_id': user_id, 'day': day}, deltas)
+    invalidate_user_company(user_id)
+
+
+def bump_role(user_id, role, amount):
+    _upsert(HRRoleRollup, {'user_id': user_id, 'role': role}, {'interviews': amount})
+    invalidate_user_company(user_id)
+
+
+def invalidate_user_company(user_id):
+    # Imported lazily: company_analytics imports this module
+    from .company_analytics import invalidate_company_for_user
+
+    # After commit, so a concurrent reader can't re-cache the pre-write totals
+    transaction.on_commit(lambda: invalidate_company_for_user(user_id))
+
+
+def record_interviews(interviews, sign=1):
+    """
+    Count new (or, with sign=-1, deleted) interviews. Call directly after bulk_create,
+    which does not send model signals. One upsert per (owner, day) and (owner, role).
+    """
+    days = Counter((interview.user_id, rollup_day(interview.created_at)) for interview in interviews)
+    roles = Counter((interview.user_id, interview.role) for interview in interviews)
+    for (user_id, day), count in days.items():
+        bump_daily(user_id, day, interviews_created=sign * count)
+    for (user_id, role), count in roles.items():
+        bump_role(user_id, role, sign * count)
+
+
+def record_invitations(invitations, owner_id, sign=1):
+    sent = Counter(rollup_day(invitation.created_at) for invitation in invitations)
+    completed = Counter(
+        rollup_day(invitation.updated_at) for invitation in invitations if invitation.status == 'completed'
+    )
+    for day in sent.keys() | completed.keys():
+        bump_daily(owner_id, day, invitations_sent=sign * sent[day], invitations_completed=sign * completed[day])
+
+
+def _interview_owner(interview_id):
+    return Interview.objects.filter(id=interview_id).values_list('user_id', flat=True).first()
+
+
+def _scored(feedback):
+    return feedback.status == 'completed' and feedback.total_score is not None
+
+
+@receiver(post_init, sender=InterviewInvitation)
+def remember_invitation_status(sender, instance, **kwargs):
+    instance._rollup_status = instance.status
+
+
+@receiver(post_save, sender=Interview)
+def interview_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_interviews([instance])
+
+
+@receiver(post_delete, sender=Interview)
+def interview_deleted(sender, instance, **kwargs):
+    record_interviews([instance], sign=-1)
+
+
+@receiver(post_save, sender=InterviewInvitation)
+def invitation_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_rollup_status', None)
+    instance._rollup_status = instance.status
+    if created:
+        record_invitations([instance], _interview_owner(instance.interview_id))
+    elif (previous == 'completed') != (instance.status == 'completed'):
+        bump_daily(
+            _interview_owner(instance.interview_id), rollup_day(instance.updated_at),
+            invitations_completed=1 if instance.status == 'completed' else -1
+        )
+
+
+@receiver(post_delete, sender=InterviewInvitation)
+def invitation_deleted(sender, instance, **kwargs):
+    owner_id = _interview_owner(instance.interview_id)
+    if owner_id:
+        record_invitations([instance], owner_id, sign=-1)
+
+
+@receiver(post_save, sender=Feedback)
+def feedback_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        bump_daily(
+            _interview_owner(instance.interview_id), rollup_day(instance.created_at),
+            feedbacks=1, **score_deltas(instance.total_score if _scored(instance) else None)
+        )
+
+
+@receiver(feedback_completed)
+def feedback_scored(sender, feedback_id, status, **kwargs):
+    # Deferred scoring fills in total_score with a queryset update(), which sends no post_save
+    if status != 'completed':
+        return
+    feedback = Feedback.objects.filter(id=feedback_id).values(
+        'total_score', 'created_at', 'interview__user_id'
+    ).first()
+    if feedback and feedback['total_score'] is not None:
+        bump_daily(
+            feedback['interview__user_id'], rollup_day(feedback['created_at']), **score_deltas(feedback['total_score'])
+        )
+
+
+@receiver(post_delete, sender=Feedback)
+def feedback_deleted(sender, instance, **kwargs):
+    owner_id = _interview_owner(instance.interview_id)
+    if owner_id:
+        bump_daily(
+            owner_id, rollup_day(instance.created_at),
+            feedbacks=-1, **score_deltas(instance.total_score if _scored(instance) else None, sign=-1)
+        )
+
+
+def rebuild_rollups(user_ids=None, apps=None):
+    """
+    Recompute every rollup row (optionally only for some owners) from the source tables.
+    Pass a migration's `apps` registry to rebuild from the historical models.
+    Returns the number of daily rows written.
+    """
+    if apps is not None:
+        Interview, InterviewInvitation, Feedback, HRDailyRollup, HRRoleRollup = (
+            apps.get_model('acharya_ai', name)
+            for name in ('Interview', 'InterviewInvitation', 'Feedback', 'HRDailyRollup', 'HRRoleRollup')
+        )
+    else:
+        from .models import Feedback, HRDailyRollup, HRRoleRollup, Interview, InterviewInvitation
+    owner_filter = Q(user_id__in=user_ids) if user_ids is not None else Q()
+    interview_owner = Q(interview__user_id__in=user_ids) if user_ids is not None else Q()
+    daily = {}
+
+    def add(user_id, day, **counts):
+        row = daily.setdefault((user_id, day), dict.fromkeys(ROLLUP_COUNTERS, 0))
+        for name, amount in counts.items():
+            row[name] += amount or 0
+
+    for row in Interview.objects.filter(owner_filter).annotate(day=TruncDate('created_at')).values(
+        'user_id', 'day'
+    ).annotate(n=Count('id')).order_by():
+        add(row['user_id'], row['day'], interviews_created=row['n'])
+
+    invitations = InterviewInvitation.objects.filter(interview_owner)
+    for row in invitations.annotate(day=TruncDate('created_at')).values(
+        'interview__user_id', 'day'
+    ).annotate(n=Count('id')).order_by():
+        add(row['interview__user_id'], row['day'], invitations_sent=row['n'])
+    for row in invitations.filter(status='completed').annotate(day=TruncDate('updated_at')).values(
+        'interview__user_id', 'day'
+    ).annotate(n=Count('id')).order_by():
+        add(row['interview__user_id'], row['day'], invitations_completed=row['n'])
+
+    for row in Feedback.objects.filter(interview_owner).annotate(day=TruncDate('created_at')).values(
+        'interview__user_id', 'day'
+    ).annotate(
+        n=Count('id'),
+        total=Sum('total_score', filter=Q(status='completed')),
+        scored=Count('total_score', filter=Q(status='completed')),
+        **{
+            field: Count('id', filter=Q(status='completed', total_score__gte=low, total_score__lte=high))
+            for field, low, high in SCORE_BUCKETS
+        },
+    ).order_by():
+        add(
+            row['interview__user_id'], row['day'], feedbacks=row['n'], score_sum=row['total'], score_count=row['scored'],
+            **{field: row[field] for field, _, _ in SCORE_BUCKETS}
+        )
+
+    from .company_analytics import invalidate_all_companies
+
+    roles = Interview.objects.filter(owner_filter).values('user_id', 'role').annotate(n=Count('id')).order_by()
+
+    with transaction.atomic():
+        transaction.on_commit(invalidate_all_companies)
+        HRDailyRollup.objects.filter(owner_filter).delete()
+        HRRoleRollup.objects.filter(owner_filter).delete()
+        HRDailyRollup.objects.bulk_create([
+            HRDailyRollup(user_id=user_id, day=day, **counts) for (user_id, day), counts in daily.items()
+        ], batch_size=500)
+        HRRoleRollup.objects.bulk_create([
+            HRRoleRollup(user_id=row['user_id'], role=row['role'], interviews=row['n']) for row in roles
+        ], batch_size=500)
+    return len(daily)
+
+
+def period_start(day, bucket):
+    if bucket == 'week':
+        return day - timedelta(days=day.weekday())
+    if bucket == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_period(start, bucket):
+    if bucket == 'week':
+        return start + timedelta(days=7)
+    if bucket == 'month':
+        return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return start + timedelta(days=1)
+
+
+def timeseries(user_id, bucket, start, end):
+    """
+    Rollup counters for [start, end] summed into day/week/month buckets, with
+    empty buckets filled in so charts get a continuous series.
+    """
+    totals = {}
+    for row in HRDailyRollup.objects.filter(user_id=user_id, day__gte=start, day__lte=end).values(
+        'day', *ROLLUP_COUNTERS
+    ):
+        period = totals.setdefault(period_start(row['day'], bucket), dict.fromkeys(ROLLUP_COUNTERS, 0))
+        for name in ROLLUP_COUNTERS:
+            period[name] += row[name]
+
+    series = []
+    current = period_start(start, bucket)
+    while current <= end:
+        counts = totals.get(current, dict.fromkeys(ROLLUP_COUNTERS, 0))
+        for field, _, _ in SCORE_BUCKETS:
+            counts.pop(field)
+        score_count = counts.pop('score_count')
+        score_sum = counts.pop('score_sum')
+        series.append({
+            'period': current,
+            **counts,
+            'average_score': round(score_sum / score_count, 2) if score_count else None,
+        })
+        current = next_period(current, bucket)
+    return series
@@ -1,9 +1,11 @@
 from rest_framework import serializers
 from .models import Interview, Feedback, InterviewInvitation
 from users.serializers import UserSerializer  # To nest user details if needed
+from .fieldsets import SparseFieldsetMixin
+from .invitations import effective_status
 
 
-class InterviewSerializer(serializers.ModelSerializer):
+class InterviewSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     # user = UserSerializer(read_only=True) # Example if you want to show nested user details
     user = serializers.PrimaryKeyRelatedField(
         read_only=True)  # More common: just show user ID
@@ -22,26 +24,26 @@ class InterviewSerializer(serializers.ModelSerializer):
         ]  # User is set in view
 
 
-class FeedbackSerializer(serializers.ModelSerializer):
+class FeedbackSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     # user = UserSerializer(read_only=True)
     # interview = InterviewSerializer(read_only=True) # Could be too verbose, primary keys usually suffice
     user = serializers.PrimaryKeyRelatedField(read_only=True)
     interview = serializers.PrimaryKeyRelatedField(
         queryset=Interview.objects.all(),
         write_only=True)  # For creating feedback
-    interview_id = serializers.UUIDField(source='interview.id', read_only=True)
+    interview_id = serializers.UUIDField(read_only=True)  # The FK column; no join needed
 
     class Meta:
         model = Feedback
         fields = [
-            'id', 'interview', 'interview_id', 'user', 'total_score',
+            'id', 'interview', 'interview_id', 'user', 'status', 'total_score',
             'category_scores', 'strengths', 'areas_for_improvement',
-            'final_assessment', 'created_at'
+            'final_assessment', 'created_at', 'completed_at'
         ]
         read_only_fields = [
-            'id', 'user', 'interview', 'interview_id', 'created_at',
+            'id', 'user', 'interview', 'interview_id', 'status', 'created_at',
             'total_score', 'category_scores', 'strengths',
-            'areas_for_improvement', 'final_assessment'
+            'areas_for_improvement', 'final_assessment', 'completed_at'
         ]
         # AI generates score fields, interview ID is for write_only linking
 
@@ -68,6 +70,10 @@ class CreateInterviewSerializer(serializers.Serializer):
                                              required=False,
                                              allow_empty=True)
     resume_url = serializers.CharField(required=False, allow_blank=True)
+    # Save the interview immediately and generate questions in the background
+    async_generation = serializers.BooleanField(default=False)
+    # Set to false to skip the question cache and always ask the model
+    use_cache = serializers.BooleanField(default=True)
 
 
 class TranscriptItemSerializer(serializers.Serializer):
@@ -75,7 +81,7 @@ class TranscriptItemSerializer(serializers.Serializer):
     content = serializers.CharField()
 
 
-class InterviewInvitationSerializer(serializers.ModelSerializer):
+class InterviewInvitationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     interview_title = serializers.CharField(source='interview.title',
                                             read_only=True)
     interview_role = serializers.CharField(source='interview.role',
@@ -90,7 +96,19 @@ class InterviewInvitationSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'invitation_token', 'created_at']
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if 'status' in data:
+            data['status'] = effective_status(instance.status, instance.expires_at)
+        return data
+
+
+class ExtendInvitationSerializer(serializers.Serializer):
+    days = serializers.IntegerField(min_value=1, max_value=365, required=False)
+
 
 class CreateFeedbackSerializer(serializers.Serializer):
     interview_id = serializers.UUIDField()
     transcript = serializers.ListField(child=TranscriptItemSerializer())
+    # Return a pending feedback row immediately and score it in the background
+    async_generation = serializers.BooleanField(default=False)
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent when background AI scoring of a Feedback row finishes.
+# Arguments: feedback_id, status ('completed' or 'failed')
+feedback_completed = Signal()
@@ -0,0 +1,218 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .helpers import (
+    FEEDBACK_REQUIRED_FIELDS, FeedbackResponse, build_feedback_prompt, fallback_feedback,
+    generate_feedback_ai, get_gemini_model, scoring_slots, validate_feedback
+)
+from .integrations import get_gemini
+from .invitations import complete_candidate_invitation
+from .metrics import record_fallback, record_usage, track_ai_call
+from .transcript import compact_transcript, transcript_tokens
+from .models import Feedback, Interview
+from .serializers import CreateFeedbackSerializer, FeedbackSerializer
+from .tasks import get_pool, generate_feedback_job, save_feedback_result
+
+
+class IncrementalObjectParser:
+    """
+    Incrementally parses a streamed JSON object and reports each top-level
+    member as soon as its value is complete.
+
+    feed() takes the next chunk of text and returns the (key, value) pairs that
+    chunk completed. Anything before the opening brace is ignored.
+    """
+
+    def __init__(self):
+        self.buffer = ''
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.member_start = None
+
+    def feed(self, text):
+        self.buffer += text
+        completed = []
+        while self.pos < len(self.buffer):
+            char = self.buffer[self.pos]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == '\\':
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in '{[':
+                self.depth += 1
+                if self.depth == 1:
+                    self.member_start = self.pos + 1
+            elif char in '}]':
+                if self.depth == 1:
+                    completed.extend(self._member(self.pos))
+                self.depth -= 1
+            elif char == ',' and self.depth == 1:
+                completed.extend(self._member(self.pos))
+                self.member_start = self.pos + 1
+            self.pos += 1
+        return completed
+
+    def _member(self, end):
+        text = self.buffer[self.member_start:end].strip()
+        if not text:
+            return []
+        try:
+            return list(json.loads('{' + text + '}').items())
+        except ValueError:
+            return []
+
+
+def sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, cls=JSONEncoder)}\n\n"
+
+
+def authenticate_jwt(request):
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
+
+def load_feedback(feedback_id):
+    return FeedbackSerializer(Feedback.objects.get(id=feedback_id)).data
+
+
+def finish_in_background(feedback_id):
+    try:
+        get_pool('feedback').submit(feedback_id, generate_feedback_job, feedback_id)
+    except Exception as e:
+        print(f"WARN: Could not hand off feedback {feedback_id} after stream ended early: {e}")
+
+
+FALLBACK_MESSAGE = 'AI evaluation failed, the feedback was saved as failed.'
+
+
+async def stream_feedback_events(feedback_id, transcript, interview_role):
+    """
+    Yield server-sent events while Gemini scores the transcript.
+
+    Events: 'started' with the pending feedback id, one 'field' per completed
+    top-level field of the FeedbackResponse, optionally 'error' when the model
+    fails (the feedback is then saved as failed), and finally 'complete' with the
+    persisted feedback. If the client disconnects first, scoring is finished by
+    the background feedback pool.
+    """
+    finished = False
+    try:
+        yield sse('started', {'id': feedback_id, 'status': 'pending'})
+
+        budget = getattr(settings, 'AI_FEEDBACK_TOKEN_BUDGET', 12000)
+        turns = compact_transcript(transcript, budget)
+        slots = scoring_slots()
+        if not turns or transcript_tokens(turns) > budget or not slots.acquire(blocking=False):
+            # Empty, too long to score in one streamed call, or every scoring slot is
+            # taken; long transcripts go through the chunked map-reduce path, busy
+            # ones wait for a slot off the event loop, and both arrive all at once
+            result = await sync_to_async(generate_feedback_ai, thread_sensitive=False)(transcript, interview_role)
+            if result.get('fallback'):
+                yield sse('error', {'message': FALLBACK_MESSAGE})
+            else:
+                for name in FEEDBACK_REQUIRED_FIELDS:
+                    yield sse('field', {'name': name, 'value': result[name]})
+        else:
+            result = {}
+            parser = IncrementalObjectParser()
+            model = get_gemini_model()
+            try:
+                with track_ai_call('feedback_stream', model):
+                    chunks = get_gemini().stream_content(
+                        model=model,
+                        contents=build_feedback_prompt(turns, interview_role),
+                        config={
+                            "response_mime_type": "application/json",
+                            "response_schema": FeedbackResponse
+                        }
+                    )
+                    last_chunk = None
+                    async for chunk in chunks:
+                        last_chunk = chunk
+                        for name, value in parser.feed(chunk.text or ''):
+                            result[name] = value
+                            yield sse('field', {'name': name, 'value': value})
+                    # Usage metadata is cumulative; the final chunk carries the totals
+                    record_usage('feedback_stream', model, last_chunk)
+                    validate_feedback(result)
+            except Exception as e:
+                print(f"Error during Gemini AI streaming call for feedback: {e}")
+                record_fallback('feedback_stream', model, e)
+                result = fallback_feedback(e)
+                yield sse('error', {'message': FALLBACK_MESSAGE})
+            finally:
+                slots.release()
+
+        await sync_to_async(save_feedback_result)(feedback_id, result)
+        feedback = await sync_to_async(load_feedback)(feedback_id)
+        finished = True
+        yield sse('complete', feedback)
+    finally:
+        if not finished:
+            finish_in_background(feedback_id)
+
+
+@csrf_exempt
+@require_POST
+async def feedback_stream_view(request):
+    """
+    Streaming variant of FeedbackCreateView, served as text/event-stream.
+
+    Intended to run under ASGI so the open stream doesn't hold a worker thread.
+    Takes the same JSON body as feedback/create/ and a Bearer JWT.
+    """
+    user = await sync_to_async(authenticate_jwt)(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+    try:
+        payload = json.loads(request.body or b'{}')
+    except ValueError:
+        return JsonResponse({'error': 'Invalid JSON body'}, status=400)
+    serializer = CreateFeedbackSerializer(data=payload)
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=400)
+    data = serializer.validated_data
+
+    interview = await Interview.objects.filter(id=data['interview_id']).only('id', 'role').afirst()
+    if interview is None:
+        return JsonResponse({'error': 'Interview not found'}, status=404)
+
+    transcript = [dict(item) for item in data['transcript']]
+    existing_attempts = await Feedback.objects.filter(interview=interview, user=user).acount()
+    feedback = await Feedback.objects.acreate(
+        interview=interview,
+        user=user,
+        status='pending',
+        transcript=transcript,
+        attempt_number=existing_attempts + 1,
+        queued_at=timezone.now()
+    )
+    await sync_to_async(complete_candidate_invitation)(interview, user)
+
+    response = StreamingHttpResponse(
+        stream_feedback_events(feedback.id, transcript, interview.role),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
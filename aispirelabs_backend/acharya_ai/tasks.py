@@ -0,0 +1,492 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .helpers import fallback_questions, generate_interview_questions_ai, generate_feedback_ai
+from .models import Interview, Feedback
+from .signals import feedback_completed
+
+
+class QueueFull(Exception):
+    """Raised when a job pool has no free worker or queue slot."""
+
+
+class JobRecord:
+    def __init__(self, job_id, name):
+        self.job_id = str(job_id)
+        self.name = name
+        self.status = 'queued'
+        self.error = None
+        self.enqueued_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def wait_time(self):
+        if self.started_at is None:
+            return time.monotonic() - self.enqueued_at
+        return self.started_at - self.enqueued_at
+
+    @property
+    def run_time(self):
+        if self.started_at is None:
+            return None
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    def as_dict(self):
+        run_time = self.run_time
+        return {
+            'job_id': self.job_id,
+            'name': self.name,
+            'status': self.status,
+            'error': self.error,
+            'wait_seconds': round(self.wait_time, 3),
+            'run_seconds': round(run_time, 3) if run_time is not None else None,
+        }
+
+
+class JobPool:
+    """
+    A bounded pool of worker threads for slow background work (AI calls).
+
+    At most `workers` jobs run at once and at most `queue_depth` more wait for a
+    free worker; anything beyond that is rejected with QueueFull instead of
+    queueing without limit. Recent job records and latency samples are kept in
+    memory so they can be reported through stats().
+    """
+
+    MAX_TRACKED_JOBS = 1000
+    LATENCY_SAMPLES = 256
+
+    def __init__(self, name, workers=4, queue_depth=32, slow_threshold=15.0):
+        self.name = name
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.slow_threshold = slow_threshold
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(workers + queue_depth)
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        self._latencies = deque(maxlen=self.LATENCY_SAMPLES)
+        self._counters = {
+            'submitted': 0, 'completed': 0, 'failed': 0, 'rejected': 0, 'slow': 0,
+        }
+        self._queued = 0
+        self._running = 0
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers,
+                        thread_name_prefix=f'ai-{self.name}',
+                    )
+        return self._executor
+
+    def submit(self, job_id, fn, *args, **kwargs):
+        """
+        Queue fn(*args, **kwargs) under job_id. Raises QueueFull when the pool is saturated.
+        """
+        record = JobRecord(job_id, self.name)
+
+        if getattr(settings, 'AI_JOBS_EAGER', False):
+            self._track(record, queued=False)
+            self._run(record, fn, args, kwargs, eager=True)
+            return record
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._counters['rejected'] += 1
+            raise QueueFull(f"AI job pool '{self.name}' is full")
+
+        self._track(record, queued=True)
+        try:
+            self._get_executor().submit(self._run, record, fn, args, kwargs)
+        except Exception:
+            with self._lock:
+                self._queued -= 1
+            self._slots.release()
+            raise
+        return record
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(str(job_id))
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            counters = dict(self._counters)
+            queued, running = self._queued, self._running
+
+        latency = {'samples': len(latencies), 'avg': None, 'p50': None, 'p95': None, 'max': None}
+        if latencies:
+            latency.update({
+                'avg': round(sum(latencies) / len(latencies), 3),
+                'p50': round(latencies[len(latencies) // 2], 3),
+                'p95': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3),
+                'max': round(latencies[-1], 3),
+            })
+
+        return {
+            'name': self.name,
+            'workers': self.workers,
+            'queue_depth': self.queue_depth,
+            'slow_threshold': self.slow_threshold,
+            'queued': queued,
+            'running': running,
+            **counters,
+            'latency_seconds': latency,
+        }
+
+    def _track(self, record, queued):
+        with self._lock:
+            self._counters['submitted'] += 1
+            if queued:
+                self._queued += 1
+            self._jobs[record.job_id] = record
+            self._jobs.move_to_end(record.job_id)
+            while len(self._jobs) > self.MAX_TRACKED_JOBS:
+                self._jobs.popitem(last=False)
+
+    def _run(self, record, fn, args, kwargs, eager=False):
+        with self._lock:
+            if not eager:
+                self._queued -= 1
+            self._running += 1
+        record.started_at = time.monotonic()
+        record.status = 'running'
+        try:
+            fn(*args, **kwargs)
+            record.status = 'done'
+        except Exception as e:
+            record.status = 'failed'
+            record.error = str(e)[:200]
+            print(f"Error in AI job {record.name}:{record.job_id}: {e}")
+        finally:
+            record.finished_at = time.monotonic()
+            latency = record.finished_at - record.enqueued_at
+            with self._lock:
+                self._running -= 1
+                self._counters['failed' if record.status == 'failed' else 'completed'] += 1
+                self._latencies.append(latency)
+                if latency > self.slow_threshold:
+                    self._counters['slow'] += 1
+            if latency > self.slow_threshold:
+                print(f"WARN: AI job {record.name}:{record.job_id} took {latency:.1f}s")
+            if not eager:
+                # Worker threads hold their own DB connections; don't leak them
+                close_old_connections()
+                self._slots.release()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name):
+    """
+    Return the process-wide JobPool called `name`, configured from settings.AI_JOB_POOLS.
+    """
+    pool = _pools.get(name)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(name)
+            if pool is None:
+                config = getattr(settings, 'AI_JOB_POOLS', {}).get(name, {})
+                pool = JobPool(
+                    name,
+                    workers=config.get('workers', 4),
+                    queue_depth=config.get('queue_depth', 32),
+                    slow_threshold=config.get('slow_threshold', 15.0),
+                )
+                _pools[name] = pool
+    return pool
+
+
+def pool_stats():
+    return [get_pool(name).stats() for name in getattr(settings, 'AI_JOB_POOLS', {})]
+
+
+class PeriodicJob:
+    """
+    Calls fn() every `interval` seconds on a daemon thread, for in-process
+    scheduling when no cron or worker is available. Errors are logged and the
+    next run goes ahead as usual.
+    """
+
+    def __init__(self, name, interval, fn):
+        self.name = name
+        self.interval = interval
+        self.fn = fn
+        self.runs = 0
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name=f'periodic-{self.name}', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.fn()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)[:200]
+                print(f"WARN: Periodic job {self.name} failed: {e}")
+            finally:
+                self.runs += 1
+                close_old_connections()
+
+
+_periodic_jobs = {}
+
+
+def schedule(name, interval, fn):
+    """
+    Start the process-wide PeriodicJob `name` (once; later calls return the running job).
+    """
+    with _pools_lock:
+        job = _periodic_jobs.get(name)
+        if job is None:
+            job = _periodic_jobs[name] = PeriodicJob(name, interval, fn).start()
+    return job
+
+
+def run_concurrently(fn, calls, max_workers):
+    """
+    Run fn(*args, **kwargs) for each (args, kwargs) in calls on a short-lived pool
+    of at most max_workers threads. Returns results in call order; a call that
+    raised yields its exception instead of a result.
+    """
+    inline = getattr(settings, 'AI_JOBS_EAGER', False) or len(calls) <= 1
+
+    def call(args, kwargs):
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            return e
+        finally:
+            if not inline:
+                # Worker threads hold their own DB connections; don't leak them
+                close_old_connections()
+
+    if inline:
+        return [call(args, kwargs) for args, kwargs in calls]
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(calls))), thread_name_prefix='ai-batch') as executor:
+        futures = [executor.submit(call, args, kwargs) for args, kwargs in calls]
+        return [future.result() for future in futures]
+
+
+def generate_interview_questions_job(interview_id, role, level, techstack, type, max_questions, use_cache=True):
+    """
+    Fill in the questions of an interview created in async mode and mark it finalized.
+    """
+    questions = generate_interview_questions_ai(
+        role=role,
+        level=level,
+        techstack=techstack,
+        type=type,
+        max_questions=max_questions,
+        use_cache=use_cache
+    )
+    Interview.objects.filter(id=interview_id).update(
+        questions=questions,
+        finalized=True,
+        updated_at=timezone.now()
+    )
+
+
+def generate_feedback_job(feedback_id):
+    """
+    Score the stored transcript of a pending Feedback row and save the result.
+    """
+    feedback = Feedback.objects.filter(id=feedback_id, status='pending').values(
+        'transcript', 'interview__role'
+    ).first()
+    if feedback is None:
+        return
+
+    try:
+        ai_feedback_data = generate_feedback_ai(feedback['transcript'], interview_role=feedback['interview__role'])
+    except Exception:
+        Feedback.objects.filter(id=feedback_id).update(status='failed', completed_at=timezone.now())
+        feedback_completed.send(sender=Feedback, feedback_id=feedback_id, status='failed')
+        raise
+
+    save_feedback_result(feedback_id, ai_feedback_data)
+
+
+def feedback_result_fields(ai_feedback_data):
+    """
+    Feedback model fields for an AI feedback dict. Fallback feedback (the AI call
+    failed) keeps its explanation but is stored as failed, without scores, so it
+    never counts towards averages or rollups.
+    """
+    if ai_feedback_data.get('fallback'):
+        return {
+            'status': 'failed',
+            'total_score': None,
+            'category_scores': [],
+            'strengths': [],
+            'areas_for_improvement': ai_feedback_data.get('areasForImprovement', []),
+            'final_assessment': ai_feedback_data.get('finalAssessment', ''),
+            'completed_at': timezone.now(),
+        }
+    return {
+        'status': 'completed',
+        'total_score': ai_feedback_data.get('totalScore', 0),
+        'category_scores': ai_feedback_data.get('categoryScores', []),
+        'strengths': ai_feedback_data.get('strengths', []),
+        'areas_for_improvement': ai_feedback_data.get('areasForImprovement', []),
+        'final_assessment': ai_feedback_data.get('finalAssessment', 'No assessment available.'),
+        'completed_at': timezone.now(),
+    }
+
+
+def save_feedback_result(feedback_id, ai_feedback_data):
+    """
+    Store AI feedback on a pending Feedback row and notify feedback_completed listeners.
+    """
+    fields = feedback_result_fields(ai_feedback_data)
+    Feedback.objects.filter(id=feedback_id).update(**fields)
+    feedback_completed.send(sender=Feedback, feedback_id=feedback_id, status=fields['status'])
+
+
+def recovery_config():
+    config = {'interval_seconds': 300, 'stale_seconds': 900, 'fail_after_seconds': 24 * 3600, 'batch_size': 100}
+    config.update(getattr(settings, 'AI_JOB_RECOVERY', {}))
+    return config
+
+
+def recover_feedback_jobs(config=None):
+    """
+    Re-queue pending feedback whose scoring job was lost with its process
+    (restart, deploy). Returns (requeued, failed).
+
+    Rows last queued more than stale_seconds ago are claimed by moving
+    queued_at forward in a conditional UPDATE, so when several processes sweep
+    at once each row is re-queued by only one of them. Rows created more than
+    fail_after_seconds ago are marked failed instead, so clients polling them
+    stop waiting.
+    """
+    config = config or recovery_config()
+    now = timezone.now()
+    pool = get_pool('feedback')
+    stale = Feedback.objects.filter(status='pending', queued_at__lte=now - timedelta(seconds=config['stale_seconds']))
+    # Rows from before queued_at existed count as stale
+    rows = list(
+        (stale | Feedback.objects.filter(status='pending', queued_at=None))
+        .order_by('created_at').values_list('id', 'queued_at', 'created_at')[:config['batch_size']]
+    )
+
+    requeued = failed = 0
+    for feedback_id, queued_at, created_at in rows:
+        record = pool.get(feedback_id)
+        if record and record.status in ('queued', 'running'):
+            continue
+        claim = Feedback.objects.filter(id=feedback_id, status='pending', queued_at=queued_at)
+        if created_at <= now - timedelta(seconds=config['fail_after_seconds']):
+            if claim.update(status='failed', completed_at=now):
+                feedback_completed.send(sender=Feedback, feedback_id=feedback_id, status='failed')
+                failed += 1
+            continue
+        if not claim.update(queued_at=now):
+            continue
+        try:
+            pool.submit(feedback_id, generate_feedback_job, feedback_id)
+        except QueueFull:
+            # Leave it (and the rest) for the next sweep
+            Feedback.objects.filter(id=feedback_id, queued_at=now).update(queued_at=queued_at)
+            break
+        requeued += 1
+    return requeued, failed
+
+
+# Question count for interviews saved before max_questions was stored
+RECOVERED_QUESTION_COUNT = 5
+
+
+def recover_interview_jobs(config=None):
+    """
+    Re-queue question generation for async interviews left unfinalized by a
+    lost job. Returns (requeued, failed).
+
+    Interviews last updated more than stale_seconds ago are claimed by moving
+    updated_at forward in a conditional UPDATE, as in recover_feedback_jobs().
+    Ones created more than fail_after_seconds ago are finalized with the
+    fallback questions, as a generation that failed outright would be.
+    """
+    config = config or recovery_config()
+    now = timezone.now()
+    pool = get_pool('questions')
+    rows = list(
+        Interview.objects.filter(finalized=False, updated_at__lte=now - timedelta(seconds=config['stale_seconds']))
+        .order_by('updated_at')
+        .values('id', 'role', 'level', 'techstack', 'type', 'max_questions', 'created_at', 'updated_at')[:config['batch_size']]
+    )
+
+    requeued = failed = 0
+    for interview in rows:
+        record = pool.get(interview['id'])
+        if record and record.status in ('queued', 'running'):
+            continue
+        claim = Interview.objects.filter(id=interview['id'], finalized=False, updated_at=interview['updated_at'])
+        max_questions = interview['max_questions'] or RECOVERED_QUESTION_COUNT
+        if interview['created_at'] <= now - timedelta(seconds=config['fail_after_seconds']):
+            questions = fallback_questions(interview['role'], interview['type'], interview['techstack'])[:max_questions]
+            failed += claim.update(questions=questions, finalized=True, updated_at=now)
+            continue
+        if not claim.update(updated_at=now):
+            continue
+        try:
+            pool.submit(
+                interview['id'],
+                generate_interview_questions_job,
+                interview['id'],
+                role=interview['role'],
+                level=interview['level'],
+                techstack=interview['techstack'],
+                type=interview['type'],
+                max_questions=max_questions,
+            )
+        except QueueFull:
+            # Leave it (and the rest) for the next sweep
+            Interview.objects.filter(id=interview['id'], updated_at=now).update(updated_at=interview['updated_at'])
+            break
+        requeued += 1
+    return requeued, failed
+
+
+def recover_jobs(config=None):
+    """
+    Run every recovery sweep; returns {job kind: (requeued, failed)}.
+    """
+    config = config or recovery_config()
+    return {'interviews': recover_interview_jobs(config), 'feedback': recover_feedback_jobs(config)}
+
+
+def schedule_recovery():
+    """
+    Run recover_jobs() every AI_JOB_RECOVERY interval_seconds in this process
+    (off when 0, e.g. when the recover_ai_jobs command runs from cron).
+    """
+    interval = recovery_config()['interval_seconds']
+    if interval > 0:
+        return schedule('recover_ai_jobs', interval, recover_jobs)
+    return None
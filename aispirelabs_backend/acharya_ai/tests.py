@@ -1,9 +1,37 @@
+import json
+import re
+from asgiref.sync import iscoroutinefunction
+import threading
+import time
+from datetime import timedelta
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
 from django.contrib.auth import get_user_model
-from acharya_ai.models import Interview, Feedback
-from unittest.mock import patch # For mocking AI helper functions
+from acharya_ai.models import Interview, Feedback, InterviewInvitation, QuestionCacheEntry, BankQuestion, HRDailyRollup
+from users.models import OutboxEmail
+from acharya_ai.question_bank import draw_questions
+from acharya_ai.cache import clear_question_cache
+from acharya_ai.invitations import clear_token_caches
+from acharya_ai.company_analytics import invalidate_company_for_user
+from acharya_ai.helpers import generate_interview_questions_ai, generate_feedback_ai, request_interview_questions
+from acharya_ai.fake_gemini import FakeGeminiServer, FaultProfile
+from acharya_ai import metrics
+from acharya_ai.signals import feedback_completed
+from acharya_ai.integrations import CircuitBreaker, CircuitOpenError, GeminiGateway
+from acharya_ai.streaming import IncrementalObjectParser
+from acharya_ai.transcript import chunk_transcript, compact_transcript, transcript_tokens
+from rest_framework_simplejwt.tokens import AccessToken
+from google.genai import errors as genai_errors
+from acharya_ai.tasks import JobPool, QueueFull, save_feedback_result
+from django.core.management import call_command
+from django.core.cache import cache
+from io import StringIO
+from unittest.mock import Mock, patch # For mocking AI helper functions
 
 UserModel = get_user_model()
 
@@ -58,7 +86,8 @@ class AcharyaAITests(APITestCase):
             level=self.interview_data['level'],
             techstack=self.interview_data['techstack'],
             type=self.interview_data['type'],
-            max_questions=self.interview_data['max_questions']
+            max_questions=self.interview_data['max_questions'],
+            use_cache=True
         )
         mock_get_cover.assert_called_once()
 
@@ -128,3 +157,1695 @@ class AcharyaAITests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]['total_score'], 70)
+
+
+@override_settings(AI_JOBS_EAGER=True)
+class AsyncInterviewCreationTests(APITestCase):
+    def setUp(self):
+        self.user = UserModel.objects.create_user(username='hruser', email='hr@example.com', password='password123', user_type='hr')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.interview_data = {
+            "role": "Backend Engineer",
+            "type": "technical",
+            "level": "mid",
+            "techstack": ["Python", "Django"],
+            "max_questions": 3,
+            "async_generation": True,
+        }
+
+    @patch('acharya_ai.tasks.generate_interview_questions_ai')
+    def test_async_create_returns_accepted_and_fills_questions(self, mock_generate_questions):
+        mock_generate_questions.return_value = ["Q1", "Q2", "Q3"]
+
+        response = self.client.post(reverse('create_interview'), self.interview_data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        interview = Interview.objects.get(id=response.data['id'])
+        self.assertTrue(interview.finalized)
+        self.assertEqual(interview.questions, ["Q1", "Q2", "Q3"])
+
+        status_response = self.client.get(reverse('interview_status', kwargs={'pk': interview.id}))
+        self.assertEqual(status_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(status_response.data['status'], 'ready')
+        self.assertEqual(status_response.data['question_count'], 3)
+
+    @patch('acharya_ai.tasks.generate_interview_questions_ai')
+    def test_failed_job_is_reported(self, mock_generate_questions):
+        mock_generate_questions.side_effect = RuntimeError("boom")
+
+        response = self.client.post(reverse('create_interview'), self.interview_data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        status_response = self.client.get(reverse('interview_status', kwargs={'pk': response.data['id']}))
+        self.assertEqual(status_response.data['status'], 'failed')
+        self.assertFalse(status_response.data['finalized'])
+
+    def test_busy_pool_invites_nobody(self):
+        data = dict(self.interview_data, candidate_emails=['busy1@example.com', 'busy2@example.com'])
+        with patch('acharya_ai.tasks.JobPool.submit', side_effect=QueueFull("full")):
+            response = self.client.post(reverse('create_interview'), data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(Interview.objects.exists())
+        self.assertFalse(InterviewInvitation.objects.exists())
+        # No email may point at a token that was never kept
+        self.assertFalse(OutboxEmail.objects.exists())
+
+    @patch('acharya_ai.tasks.generate_interview_questions_ai')
+    def test_async_create_invites_candidates(self, mock_generate_questions):
+        mock_generate_questions.return_value = ["Q1", "Q2", "Q3"]
+        data = dict(self.interview_data, candidate_emails=['invitee@example.com'])
+        response = self.client.post(reverse('create_interview'), data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(InterviewInvitation.objects.get(interview_id=response.data['id']).candidate_email, 'invitee@example.com')
+        self.assertEqual(OutboxEmail.objects.get().to_email, 'invitee@example.com')
+
+    @patch('acharya_ai.tasks.generate_interview_questions_ai')
+    def test_recovery_requeues_interviews_lost_on_restart(self, mock_generate_questions):
+        mock_generate_questions.return_value = ["Q1", "Q2", "Q3"]
+        with patch('acharya_ai.tasks.JobPool.submit'):
+            # The process exits before the job runs
+            lost_id = self.client.post(reverse('create_interview'), self.interview_data, format='json').data['id']
+            abandoned_id = self.client.post(reverse('create_interview'), self.interview_data, format='json').data['id']
+        now = timezone.now()
+        Interview.objects.filter(id=lost_id).update(updated_at=now - timedelta(hours=1))
+        Interview.objects.filter(id=abandoned_id).update(updated_at=now - timedelta(days=2), created_at=now - timedelta(days=2))
+
+        out = StringIO()
+        call_command('recover_ai_jobs', stdout=out)
+        self.assertIn("interviews: requeued 1, failed 1", out.getvalue())
+
+        status_response = self.client.get(reverse('interview_status', kwargs={'pk': lost_id}))
+        self.assertEqual(status_response.data['status'], 'ready')
+        self.assertEqual(mock_generate_questions.call_args.kwargs['max_questions'], 3)
+        self.assertEqual(Interview.objects.get(id=lost_id).questions, ["Q1", "Q2", "Q3"])
+        # Given up on: finalized with the fallback questions
+        abandoned = Interview.objects.get(id=abandoned_id)
+        self.assertTrue(abandoned.finalized)
+        self.assertEqual(len(abandoned.questions), 3)
+
+
+class JobPoolTests(SimpleTestCase):
+    def test_rejects_when_workers_and_queue_are_full(self):
+        pool = JobPool('test', workers=1, queue_depth=1)
+        release = threading.Event()
+
+        pool.submit('a', release.wait)
+        pool.submit('b', release.wait)
+        with self.assertRaises(QueueFull):
+            pool.submit('c', release.wait)
+
+        release.set()
+        pool._executor.shutdown(wait=True)
+        stats = pool.stats()
+        self.assertEqual(stats['completed'], 2)
+        self.assertEqual(stats['rejected'], 1)
+        self.assertEqual(stats['latency_seconds']['samples'], 2)
+
+
+@override_settings(AI_QUESTION_BANK={'enabled': False})
+class QuestionCacheTests(TestCase):
+    def setUp(self):
+        clear_question_cache()
+        self.addCleanup(clear_question_cache)
+        self.args = dict(role="Backend Engineer", level="mid", techstack=["Python", "Django"], type="technical", max_questions=2)
+
+    @patch('acharya_ai.helpers.request_interview_questions')
+    def test_equivalent_inputs_hit_cache(self, mock_request):
+        mock_request.return_value = ["Q1", "Q2"]
+
+        first = generate_interview_questions_ai(**self.args)
+        second = generate_interview_questions_ai(
+            role=" backend  engineer", level="MID", techstack=["django", "python", "Python"],
+            type="Technical", max_questions=2
+        )
+
+        self.assertEqual(first, ["Q1", "Q2"])
+        self.assertEqual(second, ["Q1", "Q2"])
+        self.assertEqual(mock_request.call_count, 1)
+
+    @patch('acharya_ai.helpers.request_interview_questions')
+    def test_database_tier_survives_process_cache_loss(self, mock_request):
+        mock_request.return_value = ["Q1", "Q2"]
+        generate_interview_questions_ai(**self.args)
+        clear_question_cache()
+
+        self.assertEqual(generate_interview_questions_ai(**self.args), ["Q1", "Q2"])
+        self.assertEqual(mock_request.call_count, 1)
+        self.assertEqual(QuestionCacheEntry.objects.get().hits, 1)
+
+    @patch('acharya_ai.helpers.request_interview_questions')
+    def test_opt_out_and_fallbacks_skip_cache(self, mock_request):
+        mock_request.side_effect = RuntimeError("unavailable")
+        generate_interview_questions_ai(**self.args)
+        self.assertFalse(QuestionCacheEntry.objects.exists())
+
+        mock_request.side_effect = None
+        mock_request.return_value = ["Q1", "Q2"]
+        generate_interview_questions_ai(**self.args)
+        generate_interview_questions_ai(**self.args, use_cache=False)
+        self.assertEqual(mock_request.call_count, 3)
+
+    @override_settings(AI_QUESTION_CACHE={'db_max_entries': 2}, AI_QUESTION_BANK={'enabled': False})
+    @patch('acharya_ai.helpers.request_interview_questions')
+    def test_database_tier_is_size_bounded(self, mock_request):
+        mock_request.return_value = ["Q1"]
+        for count in range(1, 5):
+            generate_interview_questions_ai(**{**self.args, 'max_questions': count})
+        self.assertEqual(QuestionCacheEntry.objects.count(), 2)
+
+
+@override_settings(AI_JOBS_EAGER=True)
+class DeferredFeedbackTests(APITestCase):
+    def setUp(self):
+        self.user = UserModel.objects.create_user(username='candidate', email='candidate@example.com', password='password123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.interview = Interview.objects.create(
+            user=self.user, role="Data Scientist", type="technical", level="senior",
+            techstack=["Python"], questions=["Q1"]
+        )
+        self.payload = {
+            "interview_id": str(self.interview.id),
+            "transcript": [{"role": "interviewer", "content": "Q1"}, {"role": "candidate", "content": "A1"}],
+            "async_generation": True,
+        }
+
+    @patch('acharya_ai.tasks.generate_feedback_ai')
+    def test_async_feedback_is_scored_and_pollable(self, mock_generate_feedback):
+        mock_generate_feedback.return_value = {
+            "totalScore": 72,
+            "categoryScores": [{"name": "Technical", "score": 72, "comment": "Solid"}],
+            "strengths": ["Depth"],
+            "areasForImprovement": ["Brevity"],
+            "finalAssessment": "Good.",
+        }
+        notifications = []
+        def receiver(sender, feedback_id, status, **kwargs):
+            notifications.append((feedback_id, status))
+        feedback_completed.connect(receiver)
+        self.addCleanup(feedback_completed.disconnect, receiver)
+
+        response = self.client.post(reverse('create_feedback'), self.payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        feedback = Feedback.objects.get(id=response.data['id'])
+        self.assertEqual(feedback.transcript, self.payload['transcript'])
+        self.assertEqual(feedback.status, 'completed')
+        self.assertEqual(feedback.total_score, 72)
+        self.assertEqual(notifications, [(feedback.id, 'completed')])
+
+        poll = self.client.get(reverse('feedback_detail', kwargs={'pk': feedback.id}))
+        self.assertEqual(poll.status_code, status.HTTP_200_OK)
+        self.assertEqual(poll.data['status'], 'completed')
+        self.assertEqual(poll.data['total_score'], 72)
+
+    @patch('acharya_ai.helpers.score_transcript', side_effect=RuntimeError("Gemini unavailable"))
+    def test_fallback_feedback_is_failed_and_unscored(self, mock_score):
+        notifications = []
+        def receiver(sender, feedback_id, status, **kwargs):
+            notifications.append((feedback_id, status))
+        feedback_completed.connect(receiver)
+        self.addCleanup(feedback_completed.disconnect, receiver)
+
+        response = self.client.post(reverse('create_feedback'), self.payload, format='json')
+
+        feedback = Feedback.objects.get(id=response.data['id'])
+        self.assertEqual(feedback.status, 'failed')
+        self.assertIsNone(feedback.total_score)
+        self.assertIn("contact support", feedback.final_assessment)
+        self.assertEqual(notifications, [(feedback.id, 'failed')])
+
+        synchronous = self.client.post(reverse('create_feedback'), {**self.payload, 'async_generation': False}, format='json')
+        self.assertEqual(synchronous.data['status'], 'failed')
+        self.assertIsNone(synchronous.data['total_score'])
+
+        rollup = HRDailyRollup.objects.get(user=self.user)
+        self.assertEqual((rollup.feedbacks, rollup.score_count, rollup.score_sum), (2, 0, 0))
+
+    def test_feedback_detail_hidden_from_other_users(self):
+        feedback = Feedback.objects.create(interview=self.interview, user=self.user, status='pending')
+        other = UserModel.objects.create_user(username='other', email='other@example.com', password='password123')
+        self.client.force_authenticate(user=other)
+
+        response = self.client.get(reverse('feedback_detail', kwargs={'pk': feedback.id}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+    @patch('acharya_ai.tasks.generate_feedback_ai')
+    def test_recovery_requeues_lost_jobs_and_fails_old_ones(self, mock_generate_feedback):
+        mock_generate_feedback.return_value = {
+            "totalScore": 64, "categoryScores": [], "strengths": [], "areasForImprovement": [], "finalAssessment": "Ok.",
+        }
+        now = timezone.now()
+        # Queued by a process that has since restarted
+        lost = Feedback.objects.create(interview=self.interview, user=self.user, status='pending', transcript=self.payload['transcript'])
+        Feedback.objects.filter(id=lost.id).update(queued_at=now - timedelta(hours=1))
+        # Still within the stale window, presumably queued in another live process
+        recent = Feedback.objects.create(interview=self.interview, user=self.user, status='pending', queued_at=now)
+        abandoned = Feedback.objects.create(interview=self.interview, user=self.user, status='pending')
+        Feedback.objects.filter(id=abandoned.id).update(created_at=now - timedelta(days=2), queued_at=None)
+
+        out = StringIO()
+        call_command('recover_ai_jobs', stdout=out)
+        self.assertIn("feedback: requeued 1, failed 1", out.getvalue())
+
+        statuses = dict(Feedback.objects.values_list('id', 'status'))
+        self.assertEqual(statuses[lost.id], 'completed')
+        self.assertEqual(statuses[recent.id], 'pending')
+        self.assertEqual(statuses[abandoned.id], 'failed')
+        self.assertEqual(Feedback.objects.get(id=lost.id).total_score, 64)
+
+    def test_recovery_claims_each_row_once(self):
+        from acharya_ai.tasks import recover_feedback_jobs
+
+        feedback = Feedback.objects.create(interview=self.interview, user=self.user, status='pending')
+        Feedback.objects.filter(id=feedback.id).update(queued_at=timezone.now() - timedelta(hours=1))
+        with patch('acharya_ai.tasks.JobPool.submit') as submit:
+            self.assertEqual(recover_feedback_jobs(), (1, 0))
+            # A second sweep (e.g. another process) finds it freshly queued
+            self.assertEqual(recover_feedback_jobs(), (0, 0))
+        self.assertEqual(submit.call_count, 1)
+
+class GeminiGatewayTests(SimpleTestCase):
+    def make_gateway(self, **kwargs):
+        gateway = GeminiGateway(api_key='test', backoff_base=0, **kwargs)
+        gateway._client = Mock()
+        return gateway
+
+    def server_error(self):
+        return genai_errors.ServerError(503, {'error': {'message': 'overloaded', 'status': 'UNAVAILABLE'}})
+
+    def test_retries_transient_errors(self):
+        gateway = self.make_gateway(max_retries=2)
+        gateway._client.models.generate_content.side_effect = [self.server_error(), 'ok']
+
+        self.assertEqual(gateway.generate_content('model', 'prompt'), 'ok')
+        self.assertEqual(gateway._client.models.generate_content.call_count, 2)
+        self.assertEqual(gateway.breaker.snapshot()['state'], 'closed')
+
+    def test_does_not_retry_bad_requests(self):
+        gateway = self.make_gateway(max_retries=2)
+        gateway._client.models.generate_content.side_effect = genai_errors.ClientError(
+            400, {'error': {'message': 'bad', 'status': 'INVALID_ARGUMENT'}}
+        )
+
+        with self.assertRaises(genai_errors.ClientError):
+            gateway.generate_content('model', 'prompt')
+        self.assertEqual(gateway._client.models.generate_content.call_count, 1)
+
+    def test_breaker_opens_and_short_circuits(self):
+        gateway = self.make_gateway(max_retries=0, breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+        gateway._client.models.generate_content.side_effect = self.server_error()
+
+        for _ in range(2):
+            with self.assertRaises(genai_errors.ServerError):
+                gateway.generate_content('model', 'prompt')
+        with self.assertRaises(CircuitOpenError):
+            gateway.generate_content('model', 'prompt')
+        self.assertEqual(gateway._client.models.generate_content.call_count, 2)
+
+    def test_half_open_probe_closes_circuit(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        gateway = self.make_gateway(max_retries=0, breaker=breaker)
+        gateway._client.models.generate_content.side_effect = [self.server_error(), 'ok']
+
+        with self.assertRaises(genai_errors.ServerError):
+            gateway.generate_content('model', 'prompt')
+        self.assertEqual(breaker.snapshot()['state'], 'open')
+        self.assertEqual(gateway.generate_content('model', 'prompt'), 'ok')
+        self.assertEqual(breaker.snapshot()['state'], 'closed')
+
+    def test_open_circuit_returns_fallback_questions(self):
+        gateway = self.make_gateway(breaker=CircuitBreaker(failure_threshold=1))
+        gateway.breaker.record_failure()
+
+        with patch('acharya_ai.helpers.get_gemini', return_value=gateway):
+            questions = generate_interview_questions_ai("Engineer", "mid", ["Go"], "technical", 3, use_cache=False)
+        self.assertEqual(len(questions), 3)
+        gateway._client.models.generate_content.assert_not_called()
+
+
+@override_settings(AI_JOBS_EAGER=True)
+class BulkInterviewCreationTests(APITestCase):
+    def setUp(self):
+        self.user = UserModel.objects.create_user(username='hrbulk', email='hrbulk@example.com', password='password123', user_type='hr')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.item = {
+            "role": "Backend Engineer",
+            "type": "technical",
+            "level": "mid",
+            "techstack": ["Python"],
+            "max_questions": 2,
+            "candidate_emails": ["a@example.com", "b@example.com", "a@example.com"],
+        }
+
+    @patch('acharya_ai.views.generate_interview_questions_ai')
+    def test_identical_configs_generate_once(self, mock_generate_questions):
+        mock_generate_questions.return_value = ["Q1", "Q2"]
+        items = [self.item, {**self.item, "title": "Second"}, {**self.item, "role": "Frontend Engineer"}]
+
+        response = self.client.post(reverse('bulk_create_interviews'), {"interviews": items}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 3)
+        self.assertEqual(mock_generate_questions.call_count, 2)
+        self.assertEqual(Interview.objects.filter(user=self.user).count(), 3)
+        self.assertEqual(InterviewInvitation.objects.filter(interview__user=self.user).count(), 6)
+
+    @patch('acharya_ai.views.generate_interview_questions_ai')
+    def test_invalid_items_are_reported_without_blocking_others(self, mock_generate_questions):
+        mock_generate_questions.return_value = ["Q1", "Q2"]
+        items = [self.item, {**self.item, "max_questions": 0}]
+
+        response = self.client.post(reverse('bulk_create_interviews'), {"interviews": items}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['results'][0]['status'], 'created')
+        self.assertEqual(response.data['results'][1]['status'], 'error')
+        self.assertIn('max_questions', response.data['results'][1]['errors'])
+        self.assertEqual(Interview.objects.filter(user=self.user).count(), 1)
+
+
+class QuestionBankTests(TestCase):
+    def setUp(self):
+        clear_question_cache()
+        self.addCleanup(clear_question_cache)
+        self.args = dict(role="Backend Engineer", level="mid", techstack=["Python", "Django"], type="technical")
+
+    @patch('acharya_ai.helpers.request_interview_questions')
+    def test_bank_serves_before_model_and_fills_shortfall(self, mock_request):
+        mock_request.return_value = ["Q1", "Q2", "Q3"]
+        generate_interview_questions_ai(**self.args, max_questions=3)
+        self.assertEqual(BankQuestion.objects.count(), 3)
+
+        served = generate_interview_questions_ai(**self.args, max_questions=2)
+        self.assertEqual(len(served), 2)
+        self.assertTrue(set(served) <= {"Q1", "Q2", "Q3"})
+        self.assertEqual(mock_request.call_count, 1)
+
+        mock_request.return_value = ["Q4", "Q5"]
+        combined = generate_interview_questions_ai(**self.args, max_questions=5)
+        self.assertEqual(sorted(combined), ["Q1", "Q2", "Q3", "Q4", "Q5"])
+        self.assertEqual(mock_request.call_args.args[5], 2) # only the shortfall is requested
+        self.assertEqual(BankQuestion.objects.count(), 5)
+
+    @patch('acharya_ai.helpers.request_interview_questions')
+    def test_bank_respects_techstack_tags(self, mock_request):
+        mock_request.return_value = ["Django ORM question"]
+        generate_interview_questions_ai(**self.args, max_questions=1)
+
+        self.assertEqual(
+            draw_questions("backend engineer", "MID", "technical", ["python", "django", "redis"], 5),
+            ["Django ORM question"]
+        )
+        self.assertEqual(draw_questions("backend engineer", "mid", "technical", ["python"], 5), [])
+        self.assertEqual(draw_questions("backend engineer", "mid", "technical", [], 5), [])
+
+    @patch('acharya_ai.helpers.request_interview_questions')
+    def test_long_tech_names_match_their_stored_tags(self, mock_request):
+        long_tech = "Amazon Web Services Elastic Kubernetes Service Fargate"
+        mock_request.return_value = ["EKS question"]
+        generate_interview_questions_ai(**{**self.args, 'techstack': [long_tech]}, max_questions=1)
+        self.assertEqual(draw_questions("backend engineer", "mid", "technical", [long_tech], 5), ["EKS question"])
+
+    @patch('acharya_ai.helpers.request_interview_questions')
+    def test_never_serves_more_than_requested(self, mock_request):
+        mock_request.return_value = ["Q1", "Q2"]
+        generate_interview_questions_ai(**self.args, max_questions=2)
+
+        mock_request.return_value = ["Q3", "Q4", "Q5", "Q6"]
+        served = generate_interview_questions_ai(**self.args, max_questions=3)
+        self.assertEqual(len(served), 3)
+        self.assertEqual(served[2], "Q3")
+
+
+class IncrementalObjectParserTests(SimpleTestCase):
+    def test_reports_members_as_they_complete(self):
+        document = json.dumps({
+            "totalScore": 80,
+            "categoryScores": [{"name": "Tech, \"deep\"", "score": 80, "comment": "{ok}"}],
+            "strengths": ["a", "b"],
+            "finalAssessment": "Done.",
+        })
+        parser = IncrementalObjectParser()
+        seen = []
+        for char in "```json\n" + document:
+            seen.extend(name for name, _ in parser.feed(char))
+        self.assertEqual(seen, ["totalScore", "categoryScores", "strengths", "finalAssessment"])
+
+    def test_member_is_not_reported_before_it_ends(self):
+        parser = IncrementalObjectParser()
+        self.assertEqual(parser.feed('{"strengths": ["a", "b"'), [])
+        self.assertEqual(parser.feed('], "totalScore": 9'), [("strengths", ["a", "b"])])
+        self.assertEqual(parser.feed('0}'), [("totalScore", 90)])
+
+
+class TranscriptCompactionTests(SimpleTestCase):
+    def test_strips_filler_and_merges_speakers(self):
+        turns = compact_transcript([
+            {"role": "interviewer", "content": "Tell me about   caching."},
+            {"role": "user", "content": "Um, so I I would use, you know, Redis."},
+            {"role": "user", "content": "  "},
+            {"role": "user", "content": "Uh with a TTL."},
+        ])
+        self.assertEqual(turns, [
+            {"role": "interviewer", "content": "Tell me about caching."},
+            {"role": "candidate", "content": "so I would use, Redis. with a TTL."},
+        ])
+
+    def test_filler_is_kept_within_budget(self):
+        transcript = [{"role": "user", "content": "Um, I used  Redis."}]
+        self.assertEqual(compact_transcript(transcript, budget=100), [{"role": "candidate", "content": "Um, I used Redis."}])
+        self.assertEqual(compact_transcript(transcript, budget=1), [{"role": "candidate", "content": "I used Redis."}])
+
+    def test_cleaning_leaves_real_words_alone(self):
+        turns = compact_transcript([{"role": "user", "content": (
+            "I flew the UH-60 and trained HMM models. I had had a role like that that paid well. "
+            "It was very very very fast."
+        )}])
+        self.assertEqual(turns[0]["content"], (
+            "I flew the UH-60 and trained HMM models. I had had a role like that that paid well. "
+            "It was very fast."
+        ))
+
+    def test_chunks_stay_within_budget_on_question_boundaries(self):
+        turns = []
+        for i in range(10):
+            turns.append({"role": "interviewer", "content": f"Question {i} " + "q" * 80})
+            turns.append({"role": "candidate", "content": f"Answer {i} " + "a" * 400})
+        turns.append({"role": "candidate", "content": "x" * 4000})
+
+        chunks = chunk_transcript(turns, budget=400)
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(transcript_tokens(chunk), 400)
+            self.assertEqual(chunk[0]["role"], "interviewer")
+        # The oversized final answer is shortened rather than dropped
+        self.assertTrue(chunks[-1][1]["content"].startswith("Answer 9"))
+        self.assertIn(" [...] ", chunks[-1][-1]["content"])
+
+    def test_tiny_budget_returns_instead_of_looping(self):
+        turns = [{"role": "interviewer", "content": "q" * 205}, {"role": "candidate", "content": "a" * 205}]
+        chunks = chunk_transcript(turns, budget=60)
+        self.assertEqual(len(chunks), 1)
+        # Over budget, but every turn is cut no further than the floor
+        self.assertEqual([len(turn["content"]) for turn in chunks[0]], [205, 205])
+
+        chunks = chunk_transcript([{"role": "interviewer", "content": "q"}, {"role": "candidate", "content": "a" * 5000}], budget=10)
+        self.assertLess(len(chunks[0][1]["content"]), 250)
+
+
+@override_settings(AI_FEEDBACK_TOKEN_BUDGET=300, AI_FEEDBACK_MAP_CONCURRENCY=2)
+class MapReduceFeedbackTests(SimpleTestCase):
+    def chunk_feedback(self, score, strength):
+        return Mock(text=json.dumps({
+            "totalScore": score,
+            "categoryScores": [{"name": "Technical Knowledge", "score": score, "comment": f"Part {score}"}],
+            "strengths": [strength, "Clear communication"],
+            "areasForImprovement": ["Pace"],
+            "finalAssessment": f"Scored {score}.",
+        }))
+
+    def test_long_transcript_is_scored_in_chunks_and_merged(self):
+        transcript = []
+        for i in range(4):
+            transcript.append({"role": "interviewer", "content": f"Question {i}?"})
+            transcript.append({"role": "user", "content": " ".join(f"detail{n}" for n in range(120))})
+
+        gateway = Mock()
+        gateway.generate_content.side_effect = lambda model, contents, config=None: (
+            Mock(text="Consistent overall.") if config is None
+            else self.chunk_feedback(60 if "part 1 of" in contents else 80, "Depth")
+        )
+        with patch('acharya_ai.helpers.get_gemini', return_value=gateway):
+            result = generate_feedback_ai(transcript, interview_role="Engineer")
+
+        chunks = chunk_transcript(compact_transcript(transcript), 300)
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual(gateway.generate_content.call_count, len(chunks) + 1)
+        self.assertEqual(result["totalScore"], 75)
+        self.assertEqual(result["categoryScores"][0]["score"], 75)
+        self.assertEqual(result["strengths"], ["Depth", "Clear communication"])
+        self.assertEqual(result["areasForImprovement"], ["Pace"])
+        self.assertEqual(result["finalAssessment"], "Consistent overall.")
+
+    def test_short_transcript_uses_a_single_call(self):
+        gateway = Mock()
+        gateway.generate_content.return_value = self.chunk_feedback(70, "Depth")
+        with patch('acharya_ai.helpers.get_gemini', return_value=gateway):
+            result = generate_feedback_ai([{"role": "user", "content": "Short answer."}], interview_role="Engineer")
+        self.assertEqual(gateway.generate_content.call_count, 1)
+        self.assertEqual(result["totalScore"], 70)
+
+
+    @override_settings(AI_FEEDBACK_MAP_CONCURRENCY=4, AI_FEEDBACK_SCORING_CONCURRENCY=3)
+    def test_scoring_calls_are_capped_across_transcripts(self):
+        transcript = []
+        for i in range(4):
+            transcript.append({"role": "interviewer", "content": f"Question {i}?"})
+            transcript.append({"role": "user", "content": " ".join(f"detail{n}" for n in range(120))})
+
+        lock = threading.Lock()
+        active, peak = [0], [0]
+
+        def generate_content(model, contents, config=None):
+            if config is None:
+                return Mock(text="Consistent overall.")
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            try:
+                time.sleep(0.05)
+                return self.chunk_feedback(70, "Depth")
+            finally:
+                with lock:
+                    active[0] -= 1
+
+        gateway = Mock()
+        gateway.generate_content.side_effect = generate_content
+        with patch('acharya_ai.helpers.get_gemini', return_value=gateway):
+            # Two long transcripts at once: 2 x 4 map workers, but only 3 scoring slots
+            threads = [threading.Thread(target=generate_feedback_ai, args=(transcript, "Engineer")) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(gateway.generate_content.call_count, 2 * (4 + 1))
+        self.assertEqual(peak[0], 3)
+
+class FakeGeminiServerTests(SimpleTestCase):
+    def start_server(self, **profile):
+        server = FakeGeminiServer(profile=FaultProfile(seed=1, **profile), seed=1).start()
+        self.addCleanup(server.stop)
+        gateway = GeminiGateway(api_key="fake", base_url=server.base_url, max_retries=0)
+        return server, gateway
+
+    def test_serves_schema_valid_questions_and_feedback(self):
+        server, gateway = self.start_server()
+        with patch('acharya_ai.helpers.get_gemini', return_value=gateway):
+            questions = request_interview_questions("gemini-2.0-flash", "Engineer", "Mid", ["Python"], "technical", 7)
+            feedback = generate_feedback_ai([{"role": "user", "content": "I built an API."}], interview_role="Engineer")
+
+        self.assertEqual(len(questions), 7)
+        self.assertTrue(all(isinstance(q, str) and q for q in questions))
+        self.assertEqual(len(feedback["categoryScores"]), 5)
+        self.assertTrue(0 <= feedback["totalScore"] <= 100)
+        self.assertNotIn("Technical issue", feedback["finalAssessment"])
+        self.assertEqual(server.snapshot(), {"ok": 2, "error": 0, "rate_limited": 0, "total": 2})
+
+    def test_injects_rate_limits(self):
+        server, gateway = self.start_server(rate_limit_rate=1.0)
+        with self.assertRaises(genai_errors.ClientError) as raised:
+            gateway.generate_content(model="gemini-2.0-flash", contents="hi")
+        self.assertEqual(raised.exception.code, 429)
+        self.assertEqual(server.snapshot()["rate_limited"], 1)
+
+    async def test_streams_in_chunks(self):
+        server, gateway = self.start_server(stream_chunks=3)
+        texts = [chunk.text async for chunk in gateway.stream_content(model="gemini-2.0-flash", contents="hi")]
+        self.assertEqual(len(texts), 3)
+        self.assertTrue("".join(texts))
+
+
+@override_settings(AI_QUESTION_BANK={'enabled': False}, AI_QUESTION_CACHE={'enabled': False})
+class MetricsTests(TestCase):
+    def setUp(self):
+        self.server = FakeGeminiServer(profile=FaultProfile(seed=1), seed=1).start()
+        self.addCleanup(self.server.stop)
+        self.gateway = GeminiGateway(api_key="fake", base_url=self.server.base_url, max_retries=0)
+        self.model = "gemini-1.5-flash"
+
+    def test_records_latency_tokens_and_fallbacks(self):
+        calls = metrics.AI_CALL_SECONDS.count(operation='questions', model=self.model, outcome='success')
+        tokens = metrics.AI_TOKENS.value(operation='questions', model=self.model, kind='response')
+        fallbacks = metrics.AI_FALLBACKS.value(operation='questions', model=self.model, reason='rate_limited')
+
+        with patch('acharya_ai.helpers.get_gemini', return_value=self.gateway):
+            generate_interview_questions_ai("Engineer", "Mid", ["Python"], "technical", 3)
+            self.server.profile.rate_limit_rate = 1.0
+            questions = generate_interview_questions_ai("Engineer", "Mid", ["Python"], "technical", 3)
+
+        self.assertEqual(len(questions), 3)
+        self.assertEqual(metrics.AI_CALL_SECONDS.count(operation='questions', model=self.model, outcome='success'), calls + 1)
+        self.assertGreater(metrics.AI_TOKENS.value(operation='questions', model=self.model, kind='response'), tokens)
+        self.assertEqual(
+            metrics.AI_FALLBACKS.value(operation='questions', model=self.model, reason='rate_limited'), fallbacks + 1
+        )
+
+    def test_metrics_endpoint_exposes_prometheus_text(self):
+        self.client.get(reverse('interviews_list'))
+        staff = UserModel.objects.create_user(username='ops', email='ops@example.com', password='pw', is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get(reverse('metrics'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('# TYPE acharya_ai_call_duration_seconds histogram', body)
+        self.assertIn('acharya_http_request_duration_seconds_count{method="GET",view="interviews_list",status="401"}', body)
+        self.assertIn('acharya_ai_jobs{pool="questions",state="queued"} 0', body)
+
+    @override_settings(METRICS_AUTH_TOKEN='scrape-secret')
+    def test_metrics_endpoint_token(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 401)
+        response = self.client.get(reverse('metrics'), headers={'Authorization': 'Bearer scrape-secret'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_metrics_endpoint_is_closed_by_default(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 401)
+        user = UserModel.objects.create_user(username='notstaff', email='notstaff@example.com', password='pw')
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+        self.assertEqual(self.client.get(reverse('metrics'), headers=headers).status_code, 401)
+
+        user.is_staff = True
+        user.save()
+        self.assertEqual(self.client.get(reverse('metrics'), headers=headers).status_code, 200)
+        with override_settings(METRICS_PUBLIC=True):
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 200)
+
+    async def test_middleware_times_requests_under_asgi(self):
+        user = await UserModel.objects.acreate(username='asgi', email='asgi@example.com')
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+        requests = metrics.HTTP_REQUEST_SECONDS.count(method='GET', view='interviews_list', status=200)
+        queries = metrics.DB_QUERY_SECONDS.count(view='interviews_list')
+
+        response = await self.async_client.get(reverse('interviews_list'), headers=headers)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(iscoroutinefunction(metrics.MetricsMiddleware(self.async_client.get)))
+        self.assertEqual(metrics.HTTP_REQUEST_SECONDS.count(method='GET', view='interviews_list', status=200), requests + 1)
+        self.assertGreater(metrics.DB_QUERY_SECONDS.count(view='interviews_list'), queries)
+
+
+class InterviewListTests(APITestCase):
+    def setUp(self):
+        self.user = UserModel.objects.create_user(username='lister', email='lister@example.com', password='password123')
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('interviews_list')
+
+    def add_interviews(self, count, feedbacks_each=2):
+        for i in range(count):
+            interview = Interview.objects.create(
+                user=self.user, role=f"Role {i}", type="technical", level="mid",
+                techstack=["Python"], questions=["Q1"], cover_image="/c.png"
+            )
+            for score in range(feedbacks_each):
+                Feedback.objects.create(interview=interview, user=self.user, total_score=60 + score)
+
+    def list_query_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'page_size': 100})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries)
+
+    def test_paginates_with_nested_feedbacks(self):
+        self.add_interviews(3)
+        Interview.objects.create(
+            user=UserModel.objects.create_user(username='someone', email='s@example.com', password='password123'),
+            role="Not mine", type="technical", level="mid", techstack=[], questions=[]
+        )
+
+        response = self.client.get(self.url, {'page_size': 2})
+        self.assertEqual(response.data['count'], 3)
+        self.assertIsNotNone(response.data['next'])
+        self.assertEqual([i['role'] for i in response.data['results']], ["Role 2", "Role 1"])
+        first = response.data['results'][0]
+        self.assertEqual([f['total_score'] for f in first['feedbacks']], [60, 61])
+        self.assertIn('created_at', first)
+
+    def test_query_count_does_not_grow_with_data(self):
+        self.add_interviews(1, feedbacks_each=1)
+        baseline = self.list_query_count()
+
+        self.add_interviews(40, feedbacks_each=5)
+        self.assertEqual(self.list_query_count(), baseline)
+        self.assertLessEqual(baseline, 3)
+
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.hr = UserModel.objects.create_user(username='hr', email='hr@example.com', password='password123', user_type='hr')
+        self.client.force_authenticate(user=self.hr)
+        self.url = reverse('hr_interviews_list')
+        for i in range(7):
+            Interview.objects.create(
+                user=self.hr, role=f"Role {i}", type="technical", level="mid", techstack=[], questions=[]
+            )
+        # Ties on created_at must be broken by id
+        tie = timezone.now()
+        Interview.objects.filter(role__in=["Role 2", "Role 3", "Role 4"]).update(created_at=tie)
+
+    def walk(self, url, link):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(item['id'] for item in response.data['results'])
+            url = response.data[link]
+        return ids, response
+
+    def test_pages_cover_every_row_once_in_order(self):
+        expected = [
+            str(pk) for pk in Interview.objects.filter(user=self.hr).order_by('-created_at', '-id').values_list('id', flat=True)
+        ]
+        ids, last = self.walk(self.url + '?page_size=3', 'next')
+        self.assertEqual(ids, expected)
+
+        # Walking back from the last page visits every earlier row exactly once
+        back, _ = self.walk(last.data['previous'], 'previous')
+        last_ids = [item['id'] for item in last.data['results']]
+        self.assertCountEqual(back, [pk for pk in expected if pk not in last_ids])
+
+    def test_previous_link_returns_the_preceding_page(self):
+        first = self.client.get(self.url + '?page_size=3')
+        second = self.client.get(first.data['next'])
+        previous = self.client.get(second.data['previous'])
+        self.assertEqual(previous.data['results'], first.data['results'])
+        self.assertIsNone(previous.data['previous'])
+
+    def test_uses_no_offset_and_rejects_bad_cursors(self):
+        first = self.client.get(self.url + '?page_size=2')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(first.data['next'])
+        self.assertFalse(any('OFFSET' in query['sql'].upper() for query in queries))
+
+        self.assertEqual(self.client.get(self.url + '?cursor=not-a-cursor').status_code, status.HTTP_404_NOT_FOUND)
+
+
+def explain(sql):
+    """
+    Return the query plan of `sql` as a list of lines for the active database.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            return [row[-1] for row in cursor.fetchall()]
+        cursor.execute('EXPLAIN ' + sql)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def full_scans(plan):
+    """
+    Plan lines that read a whole table rather than searching an index.
+    Scans of derived tables (subqueries) are not table scans and are ignored.
+    """
+    tables = set(connection.introspection.table_names())
+    if connection.vendor == 'sqlite':
+        return [
+            line for line in plan
+            if (match := re.match(r'^SCAN (\w+)$', line.strip())) and match.group(1) in tables
+        ]
+    return [line for line in plan if 'Seq Scan' in line]
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class QueryPlanTests(APITestCase):
+    """
+    Runs each hot endpoint on a seeded database, EXPLAINs every SELECT it issued
+    and fails if one of them falls back to a full table scan.
+    """
+
+    def setUp(self):
+        self.hr = UserModel.objects.create_user(username='planhr', email='planhr@example.com', password='password123', user_type='hr')
+        self.candidate = UserModel.objects.create_user(username='plancand', email='plancand@example.com', password='password123')
+        for n in range(30):
+            owner = UserModel.objects.create_user(username=f'seed{n}', email=f'seed{n}@example.com', password='x')
+            interview = Interview.objects.create(user=owner, role="Seed", type="technical", level="mid", techstack=[], questions=[])
+            Feedback.objects.create(interview=interview, user=owner, total_score=50)
+        self.interview = Interview.objects.create(
+            user=self.hr, role="Backend", type="technical", level="mid", techstack=["Python"], questions=["Q"]
+        )
+        for n in range(5):
+            InterviewInvitation.objects.create(
+                interview=self.interview, candidate_email=f'c{n}@example.com', invitation_token=f'plan-token-{n}',
+                expires_at=timezone.now() + timedelta(days=1), status='pending' if n % 2 else 'completed'
+            )
+            Feedback.objects.create(interview=self.interview, user=self.candidate, total_score=70)
+
+    def assertNoFullScans(self, user, method, url, data=None):
+        if user:
+            self.client.force_authenticate(user=user)
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data, format='json')
+        self.assertLess(response.status_code, 500)
+
+        selects = [q['sql'] for q in queries if q['sql'].lstrip().upper().startswith('SELECT')]
+        self.assertTrue(selects, f"{url} ran no SELECT queries")
+        for sql in selects:
+            scans = full_scans(explain(sql))
+            self.assertFalse(scans, f"Full scan for {method.upper()} {url}:\n{sql}\n{scans}")
+
+    def test_candidate_endpoints(self):
+        self.assertNoFullScans(self.candidate, 'get', reverse('interviews_list'))
+        self.assertNoFullScans(self.candidate, 'get', reverse('interview_detail', args=[self.interview.id]))
+        self.assertNoFullScans(self.candidate, 'get', reverse('get_interview_feedback', args=[self.interview.id]))
+
+    def test_hr_endpoints(self):
+        self.assertNoFullScans(self.hr, 'get', reverse('hr_interviews_list'))
+        self.assertNoFullScans(self.hr, 'get', reverse('hr_analytics'))
+        self.assertNoFullScans(self.hr, 'get', reverse('get_interview_invitations', args=[self.interview.id]))
+        self.assertNoFullScans(self.hr, 'get', reverse('get_interview_feedback', args=[self.interview.id]))
+
+    def test_invitation_and_login_lookups(self):
+        self.assertNoFullScans(None, 'get', reverse('get_invitation_by_token', args=['plan-token-1']))
+        self.assertNoFullScans(
+            None, 'post', reverse('custom_login'), {'username': 'planhr@example.com', 'password': 'password123'}
+        )
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'], AI_JOBS_EAGER=True)
+class HRRollupTests(APITestCase):
+    def setUp(self):
+        self.hr = UserModel.objects.create_user(username='rollhr', email='rollhr@example.com', password='pw', user_type='hr')
+        self.candidate = UserModel.objects.create_user(username='rollcand', email='rollcand@example.com', password='pw')
+        self.client.force_authenticate(user=self.hr)
+
+        self.backend = Interview.objects.create(user=self.hr, role="Backend", type="technical", level="mid", techstack=[], questions=[])
+        self.frontend = Interview.objects.create(user=self.hr, role="Frontend", type="technical", level="mid", techstack=[], questions=[])
+        Interview.objects.create(user=self.hr, role="Backend", type="behavioral", level="mid", techstack=[], questions=[])
+        for n, interview in enumerate([self.backend, self.backend, self.frontend]):
+            InterviewInvitation.objects.create(
+                interview=interview, candidate_email=f'r{n}@example.com', invitation_token=f'roll-{n}',
+                expires_at=timezone.now() + timedelta(days=1)
+            )
+        invitation = InterviewInvitation.objects.get(invitation_token='roll-0')
+        invitation.status = 'completed'
+        invitation.save()
+        Feedback.objects.create(interview=self.backend, user=self.candidate, total_score=60)
+        Feedback.objects.create(interview=self.frontend, user=self.candidate, total_score=90)
+        # Deferred scoring fills the score in later, through an update() and the feedback_completed signal
+        pending = Feedback.objects.create(interview=self.frontend, user=self.candidate, status='pending')
+        save_feedback_result(pending.id, {'totalScore': 30})
+
+    def analytics(self):
+        response = self.client.get(reverse('hr_analytics'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {key: value for key, value in response.data.items() if key != 'recent_interviews'}
+
+    def test_summary_is_served_from_rollups(self):
+        data = self.analytics()
+        self.assertEqual(data['total_interviews'], 3)
+        self.assertEqual(data['total_candidates'], 3)
+        self.assertEqual(data['completed_interviews'], 1)
+        self.assertEqual(data['average_score'], 60)
+        self.assertEqual(data['active_interviews'], 2)
+        self.assertEqual(data['popular_roles'][0], {'role': 'Backend', 'count': 2})
+
+        # Totals, active interviews, recent interviews and popular roles, however long the history
+        with self.assertNumQueries(4):
+            self.client.get(reverse('hr_analytics'))
+
+    def test_rebuild_matches_incremental_rollups_and_tracks_deletes(self):
+        self.frontend.delete()
+        incremental = self.analytics()
+        self.assertEqual(incremental['total_interviews'], 2)
+        self.assertEqual(incremental['average_score'], 60)
+
+        HRDailyRollup.objects.all().delete()
+        call_command('rebuild_hr_rollups', stdout=StringIO())
+        self.assertEqual(self.analytics(), incremental)
+
+    def test_migration_backfills_existing_rows(self):
+        from django.apps import apps
+        from importlib import import_module
+
+        expected = self.analytics()
+        HRDailyRollup.objects.all().delete()
+        backfill = import_module('acharya_ai.migrations.0017_backfill_hr_rollups').backfill_rollups
+        backfill(apps, None)
+        self.assertEqual(self.analytics(), expected)
+
+    def test_timeseries_buckets(self):
+        today = timezone.localdate()
+        response = self.client.get(reverse('hr_analytics_timeseries'), {
+            'bucket': 'week', 'start': (today - timedelta(days=20)).isoformat(), 'end': today.isoformat()
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        series = response.data['series']
+        self.assertGreaterEqual(len(series), 3)
+        self.assertEqual(sum(point['interviews_created'] for point in series), 3)
+        self.assertEqual(series[-1]['average_score'], 60)
+        self.assertEqual(series[0]['average_score'], None)
+
+        bad = self.client.get(reverse('hr_analytics_timeseries'), {'bucket': 'hour'})
+        self.assertEqual(bad.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class CompanyAnalyticsTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = UserModel.objects.create_user(username='alice', email='alice@acme.test', password='pw', user_type='hr', company='Acme')
+        self.bob = UserModel.objects.create_user(username='bob', email='bob@acme.test', password='pw', user_type='hr', company='Acme')
+        other = UserModel.objects.create_user(username='eve', email='eve@other.test', password='pw', user_type='hr', company='Other')
+        self.candidate = UserModel.objects.create_user(username='cand', email='cand@example.com', password='pw')
+        self.interviews = {}
+        for owner, role, score in [(self.alice, "Backend", 85), (self.bob, "Backend", 45), (self.bob, "Data", 15), (other, "Backend", 99)]:
+            interview = Interview.objects.create(user=owner, role=role, type="technical", level="mid", techstack=[], questions=[])
+            Feedback.objects.create(interview=interview, user=self.candidate, total_score=score)
+            self.interviews.setdefault(owner.username, interview)
+        self.client.force_authenticate(user=self.alice)
+        self.url = reverse('company_analytics')
+
+    def test_aggregates_across_recruiters(self):
+        data = self.client.get(self.url).data
+        self.assertEqual(data['recruiters'], 2)
+        self.assertEqual(data['total_interviews'], 3)
+        self.assertEqual(data['average_score'], 48.33)
+        self.assertEqual(
+            [bucket['count'] for bucket in data['score_distribution']], [1, 0, 1, 0, 1]
+        )
+        self.assertEqual(data['popular_roles'][0], {'role': 'Backend', 'count': 2})
+
+        with override_settings(AI_COMPANY_ANALYTICS={'chunk_size': 1}):
+            cache.clear()
+            chunked = self.client.get(self.url).data
+        self.assertEqual(
+            {k: v for k, v in chunked.items() if k != 'generated_at'},
+            {k: v for k, v in data.items() if k != 'generated_at'}
+        )
+
+    def test_cached_until_a_write(self):
+        self.assertFalse(self.client.get(self.url).data['cached'])
+        self.assertTrue(self.client.get(self.url).data['cached'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Feedback.objects.create(interview=self.interviews['bob'], user=self.candidate, total_score=100)
+        data = self.client.get(self.url).data
+        self.assertFalse(data['cached'])
+        self.assertEqual(data['score_distribution'][-1]['count'], 2)
+
+    def test_recruiter_moving_company_invalidates_both(self):
+        eve = UserModel.objects.get(username='eve')
+        invalidate_company_for_user(self.bob.id)  # the user -> company mapping now says Acme
+        acme = self.client.get(self.url).data
+        self.client.force_authenticate(user=eve)
+        self.assertFalse(self.client.get(self.url).data['cached'])
+
+        bob = UserModel.objects.get(id=self.bob.id)
+        bob.company = 'Other'
+        bob.save()
+        other = self.client.get(self.url).data
+        self.assertFalse(other['cached'])
+        self.assertEqual(other['recruiters'], 2)
+        self.client.force_authenticate(user=self.alice)
+        moved = self.client.get(self.url).data
+        self.assertFalse(moved['cached'])
+        self.assertEqual(moved['recruiters'], acme['recruiters'] - 1)
+
+        # Later rollup writes for the recruiter invalidate the new company, not the old one
+        self.client.force_authenticate(user=eve)
+        self.assertTrue(self.client.get(self.url).data['cached'])
+        with self.captureOnCommitCallbacks(execute=True):
+            Feedback.objects.create(interview=self.interviews['bob'], user=self.candidate, total_score=100)
+        self.assertFalse(self.client.get(self.url).data['cached'])
+
+    def test_requires_company(self):
+        self.alice.company = ''
+        self.alice.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class FieldsetTests(APITestCase):
+    def setUp(self):
+        self.hr = UserModel.objects.create_user(username='fieldhr', email='fieldhr@example.com', password='password123', user_type='hr')
+        self.client.force_authenticate(user=self.hr)
+        self.interview = Interview.objects.create(
+            user=self.hr, role="Backend", type="technical", level="mid", techstack=["Python"], questions=["Q1", "Q2"]
+        )
+        Feedback.objects.create(
+            interview=self.interview, user=self.hr, total_score=80, category_scores=[{'name': 'x', 'score': 80}]
+        )
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        return response, ' '.join(q['sql'] for q in queries)
+
+    def test_no_parameters_returns_every_field(self):
+        response = self.client.get(reverse('interviews_list'))
+        interview = response.data['results'][0]
+        self.assertEqual(interview['questions'], ["Q1", "Q2"])
+        self.assertEqual(interview['feedbacks'][0]['total_score'], 80)
+
+    def test_fields_skip_heavy_columns(self):
+        response, sql = self.get(reverse('interviews_list') + '?fields=title,role,feedbacks.total_score')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        interview = response.data['results'][0]
+        self.assertEqual(set(interview), {'id', 'title', 'role', 'feedbacks'})
+        self.assertEqual(interview['feedbacks'], [{'id': interview['feedbacks'][0]['id'], 'total_score': 80}])
+        self.assertNotIn('"questions"', sql)
+        self.assertNotIn('"category_scores"', sql)
+
+    def test_expand_adds_to_selection(self):
+        response, sql = self.get(reverse('interview_detail', args=[self.interview.id]) + '?fields=role&expand=questions')
+        self.assertEqual(set(response.data), {'id', 'role', 'questions'})
+        # No feedback rows are fetched (the ETag validator only aggregates over them)
+        self.assertNotIn('FROM "acharya_ai_feedback"', sql)
+
+    def test_expand_alone_returns_every_field(self):
+        # Heavy columns are only left out when ?fields= is given; ?expand= alone changes nothing
+        full = self.client.get(reverse('interviews_list')).data['results'][0]
+        expanded = self.client.get(reverse('interviews_list') + '?expand=questions').data['results'][0]
+        self.assertEqual(expanded, full)
+        bad = self.client.get(reverse('interviews_list') + '?expand=password')
+        self.assertEqual(bad.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_serializer_endpoints_defer_unrequested_columns(self):
+        response, sql = self.get(reverse('hr_interviews_list') + '?fields=role')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'role'})
+        self.assertNotIn('"questions"', sql)
+
+        response, sql = self.get(reverse('get_interview_feedback', args=[self.interview.id]) + '?fields=total_score')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'total_score'})
+        self.assertNotIn('"category_scores"', sql)
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(reverse('interviews_list') + '?fields=title,password')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('password', response.data['fields'][0])
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        self.hr = UserModel.objects.create_user(username='etaghr', email='etaghr@example.com', password='password123', user_type='hr')
+        self.client.force_authenticate(user=self.hr)
+        self.interview = Interview.objects.create(
+            user=self.hr, role="Backend", type="technical", level="mid", techstack=["Python"], questions=["Q1"]
+        )
+        self.invitation = InterviewInvitation.objects.create(
+            interview=self.interview, candidate_email='c@example.com', invitation_token='etag-token',
+            expires_at=timezone.now() + timedelta(days=1)
+        )
+
+    def revalidate(self, url, **headers):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, **headers)
+        return response, len(queries)
+
+    def test_unchanged_resources_return_304_with_one_query(self):
+        for url in (
+            reverse('interview_detail', args=[self.interview.id]),
+            reverse('hr_interviews_list'),
+            reverse('get_interview_invitations', args=[self.interview.id]),
+        ):
+            first = self.client.get(url)
+            self.assertEqual(first.status_code, status.HTTP_200_OK)
+            self.assertIn('private', first['Cache-Control'])
+
+            response, queries = self.revalidate(url, HTTP_IF_NONE_MATCH=first['ETag'])
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED, url)
+            self.assertEqual(queries, 1)
+
+            response, _ = self.revalidate(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED, url)
+
+    def test_changes_produce_a_new_etag(self):
+        url = reverse('get_interview_invitations', args=[self.interview.id])
+        etag = self.client.get(url)['ETag']
+        self.invitation.status = 'completed'
+        self.invitation.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['status'], 'completed')
+
+        url = reverse('interview_detail', args=[self.interview.id])
+        etag = self.client.get(url)['ETag']
+        feedback = Feedback.objects.create(interview=self.interview, user=self.hr, status='pending')
+        pending_etag = self.client.get(url, HTTP_IF_NONE_MATCH=etag)['ETag']
+        self.assertNotEqual(pending_etag, etag)
+        # Deferred scoring only sets completed_at, which must still invalidate
+        save_feedback_result(feedback.id, {'totalScore': 75})
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=pending_etag).status_code, status.HTTP_200_OK)
+
+    def test_etag_depends_on_user_and_query(self):
+        url = reverse('hr_interviews_list')
+        etag = self.client.get(url)['ETag']
+        self.assertNotEqual(self.client.get(url + '?fields=role')['ETag'], etag)
+
+        other = UserModel.objects.create_user(username='etaghr2', email='etaghr2@example.com', password='password123', user_type='hr')
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_missing_interview_is_still_404(self):
+        url = reverse('interview_detail', args=['00000000-0000-0000-0000-000000000000'])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(response.has_header('ETag'))
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    def test_matches_drf_output(self):
+        from decimal import Decimal
+        from uuid import uuid4
+        from rest_framework.renderers import JSONRenderer
+        from acharya_ai.renderers import FastJSONRenderer
+
+        data = {
+            'id': uuid4(), 'when': timezone.now(), 'naive': timezone.now().replace(tzinfo=None),
+            'score': Decimal('7.5'), 'items': [1, 'é', None, {'nested': True}],
+        }
+        self.assertEqual(json.loads(FastJSONRenderer().render(data)), json.loads(JSONRenderer().render(data)))
+        self.assertTrue(FastJSONRenderer().render({'when': timezone.now()}).decode().endswith('Z"}'))
+
+    def test_falls_back_without_orjson(self):
+        from acharya_ai import renderers
+
+        with patch.object(renderers, 'orjson', None):
+            self.assertEqual(renderers.FastJSONRenderer().render({'a': [1, 2]}), b'{"a":[1,2]}')
+        self.assertEqual(renderers.dumps({'big': 2 ** 70}), b'{"big":1180591620717411303424}')
+
+
+class StreamingListTests(APITestCase):
+    def setUp(self):
+        self.hr = UserModel.objects.create_user(username='streamhr', email='streamhr@example.com', password='password123', user_type='hr')
+        self.client.force_authenticate(user=self.hr)
+        for i in range(7):
+            interview = Interview.objects.create(
+                user=self.hr, role=f"Role {i}", type="technical", level="mid", techstack=[], questions=[]
+            )
+        for i in range(5):
+            Feedback.objects.create(interview=interview, user=self.hr, total_score=60 + i)
+        self.interview = interview
+
+    def read(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return json.loads(b''.join(response.streaming_content))['results']
+
+    @override_settings(AI_STREAM_CHUNK_SIZE=3)
+    def test_streams_every_row_across_chunks(self):
+        results = self.read(reverse('hr_interviews_list') + '?stream=true')
+        expected = [
+            str(pk) for pk in Interview.objects.filter(user=self.hr).order_by('-created_at', '-id').values_list('id', flat=True)
+        ]
+        self.assertEqual([item['id'] for item in results], expected)
+        self.assertEqual(results[0], json.loads(self.client.get(reverse('hr_interviews_list')).content)['results'][0])
+
+        results = self.read(reverse('get_interview_feedback', args=[self.interview.id]) + '?stream=true&fields=total_score')
+        self.assertEqual(sorted(item['total_score'] for item in results), [60, 61, 62, 63, 64])
+        self.assertEqual(set(results[0]), {'id', 'total_score'})
+
+    def test_empty_stream_is_valid_json(self):
+        Interview.objects.all().delete()
+        self.assertEqual(self.read(reverse('hr_interviews_list') + '?stream=true'), [])
+
+    @override_settings(AI_STREAM_CHUNK_SIZE=3)
+    async def test_streams_asynchronously_under_asgi(self):
+        # A sync iterator would be collected into a list by Django before sending
+        response = await self.async_client.get(
+            reverse('hr_interviews_list') + '?stream=true',
+            headers={'Authorization': f'Bearer {AccessToken.for_user(self.hr)}'},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        # Opening bracket, three row chunks (3 + 3 + 1) and the closing bracket
+        self.assertEqual(len(chunks), 5)
+        self.assertEqual(len(json.loads(b''.join(chunks))['results']), 7)
+
+
+class ValuesSerializerTests(TestCase):
+    def setUp(self):
+        self.hr = UserModel.objects.create_user(username='valueshr', email='valueshr@example.com', password='password123', user_type='hr')
+        self.interview = Interview.objects.create(
+            user=self.hr, title="Backend", role="Engineer", type="technical", level="mid",
+            techstack=["Python"], questions=["Q1"], cover_image=None
+        )
+        InterviewInvitation.objects.create(
+            interview=self.interview, candidate_email='a@example.com', invitation_token='values-1',
+            expires_at=timezone.now() + timedelta(days=1)
+        )
+        Feedback.objects.create(interview=self.interview, user=self.hr, total_score=80, completed_at=timezone.now())
+        Feedback.objects.create(interview=self.interview, user=self.hr, status='pending')
+
+    def assertParity(self, serializer_class, queryset, fields=None):
+        from acharya_ai.renderers import dumps
+        from acharya_ai.read_serializers import values_serializer
+
+        expected = serializer_class(queryset.order_by('id'), many=True, fields=fields).data
+        reader = values_serializer(serializer_class, fields)
+        actual = reader.to_representation_many(reader.select(queryset).order_by('id'))
+        self.assertEqual(json.loads(dumps(actual)), json.loads(dumps(expected)))
+        return actual
+
+    def test_output_matches_model_serializers(self):
+        from acharya_ai.serializers import FeedbackSerializer, InterviewInvitationSerializer, InterviewSerializer
+
+        self.assertParity(InterviewSerializer, Interview.objects.all())
+        self.assertParity(FeedbackSerializer, Feedback.objects.all())
+        self.assertParity(InterviewInvitationSerializer, InterviewInvitation.objects.all())
+        rows = self.assertParity(InterviewInvitationSerializer, InterviewInvitation.objects.all(), ('id', 'interview_title'))
+        self.assertEqual(rows, [{'id': rows[0]['id'], 'interview_title': "Backend"}])
+
+    def test_invitations_are_read_in_one_query(self):
+        from acharya_ai.read_serializers import values_serializer
+        from acharya_ai.serializers import InterviewInvitationSerializer
+
+        reader = values_serializer(InterviewInvitationSerializer)
+        with self.assertNumQueries(1):
+            reader.to_representation_many(reader.select(InterviewInvitation.objects.all()))
+
+    def test_bench_command_runs_and_rolls_back(self):
+        out = StringIO()
+        call_command('bench_serializers', rows=5, repeat=1, stdout=out)
+        self.assertIn('invitations', out.getvalue())
+        self.assertFalse(UserModel.objects.filter(username='bench-serializers').exists())
+
+
+class DashboardTests(APITestCase):
+    def setUp(self):
+        self.candidate = UserModel.objects.create_user(username='dashcand', email='dash@example.com', password='password123')
+        self.hr = UserModel.objects.create_user(username='dashhr', email='dashhr@example.com', password='password123', user_type='hr')
+        self.client.force_authenticate(user=self.candidate)
+        self.url = reverse('candidate_dashboard')
+        self.interviews = [
+            Interview.objects.create(
+                user=self.candidate, role=f"Role {i}", type="technical", level="mid", techstack=[], questions=["Q"]
+            )
+            for i in range(4)
+        ]
+        for minutes, score in ((30, 50), (20, 70), (10, 90)):
+            self.latest = Feedback.objects.create(interview=self.interviews[0], user=self.candidate, total_score=score)
+            Feedback.objects.filter(id=self.latest.id).update(created_at=timezone.now() - timedelta(minutes=minutes))
+        hr_interview = Interview.objects.create(user=self.hr, title="Backend", role="Engineer", type="technical", level="mid", techstack=[], questions=[])
+        self.invitation = InterviewInvitation.objects.create(
+            interview=hr_interview, candidate_email='dash@example.com', invitation_token='dash-1',
+            expires_at=timezone.now() + timedelta(days=1)
+        )
+        InterviewInvitation.objects.create(
+            interview=hr_interview, candidate_email='other@example.com', invitation_token='dash-2',
+            expires_at=timezone.now() + timedelta(days=1)
+        )
+
+    def test_dashboard_summarises_interviews_feedback_and_invitations(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        interviews = {str(item['id']): item for item in response.data['interviews']}
+        self.assertEqual(len(interviews), 4)
+        first = interviews[str(self.interviews[0].id)]
+        self.assertEqual(first['attempts'], 3)
+        self.assertEqual(first['average_score'], 70)
+        self.assertEqual(first['latest_feedback']['id'], self.latest.id)
+        self.assertEqual(interviews[str(self.interviews[1].id)]['attempts'], 0)
+        self.assertIsNone(interviews[str(self.interviews[1].id)]['latest_feedback'])
+
+        self.assertEqual(response.data['stats'], {'total_interviews': 4, 'total_attempts': 3, 'average_score': 70})
+
+        invitations = response.data['pending_invitations']
+        self.assertEqual([item['id'] for item in invitations], [self.invitation.id])
+        self.assertEqual(invitations[0]['interview_title'], "Backend")
+
+    def test_query_count_does_not_grow_with_interviews(self):
+        with CaptureQueriesContext(connection) as baseline:
+            self.client.get(self.url)
+        for interview in self.interviews:
+            Feedback.objects.create(interview=interview, user=self.candidate, total_score=60)
+        Interview.objects.create(user=self.candidate, role="More", type="technical", level="mid", techstack=[], questions=[])
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+        self.assertEqual(len(queries), len(baseline))
+        self.assertLessEqual(len(queries), 4)
+
+
+class InvitationCreationTests(APITestCase):
+    def setUp(self):
+        self.hr = UserModel.objects.create_user(username='invitehr', email='invitehr@example.com', password='password123', user_type='hr')
+        self.client.force_authenticate(user=self.hr)
+        self.interview = Interview.objects.create(
+            user=self.hr, role="Backend", type="technical", level="mid", techstack=[], questions=["Q"]
+        )
+
+    def test_create_invitations_dedupes_and_skips_existing(self):
+        from acharya_ai.invitations import create_invitations
+
+        created, skipped = create_invitations(self.interview, ['a@example.com', 'b@Example.COM', 'a@example.com'])
+        self.assertEqual(len(created), 2)
+        self.assertEqual(skipped, 1)
+        self.assertEqual(len({invitation.invitation_token for invitation in created}), 2)
+
+        # Existence check, invitation and outbox inserts and one rollup update, inside a savepoint
+        with self.assertNumQueries(6):
+            created, skipped = create_invitations(self.interview, ['b@example.com', 'c@example.com'], batch_size=10)
+        self.assertEqual([invitation.candidate_email for invitation in created], ['c@example.com'])
+        self.assertEqual(skipped, 1)
+        self.assertEqual(HRDailyRollup.objects.get(user=self.hr).invitations_sent, 3)
+
+    def test_interview_and_invitations_roll_back_together(self):
+        from django.db import IntegrityError
+
+        data = {
+            'role': 'Backend', 'type': 'technical', 'level': 'mid', 'techstack': ['Python'],
+            'max_questions': 2, 'candidate_emails': ['x@example.com'],
+        }
+        with patch('acharya_ai.views.generate_interview_questions_ai', return_value=['Q1', 'Q2']), \
+                patch('acharya_ai.invitations.InterviewInvitation.objects.bulk_create', side_effect=IntegrityError):
+            with self.assertRaises(IntegrityError):
+                self.client.post(reverse('create_interview'), data, format='json')
+        self.assertEqual(Interview.objects.filter(user=self.hr).count(), 1)
+
+    @override_settings(AI_INVITATION_IMPORT_CHUNK=4)
+    def test_csv_import_streams_in_chunks(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        InterviewInvitation.objects.create(
+            interview=self.interview, candidate_email='c3@example.com', invitation_token='csv-existing',
+            expires_at=timezone.now() + timedelta(days=1)
+        )
+        rows = ['name,email'] + [f'Candidate {n},c{n}@example.com' for n in range(10)] + ['Bad,not-an-email', ',', 'Dup,c1@example.com']
+        upload = SimpleUploadedFile('candidates.csv', '\n'.join(rows).encode('utf-8'), content_type='text/csv')
+
+        response = self.client.post(
+            reverse('import_invitations', args=[self.interview.id]), {'file': upload}, format='multipart'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 9)
+        self.assertEqual(response.data['skipped'], 2)
+        self.assertEqual(response.data['invalid'], 1)
+        self.assertEqual(response.data['errors'][0]['row'], 12)
+        self.assertEqual(InterviewInvitation.objects.filter(interview=self.interview).count(), 10)
+        # Each new invitation's email is queued for the outbox dispatcher
+        self.assertEqual(OutboxEmail.objects.filter(kind='interview_invitation').count(), 9)
+        # ...linking to the frontend's invitations/[token] page
+        invitation = InterviewInvitation.objects.filter(interview=self.interview).latest('created_at')
+        email = OutboxEmail.objects.get(to_email=invitation.candidate_email)
+        self.assertIn(f"/invitations/{invitation.invitation_token}\n", email.body)
+
+    def test_csv_import_requires_owner(self):
+        other = UserModel.objects.create_user(username='invitehr2', email='invitehr2@example.com', password='password123', user_type='hr')
+        self.client.force_authenticate(user=other)
+        response = self.client.post(reverse('import_invitations', args=[self.interview.id]), {}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+
+class InvitationExpiryTests(APITestCase):
+    def setUp(self):
+        clear_token_caches()
+        self.hr = UserModel.objects.create_user(username='expiryhr', email='expiryhr@example.com', password='password123', user_type='hr')
+        self.interview = Interview.objects.create(
+            user=self.hr, role="Backend", type="technical", level="mid", techstack=[], questions=["Q"]
+        )
+        now = timezone.now()
+        self.lapsed = [
+            InterviewInvitation.objects.create(
+                interview=self.interview, candidate_email=f'lapsed{n}@example.com', invitation_token=f'lapsed-{n}',
+                expires_at=now - timedelta(days=1)
+            )
+            for n in range(5)
+        ]
+        self.live = InterviewInvitation.objects.create(
+            interview=self.interview, candidate_email='live@example.com', invitation_token='live',
+            expires_at=now + timedelta(days=1)
+        )
+        InterviewInvitation.objects.filter(id=self.lapsed[0].id).update(status='completed')
+
+    def test_token_lookup_reports_expired_without_writing(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('get_invitation_by_token', args=['lapsed-1']))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'expired')
+        self.assertEqual(len(queries), 1)
+        self.assertTrue(queries[0]['sql'].startswith('SELECT'))
+        self.assertEqual(InterviewInvitation.objects.get(invitation_token='lapsed-1').status, 'pending')
+
+    def test_invitation_list_shows_effective_status(self):
+        self.client.force_authenticate(user=self.hr)
+        response = self.client.get(reverse('get_interview_invitations', args=[self.interview.id]), {'fields': 'candidate_email,status'})
+        statuses = {item['candidate_email']: item['status'] for item in response.data['results']}
+        self.assertEqual(statuses['live@example.com'], 'pending')
+        self.assertEqual(statuses['lapsed0@example.com'], 'completed')
+        self.assertEqual(statuses['lapsed1@example.com'], 'expired')
+
+    def test_sweeper_expires_in_batches(self):
+        from acharya_ai.invitations import expire_invitations
+
+        # Two full batches (select ids, one UPDATE each), then a select that finds nothing left
+        with self.assertNumQueries(5):
+            self.assertEqual(expire_invitations(batch_size=2), 4)
+        statuses = dict(InterviewInvitation.objects.values_list('invitation_token', 'status'))
+        self.assertEqual(statuses['lapsed-0'], 'completed')
+        self.assertEqual(statuses['live'], 'pending')
+        self.assertEqual([statuses[f'lapsed-{n}'] for n in range(1, 5)], ['expired'] * 4)
+
+        out = StringIO()
+        call_command('expire_invitations', stdout=out)
+        self.assertIn('Expired 0 invitation(s)', out.getvalue())
+
+
+
+class InvitationTokenLookupTests(APITestCase):
+    def setUp(self):
+        clear_token_caches()
+        hr = UserModel.objects.create_user(username='tokenhr', email='tokenhr@example.com', password='password123', user_type='hr')
+        interview = Interview.objects.create(
+            user=hr, title="Platform", role="Backend", type="technical", level="mid", techstack=[], questions=["Q"]
+        )
+        self.invitation = InterviewInvitation.objects.create(
+            interview=interview, candidate_email='token@example.com', invitation_token='valid-token',
+            expires_at=timezone.now() + timedelta(days=1)
+        )
+        self.url = reverse('get_invitation_by_token', args=['valid-token'])
+
+    def test_valid_lookup_is_one_point_read_then_cached(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['interview_title'], "Platform")
+        self.assertEqual(len(queries), 1)
+        self.assertIn('"token_hash" =', queries[0]['sql'])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url).data['id'], str(self.invitation.id))
+
+        # Saving the invitation drops the cached row
+        self.invitation.status = 'accepted'
+        self.invitation.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.url).data['status'], 'accepted')
+
+    def test_invalid_tokens_are_absorbed_in_memory(self):
+        unknown = reverse('get_invitation_by_token', args=['no-such-token'])
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(unknown).status_code, status.HTTP_404_NOT_FOUND)
+        with self.assertNumQueries(0):
+            for _ in range(20):
+                self.assertEqual(self.client.get(unknown).status_code, status.HTTP_404_NOT_FOUND)
+            # Not a URL-safe token at all: rejected without a lookup
+            self.assertEqual(self.client.get(reverse('get_invitation_by_token', args=['bad token!'])).status_code, 404)
+        self.assertGreaterEqual(metrics.INVITATION_TOKEN_LOOKUPS.value(result='negative_cache_hit'), 20)
+
+    def test_created_invitations_store_token_hash(self):
+        from acharya_ai.invitations import create_invitations
+        from acharya_ai.models import hash_invitation_token
+
+        created, _ = create_invitations(self.invitation.interview, ['bulk@example.com'])
+        stored = InterviewInvitation.objects.get(candidate_email='bulk@example.com')
+        self.assertEqual(stored.token_hash, hash_invitation_token(created[0].invitation_token))
+        self.assertEqual(len(stored.token_hash), 64)
+
+
+
+class InvitationTransitionTests(APITestCase):
+    def setUp(self):
+        clear_token_caches()
+        self.hr = UserModel.objects.create_user(username='transitionhr', email='transitionhr@example.com', password='password123', user_type='hr')
+        self.candidate = UserModel.objects.create_user(username='transitioncand', email='cand@example.com', password='password123', user_type='candidate')
+        self.interview = Interview.objects.create(
+            user=self.hr, role="Backend", type="technical", level="mid", techstack=[], questions=["Q"]
+        )
+        self.invitation = InterviewInvitation.objects.create(
+            interview=self.interview, candidate_email='cand@example.com', invitation_token='transition-token',
+            expires_at=timezone.now() + timedelta(days=1)
+        )
+
+    def test_accept_is_one_conditional_update(self):
+        from acharya_ai.invitations import accept_invitation
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(accept_invitation(self.invitation.id, self.candidate))
+        # The conditional UPDATE, then only the token hash read to drop its cached lookup
+        self.assertEqual(len(queries), 2)
+        self.assertTrue(queries[0]['sql'].startswith('UPDATE'))
+        self.assertTrue(queries[1]['sql'].startswith('SELECT "acharya_ai_interviewinvitation"."token_hash"'))
+        # A second (double-clicked) accept finds the row no longer pending
+        self.assertFalse(accept_invitation(self.invitation.id, self.candidate))
+
+        self.invitation.refresh_from_db()
+        self.assertEqual((self.invitation.status, self.invitation.attempts_used), ('accepted', 1))
+        self.assertEqual(self.invitation.candidate, self.candidate)
+
+    def test_accept_view_reports_why_it_failed(self):
+        self.client.force_authenticate(user=self.candidate)
+        url = reverse('accept_invitation', args=[self.invitation.id])
+        self.assertEqual(self.client.post(url).data['status'], 'accepted')
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_400_BAD_REQUEST)
+
+        other = UserModel.objects.create_user(username='transitionother', email='other@example.com', password='password123', user_type='candidate')
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_lapsed_invitation_cannot_be_accepted_until_extended(self):
+        InterviewInvitation.objects.filter(id=self.invitation.id).update(
+            status='expired', expires_at=timezone.now() - timedelta(hours=1)
+        )
+        self.client.force_authenticate(user=self.candidate)
+        self.assertEqual(self.client.post(reverse('accept_invitation', args=[self.invitation.id])).status_code, 400)
+
+        self.client.force_authenticate(user=self.hr)
+        response = self.client.post(reverse('extend_invitation', args=[self.invitation.id]), {'days': 3}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'pending')
+
+        self.client.force_authenticate(user=self.candidate)
+        self.assertEqual(self.client.post(reverse('accept_invitation', args=[self.invitation.id])).status_code, 200)
+
+    def test_revoke_only_by_owner_and_visible_through_token_cache(self):
+        token_url = reverse('get_invitation_by_token', args=['transition-token'])
+        self.assertEqual(self.client.get(token_url).data['status'], 'pending')
+
+        other_hr = UserModel.objects.create_user(username='transitionhr2', email='transitionhr2@example.com', password='password123', user_type='hr')
+        self.client.force_authenticate(user=other_hr)
+        self.assertEqual(self.client.post(reverse('revoke_invitation', args=[self.invitation.id])).status_code, 404)
+
+        self.client.force_authenticate(user=self.hr)
+        self.assertEqual(self.client.post(reverse('revoke_invitation', args=[self.invitation.id])).data['status'], 'revoked')
+        self.assertEqual(self.client.post(reverse('revoke_invitation', args=[self.invitation.id])).status_code, 400)
+        # The update() dropped the cached token lookup
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get(token_url).data['status'], 'revoked')
+
+    def test_revoke_drops_cached_lookup_under_cache_pressure(self):
+        from acharya_ai import invitations
+
+        with override_settings(AI_INVITATION_TOKEN_CACHE={'max_entries': 2}):
+            invitations._token_caches = None
+            self.addCleanup(setattr, invitations, '_token_caches', None)
+            for n in range(2):
+                InterviewInvitation.objects.create(
+                    interview=self.interview, candidate_email=f'busy{n}@example.com', invitation_token=f'busy-token-{n}',
+                    expires_at=timezone.now() + timedelta(days=1)
+                )
+            token_url = reverse('get_invitation_by_token', args=['transition-token'])
+            self.assertEqual(self.client.get(token_url).data['status'], 'pending')
+            # Other lookups fill the cache while hits keep this row the most recently used
+            for n in range(2):
+                self.client.get(reverse('get_invitation_by_token', args=[f'busy-token-{n}']))
+                self.client.get(token_url)
+
+            self.client.force_authenticate(user=self.hr)
+            self.assertEqual(self.client.post(reverse('revoke_invitation', args=[self.invitation.id])).status_code, 200)
+            self.client.force_authenticate(user=None)
+            self.assertEqual(self.client.get(token_url).data['status'], 'revoked')
+
+    def test_complete_updates_rollup(self):
+        from acharya_ai.invitations import accept_invitation, complete_invitation
+
+        self.assertFalse(complete_invitation(self.invitation.id))
+        accept_invitation(self.invitation.id, self.candidate)
+        self.assertTrue(complete_invitation(self.invitation.id))
+        self.assertEqual(InterviewInvitation.objects.get(id=self.invitation.id).status, 'completed')
+        self.assertEqual(HRDailyRollup.objects.get(user=self.hr).invitations_completed, 1)
+
+
+class FakeStreamingGateway:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def stream_content(self, model, contents, config=None):
+        for text in self.chunks:
+            yield Mock(text=text)
+
+
+class FeedbackStreamTests(TestCase):
+    def setUp(self):
+        self.user = UserModel.objects.create_user(username='streamer', email='streamer@example.com', password='password123')
+        self.interview = Interview.objects.create(
+            user=self.user, role="Data Scientist", type="technical", level="senior",
+            techstack=["Python"], questions=["Q1"]
+        )
+        self.headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+        self.payload = {
+            "interview_id": str(self.interview.id),
+            "transcript": [{"role": "interviewer", "content": "Q1"}, {"role": "candidate", "content": "A1"}],
+        }
+
+    async def collect_events(self, response):
+        body = ''.join([chunk.decode() async for chunk in response.streaming_content])
+        events = []
+        for block in body.strip().split('\n\n'):
+            event, data = block.split('\n', 1)
+            events.append((event[len('event: '):], json.loads(data[len('data: '):])))
+        return events
+
+    async def test_streams_fields_and_persists_feedback(self):
+        document = json.dumps({
+            "totalScore": 77,
+            "categoryScores": [{"name": "Technical", "score": 77, "comment": "Good"}],
+            "strengths": ["Depth"],
+            "areasForImprovement": ["Pace"],
+            "finalAssessment": "Solid.",
+        })
+        gateway = FakeStreamingGateway([document[:40], document[40:90], document[90:]])
+
+        with patch('acharya_ai.streaming.get_gemini', return_value=gateway):
+            response = await self.async_client.post(
+                reverse('stream_feedback'), self.payload, content_type='application/json', headers=self.headers
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            events = await self.collect_events(response)
+
+        names = [event for event, _ in events]
+        self.assertEqual(names[0], 'started')
+        self.assertEqual(names[-1], 'complete')
+        self.assertEqual(
+            [data['name'] for event, data in events if event == 'field'],
+            ["totalScore", "categoryScores", "strengths", "areasForImprovement", "finalAssessment"]
+        )
+        feedback = await Feedback.objects.aget(id=events[0][1]['id'])
+        self.assertEqual(feedback.status, 'completed')
+        self.assertEqual(feedback.total_score, 77)
+        self.assertEqual(events[-1][1]['total_score'], 77)
+
+    async def test_failed_stream_saves_failed_feedback(self):
+        gateway = FakeStreamingGateway(['{"totalScore": 40}'])
+        with patch('acharya_ai.streaming.get_gemini', return_value=gateway):
+            response = await self.async_client.post(
+                reverse('stream_feedback'), self.payload, content_type='application/json', headers=self.headers
+            )
+            events = await self.collect_events(response)
+
+        self.assertIn('error', [event for event, _ in events])
+        self.assertEqual(events[-1][1]['status'], 'failed')
+        self.assertIsNone(events[-1][1]['total_score'])
+
+    async def test_streamed_attempt_completes_the_invitation(self):
+        invitation = await InterviewInvitation.objects.acreate(
+            interview=self.interview, candidate_email=self.user.email, invitation_token='stream-token',
+            status='accepted', candidate=self.user, expires_at=timezone.now() + timedelta(days=1)
+        )
+        gateway = FakeStreamingGateway([json.dumps({
+            "totalScore": 70, "categoryScores": [], "strengths": [], "areasForImprovement": [], "finalAssessment": "Ok.",
+        })])
+        with patch('acharya_ai.streaming.get_gemini', return_value=gateway):
+            response = await self.async_client.post(
+                reverse('stream_feedback'), self.payload, content_type='application/json', headers=self.headers
+            )
+            await self.collect_events(response)
+
+        await invitation.arefresh_from_db()
+        self.assertEqual(invitation.status, 'completed')
+        rollup = await HRDailyRollup.objects.aget(user=self.user)
+        self.assertEqual(rollup.invitations_completed, 1)
+
+    async def test_requires_authentication(self):
+        response = await self.async_client.post(reverse('stream_feedback'), self.payload, content_type='application/json')
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,129 @@
+import math
+import re
+
+# Standalone disfluencies ("um", "uhh", "hmm") and comma-delimited verbal tics ("you know,").
+# Neither may touch a letter, digit or hyphen ("UH-60"), and all-caps tokens are left alone as
+# likely acronyms ("HMM models").
+FILLER_WORDS = re.compile(r"(?<![\w-])(?:u+m+|u+h+|e+r+m+|h+m+|a+h+)(?![\w-])[,.]?\s*", re.IGNORECASE)
+FILLER_PHRASES = re.compile(r"(?<![\w-])(?:you know|i mean|basically|so yeah),\s*", re.IGNORECASE)
+# Stutters: a one-letter word said twice or more ("I I"), or any word three or more times.
+# A doubled longer word is often real grammar ("had had", "that that").
+REPEATED_WORDS = re.compile(r"(?<![\w-])(?:(\w)(?:\s+\1(?![\w-]))+|(\w+)(?:\s+\2(?![\w-])){2,})", re.IGNORECASE)
+WHITESPACE = re.compile(r"\s+")
+
+# Rough average for English text with Gemini tokenizers
+CHARS_PER_TOKEN = 4
+# Truncated turns keep at least this many characters (half from the start, half from the end)
+MIN_TURN_CHARS = 200
+
+
+def speaker(role):
+    return 'interviewer' if role == 'interviewer' else 'candidate'
+
+
+def _drop_filler(match):
+    word = match.group(0).strip(' ,.')
+    return match.group(0) if len(word) > 1 and word.isupper() else ''
+
+
+def clean_text(text):
+    text = FILLER_WORDS.sub(_drop_filler, text)
+    text = FILLER_PHRASES.sub('', text)
+    text = REPEATED_WORDS.sub(lambda match: match.group(1) or match.group(2), text)
+    return WHITESPACE.sub(' ', text).strip()
+
+
+def merge_turns(transcript, clean):
+    """
+    Apply `clean` to each turn's content, drop empty turns and merge consecutive
+    turns by the same speaker. Returns a new list of {'role', 'content'} dicts.
+    """
+    turns = []
+    for item in transcript or []:
+        content = clean(str(item.get('content', '')))
+        if not content:
+            continue
+        role = speaker(item.get('role'))
+        if turns and turns[-1]['role'] == role:
+            turns[-1]['content'] += ' ' + content
+        else:
+            turns.append({'role': role, 'content': content})
+    return turns
+
+
+def compact_transcript(transcript, budget=None):
+    """
+    Normalize whitespace, drop empty turns and merge consecutive turns by the
+    same speaker. Filler is only stripped when the result is over `budget`
+    estimated tokens (or budget is None): it also removes a little of what the
+    candidate said, so short transcripts are scored verbatim.
+    """
+    turns = merge_turns(transcript, lambda text: WHITESPACE.sub(' ', text).strip())
+    if budget is None or transcript_tokens(turns) > budget:
+        turns = merge_turns(turns, clean_text)
+    return turns
+
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def transcript_tokens(turns):
+    # +3 per turn for the "Interviewer: " / "Candidate: " prefix and newline
+    return sum(estimate_tokens(turn['content']) + 3 for turn in turns)
+
+
+def segment_transcript(turns):
+    """
+    Split turns into question/answer segments, each starting at an interviewer turn.
+    """
+    segments = []
+    for turn in turns:
+        if turn['role'] == 'interviewer' or not segments:
+            segments.append([])
+        segments[-1].append(turn)
+    return segments
+
+
+def truncate_turns(turns, budget):
+    """
+    Shorten the longest turns of an oversized segment until it fits the budget,
+    keeping the start and end of each shortened turn.
+
+    Turns are never cut below MIN_TURN_CHARS, so a budget too small for the
+    segment's turns returns it over budget rather than looping.
+    """
+    turns = [dict(turn) for turn in turns]
+    while transcript_tokens(turns) > budget:
+        longest = max(turns, key=lambda turn: len(turn['content']))
+        content = longest['content']
+        excess = (transcript_tokens(turns) - budget) * CHARS_PER_TOKEN
+        keep = max(MIN_TURN_CHARS, len(content) - excess - 20)
+        shortened = content[:keep // 2] + ' [...] ' + content[-(keep // 2):]
+        if len(shortened) >= len(content):
+            # Even the longest turn is down to the floor; nothing left to cut
+            break
+        longest['content'] = shortened
+    return turns
+
+
+def chunk_transcript(turns, budget):
+    """
+    Pack consecutive Q/A segments into chunks of at most `budget` estimated tokens.
+    A single segment larger than the budget is truncated to fit on its own.
+    """
+    chunks = []
+    current, current_tokens = [], 0
+    for segment in segment_transcript(turns):
+        tokens = transcript_tokens(segment)
+        if tokens > budget:
+            segment = truncate_turns(segment, budget)
+            tokens = transcript_tokens(segment)
+        if current and current_tokens + tokens > budget:
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current = current + segment
+        current_tokens += tokens
+    if current:
+        chunks.append(current)
+    return chunks
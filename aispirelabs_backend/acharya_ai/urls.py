@@ -4,26 +4,44 @@ from .views import (
     InterviewCreateView, InterviewListView, InterviewDetailView,
     FeedbackCreateView, FeedbackListView, FeedbackByInterviewView,
     HRAnalyticsView, HRInterviewsListView, InterviewInvitationsView,
-    AcceptInvitationView, InvitationByTokenView
+    AcceptInvitationView, InvitationByTokenView, InterviewStatusView,
+    AIJobStatsView, FeedbackDetailView, InterviewBulkCreateView, HRAnalyticsTimeseriesView,
+    CompanyAnalyticsView, DashboardView, InvitationImportView, RevokeInvitationView, ExtendInvitationView
 )
+from .streaming import feedback_stream_view
 
 urlpatterns = [
+    # Candidate dashboard (interviews, feedback summaries and pending invitations in one call)
+    path('dashboard/', DashboardView.as_view(), name='candidate_dashboard'),
+
     # Interview endpoints
     path('interviews/', InterviewListView.as_view(), name='interviews_list'),
     path('interviews/create/', InterviewCreateView.as_view(), name='create_interview'),
+    path('interviews/bulk-create/', InterviewBulkCreateView.as_view(), name='bulk_create_interviews'),
     path('interviews/<uuid:pk>/', InterviewDetailView.as_view(), name='interview_detail'),
+    path('interviews/<uuid:pk>/status/', InterviewStatusView.as_view(), name='interview_status'),
     path('interviews/<uuid:interview_id>/feedback/', FeedbackByInterviewView.as_view(), name='get_interview_feedback'),
     path('interviews/<uuid:interview_id>/invitations/', InterviewInvitationsView.as_view(), name='get_interview_invitations'),
+    path('interviews/<uuid:interview_id>/invitations/import/', InvitationImportView.as_view(), name='import_invitations'),
 
     # Feedback endpoints
     path('feedback/create/', FeedbackCreateView.as_view(), name='create_feedback'),
+    path('feedback/stream/', feedback_stream_view, name='stream_feedback'),
+    path('feedback/<uuid:pk>/', FeedbackDetailView.as_view(), name='feedback_detail'),
     path('feedback/interview/<uuid:interview_id>/', FeedbackByInterviewView.as_view(), name='get_feedback_by_interview'),
 
     # HR endpoints
     path('hr/analytics/', HRAnalyticsView.as_view(), name='hr_analytics'),
+    path('hr/analytics/timeseries/', HRAnalyticsTimeseriesView.as_view(), name='hr_analytics_timeseries'),
+    path('hr/company-analytics/', CompanyAnalyticsView.as_view(), name='company_analytics'),
     path('hr/interviews/', HRInterviewsListView.as_view(), name='hr_interviews_list'),
 
+    # Background AI jobs
+    path('jobs/stats/', AIJobStatsView.as_view(), name='ai_job_stats'),
+
     # Invitation endpoints
     path('invitations/<uuid:invitation_id>/accept/', AcceptInvitationView.as_view(), name='accept_invitation'),
+    path('invitations/<uuid:invitation_id>/revoke/', RevokeInvitationView.as_view(), name='revoke_invitation'),
+    path('invitations/<uuid:invitation_id>/extend/', ExtendInvitationView.as_view(), name='extend_invitation'),
     path('invitations/<str:token>/', InvitationByTokenView.as_view(), name='get_invitation_by_token'),
 ]
@@ -1,19 +1,39 @@
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from .models import Interview, Feedback, InterviewInvitation
+from .models import Interview, Feedback, InterviewInvitation, HRDailyRollup, HRRoleRollup
 from .serializers import (
     InterviewSerializer, FeedbackSerializer, CreateInterviewSerializer, 
-    CreateFeedbackSerializer, InterviewInvitationSerializer
+    CreateFeedbackSerializer, InterviewInvitationSerializer, ExtendInvitationSerializer
 )
-from .helpers import get_random_interview_cover, generate_interview_questions_ai, generate_feedback_ai
+from .helpers import (
+    get_random_interview_cover, generate_interview_questions_ai, generate_feedback_ai, get_gemini_model
+)
+from .cache import question_fingerprint
+from .pagination import KeysetPagination, StandardResultsPagination
+from .fieldsets import parse_fieldset, serializer_fieldset, only_columns
+from .renderers import StreamingJSONResponse, wants_stream
+from .read_serializers import values_serializer
+from .conditional import conditional, interview_detail_validator, hr_interviews_validator, invitations_validator
+from .rollups import record_interviews, timeseries
+from .invitations import (
+    INVITATION_COLUMNS, accept_invitation, build_invitations, complete_candidate_invitation, create_invitations,
+    effective_status, extend_invitation, find_invitation_by_token, import_invitations, revoke_invitation,
+    save_invitations, with_effective_status,
+)
+from .company_analytics import get_company_analytics
+from .tasks import (
+    QueueFull, feedback_result_fields, get_pool, pool_stats, run_concurrently, generate_interview_questions_job,
+    generate_feedback_job
+)
+from django.conf import settings
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from users.models import User
-from django.db.models import F, Count, Avg
-from django.forms import model_to_dict
+from django.db.models import Avg, Count, F, Q, Sum, Window
+from django.db.models.functions import RowNumber
 from django.utils import timezone
-from datetime import timedelta
-import secrets
+from datetime import date, timedelta
 
 
 class InterviewCreateView(generics.CreateAPIView):
@@ -25,67 +45,275 @@ class InterviewCreateView(generics.CreateAPIView):
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
 
+        if data.get('async_generation'):
+            return self.create_async(request, data)
+
         # AI Question Generation
         questions = generate_interview_questions_ai(
             role=data['role'],
             level=data['level'],
             techstack=data['techstack'],
             type=data['type'],
-            max_questions=data['max_questions']
+            max_questions=data['max_questions'],
+            use_cache=data.get('use_cache', True)
         )
 
-        interview = Interview.objects.create(
-            user=request.user,
-            title=data.get('title', f"{data['role']} Interview"),
-            role=data['role'],
-            type=data['type'],
-            level=data['level'],
-            techstack=data['techstack'],
-            job_description=data.get('job_description', ''),
-            questions=questions,
-            max_attempts=data.get('max_attempts', 1),
-            time_limit=data.get('time_limit', 60),
-            show_feedback=data.get('show_feedback', True),
-            candidate_emails=data.get('candidate_emails', []),
-            cover_image=get_random_interview_cover(),
-            finalized=True
-        )
+        interview = self.save_interview(request, data, questions=questions, finalized=True)
 
-        # Create invitations for HR users
-        if request.user.user_type == 'hr' and data.get('candidate_emails'):
-            for email in data['candidate_emails']:
-                invitation_token = secrets.token_urlsafe(32)
-                expires_at = timezone.now() + timedelta(days=30)
+        output_serializer = InterviewSerializer(interview)
+        return Response(output_serializer.data, status=status.HTTP_201_CREATED)
+
+    def create_async(self, request, data):
+        """
+        Save the interview unfinalized and hand question generation to the background pool.
+
+        Candidates are only invited once the job is queued, so an interview
+        turned away with 503 has queued no invitation emails.
+        """
+        interview = self.save_interview(request, data, questions=[], finalized=False, invite=False)
 
-                InterviewInvitation.objects.create(
-                    interview=interview,
-                    candidate_email=email,
-                    invitation_token=invitation_token,
-                    expires_at=expires_at
-                )
+        try:
+            get_pool('questions').submit(
+                interview.id,
+                generate_interview_questions_job,
+                interview.id,
+                role=data['role'],
+                level=data['level'],
+                techstack=data['techstack'],
+                type=data['type'],
+                max_questions=data['max_questions'],
+                use_cache=data.get('use_cache', True)
+            )
+        except QueueFull:
+            interview.delete()
+            return Response(
+                {'error': 'Question generation is busy, please retry shortly'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': '5'}
+            )
 
+        self.invite_candidates(request, data, interview)
+        interview.refresh_from_db()
         output_serializer = InterviewSerializer(interview)
-        return Response(output_serializer.data, status=status.HTTP_201_CREATED)
+        return Response(output_serializer.data, status=status.HTTP_202_ACCEPTED)
+
+    def save_interview(self, request, data, questions, finalized, invite=True):
+        interview = build_interview(request.user, data, questions, finalized)
+
+        # The interview and its invitations are saved together or not at all
+        with transaction.atomic():
+            interview.save()
+            if invite:
+                self.invite_candidates(request, data, interview)
+
+        return interview
+
+    @staticmethod
+    def invite_candidates(request, data, interview):
+        # Create invitations (and queue their emails) for HR users
+        if request.user.user_type == 'hr' and data.get('candidate_emails'):
+            create_invitations(interview, data['candidate_emails'])
+
+
+def build_interview(user, data, questions, finalized=True):
+    """
+    Build an unsaved Interview from CreateInterviewSerializer data.
+    """
+    return Interview(
+        user=user,
+        title=data.get('title', f"{data['role']} Interview"),
+        role=data['role'],
+        type=data['type'],
+        level=data['level'],
+        techstack=data['techstack'],
+        job_description=data.get('job_description', ''),
+        questions=questions,
+        max_questions=data['max_questions'],
+        max_attempts=data.get('max_attempts', 1),
+        time_limit=data.get('time_limit', 60),
+        show_feedback=data.get('show_feedback', True),
+        candidate_emails=data.get('candidate_emails', []),
+        cover_image=get_random_interview_cover(),
+        finalized=finalized
+    )
+
+
+class InterviewBulkCreateView(APIView):
+    """
+    Create many interviews in one request.
+
+    Each item is validated on its own; identical question configurations in the
+    batch are generated once, distinct ones concurrently (bounded by
+    AI_BULK_CONCURRENCY). Valid items are inserted together with bulk_create in
+    one transaction, and the response reports the outcome per item.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        items = request.data.get('interviews') if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response({'error': 'Provide a non-empty list of interviews'}, status=status.HTTP_400_BAD_REQUEST)
+
+        max_items = getattr(settings, 'AI_BULK_MAX_ITEMS', 50)
+        if len(items) > max_items:
+            return Response({'error': f'At most {max_items} interviews per request'}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = [None] * len(items)
+        valid = []
+        for index, item in enumerate(items):
+            serializer = CreateInterviewSerializer(data=item)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                results[index] = {'index': index, 'status': 'error', 'errors': serializer.errors}
+
+        # Group items that would produce the same question set
+        model = get_gemini_model()
+        groups = {}
+        for index, data in valid:
+            fingerprint = question_fingerprint(
+                data['role'], data['level'], data['techstack'], data['type'], data['max_questions'], model
+            )
+            groups.setdefault(fingerprint, []).append((index, data))
+
+        calls = []
+        for members in groups.values():
+            data = members[0][1]
+            calls.append(((), {
+                'role': data['role'],
+                'level': data['level'],
+                'techstack': data['techstack'],
+                'type': data['type'],
+                'max_questions': data['max_questions'],
+                'use_cache': all(member.get('use_cache', True) for _, member in members),
+            }))
+        generated = run_concurrently(
+            generate_interview_questions_ai, calls, getattr(settings, 'AI_BULK_CONCURRENCY', 4)
+        )
+
+        interviews = []
+        invitations = []
+        is_hr = request.user.user_type == 'hr'
+        for members, questions in zip(groups.values(), generated):
+            for index, data in members:
+                if isinstance(questions, Exception):
+                    results[index] = {'index': index, 'status': 'error', 'errors': {'questions': [str(questions)[:200]]}}
+                    continue
+                interview = build_interview(request.user, data, list(questions))
+                interviews.append((index, interview))
+                if is_hr:
+                    invitations.extend(build_invitations(interview, data.get('candidate_emails') or []))
+
+        with transaction.atomic():
+            Interview.objects.bulk_create([interview for _, interview in interviews])
+            # bulk_create sends no post_save, so update the analytics rollups here
+            record_interviews([interview for _, interview in interviews])
+            save_invitations(invitations, request.user.id)
+
+        for index, interview in interviews:
+            results[index] = {'index': index, 'status': 'created', 'interview': InterviewSerializer(interview).data}
+
+        created = len(interviews)
+        if created == len(items):
+            response_status = status.HTTP_201_CREATED
+        elif created:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response({
+            'created': created,
+            'failed': len(items) - created,
+            'results': results,
+        }, status=response_status)
+
+
+class InterviewStatusView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        interview = Interview.objects.filter(user=request.user, id=pk).values(
+            'id', 'finalized', 'questions', 'updated_at'
+        ).first()
+        if not interview:
+            return Response({'error': 'Interview not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        # The row is authoritative; the job record only exists in the process that queued it
+        job = get_pool('questions').get(pk)
+        if interview['finalized']:
+            job_status = 'ready'
+        elif job and job.status == 'failed':
+            job_status = 'failed'
+        else:
+            job_status = 'pending'
+
+        return Response({
+            'id': interview['id'],
+            'status': job_status,
+            'finalized': interview['finalized'],
+            'question_count': len(interview['questions'] or []),
+            'updated_at': interview['updated_at'],
+            'job': job.as_dict() if job else None,
+        })
+
+
+class AIJobStatsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response({'pools': pool_stats()})
+
+
+INTERVIEW_LIST_FIELDS = (
+    'id', 'user', 'title', 'role', 'type', 'level', 'techstack', 'questions', 'job_description',
+    'finalized', 'cover_image', 'max_attempts', 'time_limit', 'show_feedback', 'candidate_emails',
+    'resume_url', 'created_at', 'updated_at'
+)
+INTERVIEW_FEEDBACK_FIELDS = (
+    'id', 'total_score', 'category_scores', 'strengths', 
+    'areas_for_improvement', 'final_assessment', 'status', 'created_at'
+)
+
+
+def attach_feedbacks(interviews, fieldset):
+    """
+    Add each interview's feedbacks (the fields chosen in `fieldset`) with one query.
+    """
+    if 'feedbacks' not in fieldset:
+        return
+    feedbacks = {interview['id']: [] for interview in interviews}
+    if feedbacks:
+        for feedback in Feedback.objects.filter(interview_id__in=feedbacks).order_by('created_at').values(
+            'interview_id', *fieldset.nested['feedbacks']
+        ):
+            feedbacks[feedback.pop('interview_id')].append(feedback)
+    for interview in interviews:
+        interview['feedbacks'] = feedbacks[interview['id']]
 
 
 class InterviewListView(generics.ListAPIView):
+    """
+    The user's interviews, newest first, each with its feedbacks.
+
+    Paginated (?page=, ?page_size=) and built from values() rows: one query for
+    the count, one for the page and one for the feedbacks of every interview on
+    it, however many interviews or feedbacks there are. ?fields= limits the
+    columns fetched, e.g. ?fields=title,role,feedbacks.total_score, and ?expand=
+    adds to that selection.
+    """
     serializer_class = InterviewSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = StandardResultsPagination
 
-    def get(self, request, *args, **kwargs):
-        user = request.user
-        interviews = Interview.objects.filter(user=user).prefetch_related('feedbacks').order_by('-created_at')
-        result = []
-        for interview in interviews:
-            interview_dict = model_to_dict(interview)
-            interview_dict['id'] = interview.id
-            interview_dict['feedbacks'] = list(interview.feedbacks.values(
-                'id', 'total_score', 'category_scores', 'strengths', 
-                'areas_for_improvement', 'final_assessment', 'created_at'
-            ))
-            result.append(interview_dict)
+    def get_queryset(self):
+        return Interview.objects.filter(user=self.request.user).order_by('-created_at', '-id').values(
+            *self.fieldset.without('feedbacks')
+        )
 
-        return Response(result, status=status.HTTP_200_OK)
+    def get(self, request, *args, **kwargs):
+        self.fieldset = parse_fieldset(request, INTERVIEW_LIST_FIELDS, nested={'feedbacks': INTERVIEW_FEEDBACK_FIELDS})
+        page = self.paginate_queryset(self.get_queryset())
+        attach_feedbacks(page, self.fieldset)
+        return self.get_paginated_response(page)
 
 
 class InterviewDetailView(generics.RetrieveAPIView):
@@ -93,23 +321,104 @@ class InterviewDetailView(generics.RetrieveAPIView):
     serializer_class = InterviewSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    FIELDS = (
+        'id', 'role', 'type', 'level', 'cover_image', 'techstack', 'questions', 
+        'created_at', 'title', 'job_description', 'max_attempts', 'time_limit', 'show_feedback'
+    )
+    FEEDBACK_FIELDS = (
+        'id', 'total_score', 'category_scores', 'strengths', 
+        'areas_for_improvement', 'final_assessment', 'created_at'
+    )
+
+    @conditional(interview_detail_validator)
     def get(self, request, pk):
+        fieldset = parse_fieldset(request, self.FIELDS, nested={'feedbacks': self.FEEDBACK_FIELDS})
         interview = Interview.objects.filter(user=request.user, id=pk).values(
-            'id', 'role', 'type', 'level', 'cover_image', 'techstack', 'questions', 
-            'created_at', 'title', 'job_description', 'max_attempts', 'time_limit', 'show_feedback'
+            *fieldset.without('feedbacks')
         ).first()
         
         if interview:
-            feedbacks = list(Feedback.objects.filter(interview_id=pk).values(
-                'id', 'total_score', 'category_scores', 'strengths', 
-                'areas_for_improvement', 'final_assessment', 'created_at'
-            ))
-            interview['feedbacks'] = feedbacks 
+            attach_feedbacks([interview], fieldset)
             return Response(interview, status=status.HTTP_200_OK)
         else:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
 
+DASHBOARD_INTERVIEW_FIELDS = (
+    'id', 'title', 'role', 'type', 'level', 'techstack', 'finalized', 'cover_image', 'created_at'
+)
+
+
+def feedback_summaries(interview_ids):
+    """
+    Per interview: the number of attempts, their average score and the latest
+    feedback, all from one window-function query.
+    """
+    by_interview = [F('interview_id')]
+    rows = Feedback.objects.filter(interview_id__in=interview_ids).annotate(
+        rank=Window(RowNumber(), partition_by=by_interview, order_by=[F('created_at').desc(), F('id').desc()]),
+        attempts=Window(Count('id'), partition_by=by_interview),
+        average_score=Window(Avg('total_score'), partition_by=by_interview),
+    ).filter(rank=1).values(
+        'interview_id', 'attempts', 'average_score', 'id', 'status', 'total_score', 'created_at'
+    )
+    summaries = {}
+    for row in rows:
+        interview_id = row.pop('interview_id')
+        average = row.pop('average_score')
+        summaries[interview_id] = {
+            'attempts': row.pop('attempts'),
+            'average_score': round(average, 2) if average is not None else None,
+            'latest_feedback': row,
+        }
+    return summaries
+
+
+class DashboardView(APIView):
+    """
+    Everything the candidate dashboard shows, in one request and four queries:
+    the newest interviews with their attempt count, average and latest
+    feedback, overall stats, and pending invitations sent to the user's email.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        limit = getattr(settings, 'AI_DASHBOARD_INTERVIEWS', 50)
+        interviews = list(
+            Interview.objects.filter(user=request.user).order_by('-created_at', '-id').values(
+                *DASHBOARD_INTERVIEW_FIELDS
+            )[:limit]
+        )
+        summaries = feedback_summaries([interview['id'] for interview in interviews]) if interviews else {}
+        empty = {'attempts': 0, 'average_score': None, 'latest_feedback': None}
+        for interview in interviews:
+            interview.update(summaries.get(interview['id'], empty))
+
+        stats = Interview.objects.filter(user=request.user).aggregate(
+            total_interviews=Count('id', distinct=True),
+            total_attempts=Count('feedbacks'),
+            average_score=Avg('feedbacks__total_score'),
+        )
+        if stats['average_score'] is not None:
+            stats['average_score'] = round(stats['average_score'], 2)
+
+        invitations = []
+        if request.user.email:
+            invitations = list(InterviewInvitation.objects.filter(
+                candidate_email=request.user.email, status='pending', expires_at__gt=timezone.now()
+            ).order_by('expires_at').values(
+                'id', 'interview', 'status', 'expires_at', 'created_at', 'invitation_token',
+                interview_title=F('interview__title'), interview_role=F('interview__role'),
+                time_limit=F('interview__time_limit'),
+            ))
+
+        return Response({
+            'interviews': interviews,
+            'stats': stats,
+            'pending_invitations': invitations,
+        })
+
+
 class FeedbackCreateView(generics.CreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = CreateFeedbackSerializer
@@ -121,6 +430,9 @@ class FeedbackCreateView(generics.CreateAPIView):
 
         interview = get_object_or_404(Interview, id=data['interview_id'])
 
+        if data.get('async_generation'):
+            return self.create_async(request, data, interview)
+
         # Generate AI feedback from transcript
         ai_feedback_data = generate_feedback_ai(data['transcript'], interview_role=interview.role)
 
@@ -133,23 +445,79 @@ class FeedbackCreateView(generics.CreateAPIView):
         feedback = Feedback.objects.create(
             interview=interview,
             user=request.user,
-            total_score=ai_feedback_data.get('totalScore', 0),
-            category_scores=ai_feedback_data.get('categoryScores', []),
-            strengths=ai_feedback_data.get('strengths', []),
-            areas_for_improvement=ai_feedback_data.get('areasForImprovement', []),
-            final_assessment=ai_feedback_data.get('finalAssessment', 'No assessment available.'),
-            attempt_number=existing_attempts + 1
+            transcript=data['transcript'],
+            attempt_number=existing_attempts + 1,
+            **feedback_result_fields(ai_feedback_data)
         )
+        complete_candidate_invitation(interview, request.user)
         
         output_serializer = FeedbackSerializer(feedback)
         return Response(output_serializer.data, status=status.HTTP_201_CREATED)
 
+    def create_async(self, request, data, interview):
+        """
+        Persist the transcript as a pending feedback row and score it in the background pool.
+        """
+        existing_attempts = Feedback.objects.filter(
+            interview=interview,
+            user=request.user
+        ).count()
+
+        feedback = Feedback.objects.create(
+            interview=interview,
+            user=request.user,
+            status='pending',
+            transcript=data['transcript'],
+            attempt_number=existing_attempts + 1,
+            queued_at=timezone.now()
+        )
+
+        try:
+            get_pool('feedback').submit(feedback.id, generate_feedback_job, feedback.id)
+        except QueueFull:
+            feedback.delete()
+            return Response(
+                {'error': 'Feedback scoring is busy, please retry shortly'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': '5'}
+            )
+
+        complete_candidate_invitation(interview, request.user)
+        feedback.refresh_from_db()
+        output_serializer = FeedbackSerializer(feedback)
+        return Response(output_serializer.data, status=status.HTTP_202_ACCEPTED)
+
+
+class FeedbackDetailView(APIView):
+    """
+    Poll a single feedback row, e.g. until an async scoring job leaves 'pending'.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        fieldset = serializer_fieldset(request, FeedbackSerializer)
+        feedback = Feedback.objects.select_related('interview').only(
+            'user', 'interview__user', *only_columns(FeedbackSerializer, fieldset)
+        ).filter(id=pk).first()
+        if feedback is None or (feedback.user_id != request.user.id and feedback.interview.user_id != request.user.id):
+            return Response({'error': 'Feedback not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        data = FeedbackSerializer(feedback, fields=fieldset.fields).data
+        job = get_pool('feedback').get(pk)
+        data['job'] = job.as_dict() if job else None
+        return Response(data)
+
 
 class FeedbackListView(generics.ListAPIView):
     serializer_class = FeedbackSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+
+    def get_serializer(self, *args, **kwargs):
+        return super().get_serializer(*args, fields=self.fieldset.fields, **kwargs)
 
     def get_queryset(self):
+        self.fieldset = serializer_fieldset(self.request, FeedbackSerializer)
         interview_id = self.kwargs.get('interview_id')
         if not interview_id:
             return Feedback.objects.none()
@@ -157,7 +525,7 @@ class FeedbackListView(generics.ListAPIView):
         return Feedback.objects.filter(
             interview_id=interview_id, 
             user=self.request.user
-        ).order_by('-created_at')
+        ).only(*only_columns(FeedbackSerializer, self.fieldset))
 
 
 class HRAnalyticsView(APIView):
@@ -167,38 +535,41 @@ class HRAnalyticsView(APIView):
         if request.user.user_type != 'hr':
             return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
 
-        # Get interviews created by this HR user
+        # Totals come from the per-day rollups (O(days)), not from scanning the HR user's history
         hr_interviews = Interview.objects.filter(user=request.user)
+        current_month = timezone.localdate().replace(day=1)
+        previous_month_start = (current_month - timedelta(days=1)).replace(day=1)
+        totals = HRDailyRollup.objects.filter(user=request.user).aggregate(
+            total_interviews=Sum('interviews_created'),
+            total_candidates=Sum('invitations_sent'),
+            completed_interviews=Sum('invitations_completed'),
+            score_sum=Sum('score_sum'),
+            score_count=Sum('score_count'),
+            current_month_count=Sum('interviews_created', filter=Q(day__gte=current_month)),
+            previous_month_count=Sum(
+                'interviews_created', filter=Q(day__gte=previous_month_start, day__lt=current_month)
+            ),
+        )
+        totals = {name: value or 0 for name, value in totals.items()}
 
-        # Calculate analytics
-        total_interviews = hr_interviews.count()
-        total_candidates = InterviewInvitation.objects.filter(interview__user=request.user).count()
-        completed_interviews = InterviewInvitation.objects.filter(
-            interview__user=request.user, 
-            status='completed'
-        ).count()
+        total_interviews = totals['total_interviews']
+        total_candidates = totals['total_candidates']
+        completed_interviews = totals['completed_interviews']
 
         # Calculate average score
-        feedbacks = Feedback.objects.filter(interview__user=request.user)
-        average_score = feedbacks.aggregate(avg_score=Avg('total_score'))['avg_score'] or 0
+        average_score = totals['score_sum'] / totals['score_count'] if totals['score_count'] else 0
 
         # Calculate completion rate
         completion_rate = (completed_interviews / total_candidates * 100) if total_candidates > 0 else 0
 
-        # Active interviews
-        active_interviews = hr_interviews.filter(
-            invitations__status__in=['pending', 'accepted']
-        ).distinct().count()
+        # Active interviews depend on current invitation states, so they stay a live (indexed) query
+        active_interviews = InterviewInvitation.objects.filter(
+            interview__user=request.user, status__in=['pending', 'accepted'], expires_at__gt=timezone.now()
+        ).values('interview_id').distinct().count()
 
         # Monthly growth
-        current_month = timezone.now().replace(day=1)
-        current_month_count = hr_interviews.filter(created_at__gte=current_month).count()
-        previous_month = current_month - timedelta(days=1)
-        previous_month_start = previous_month.replace(day=1)
-        previous_month_count = hr_interviews.filter(
-            created_at__gte=previous_month_start,
-            created_at__lt=current_month
-        ).count()
+        current_month_count = totals['current_month_count']
+        previous_month_count = totals['previous_month_count']
 
         if previous_month_count > 0:
             monthly_growth = ((current_month_count - previous_month_count) / previous_month_count) * 100
@@ -210,9 +581,10 @@ class HRAnalyticsView(APIView):
 
         # Popular roles
         popular_roles = (
-            hr_interviews.values('role')
-            .annotate(count=Count('role'))
-            .order_by('-count')[:5]
+            HRRoleRollup.objects.filter(user=request.user, interviews__gt=0)
+            .annotate(count=F('interviews'))
+            .order_by('-count')
+            .values('role', 'count')[:5]
         )
 
         return Response({
@@ -228,31 +600,125 @@ class HRAnalyticsView(APIView):
         })
 
 
+class HRAnalyticsTimeseriesView(APIView):
+    """
+    Trend data for HR charts from the daily rollups:
+    ?bucket=day|week|month (default day) and ?start=/&end= as YYYY-MM-DD
+    (default: the last 90 days). At most 366 days per request.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    MAX_DAYS = 366
+
+    def get(self, request):
+        if request.user.user_type != 'hr':
+            return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+
+        bucket = request.query_params.get('bucket', 'day')
+        if bucket not in ('day', 'week', 'month'):
+            return Response({'error': "bucket must be 'day', 'week' or 'month'"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            end = date.fromisoformat(request.query_params['end']) if 'end' in request.query_params else timezone.localdate()
+            start = date.fromisoformat(request.query_params['start']) if 'start' in request.query_params else end - timedelta(days=89)
+        except ValueError:
+            return Response({'error': 'start and end must be dates (YYYY-MM-DD)'}, status=status.HTTP_400_BAD_REQUEST)
+        if start > end or (end - start).days >= self.MAX_DAYS:
+            return Response(
+                {'error': f'start must not be after end and the range is limited to {self.MAX_DAYS} days'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response({
+            'bucket': bucket,
+            'start': start,
+            'end': end,
+            'series': timeseries(request.user.id, bucket, start, end),
+        })
+
+
+class CompanyAnalyticsView(APIView):
+    """
+    Analytics across every HR user sharing the requesting HR user's company.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        if request.user.user_type != 'hr':
+            return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+        if not request.user.company:
+            return Response({'error': 'Set a company on your profile to see company analytics'}, status=status.HTTP_400_BAD_REQUEST)
+
+        data, cached = get_company_analytics(request.user.company)
+        return Response({**data, 'cached': cached})
+
+
 class HRInterviewsListView(generics.ListAPIView):
     serializer_class = InterviewSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    @conditional(hr_interviews_validator)
     def get(self, request):
         if request.user.user_type != 'hr':
             return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
 
-        interviews = Interview.objects.filter(user=request.user).order_by('-created_at')
-        serializer = InterviewSerializer(interviews, many=True)
-        return Response({'results': serializer.data})
+        fieldset = serializer_fieldset(request, InterviewSerializer)
+        serializer = values_serializer(InterviewSerializer, fieldset.fields)
+        interviews = serializer.select(Interview.objects.filter(user=request.user))
+        if wants_stream(request):
+            # Every interview, newest first, without building the whole list in memory
+            return StreamingJSONResponse(interviews.order_by('-created_at', '-id'), serializer, request=request)
+        paginator = KeysetPagination()
+        interviews = paginator.paginate_queryset(interviews, request, view=self)
+        return paginator.get_paginated_response(serializer.to_representation_many(interviews))
 
 
 class InterviewInvitationsView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @conditional(invitations_validator)
     def get(self, request, interview_id):
         try:
             interview = Interview.objects.get(id=interview_id, user=request.user)
         except Interview.DoesNotExist:
             return Response({'error': 'Interview not found'}, status=status.HTTP_404_NOT_FOUND)
 
-        invitations = InterviewInvitation.objects.filter(interview=interview).order_by('-created_at')
-        serializer = InterviewInvitationSerializer(invitations, many=True)
-        return Response({'results': serializer.data})
+        fieldset = serializer_fieldset(request, InterviewInvitationSerializer)
+        # interview_title / interview_role come from a join in the same query
+        serializer = values_serializer(InterviewInvitationSerializer, fieldset.fields)
+        paginator = KeysetPagination()
+        invitations = paginator.paginate_queryset(
+            serializer.select(InterviewInvitation.objects.filter(interview=interview), always=INVITATION_COLUMNS),
+            request, view=self
+        )
+        return paginator.get_paginated_response(
+            with_effective_status(serializer.to_representation_many(invitations), invitations)
+        )
+
+
+class InvitationImportView(APIView):
+    """
+    Invite candidates from a CSV upload (multipart field "file"): one email per
+    row, or an "email" column under a header row. The file is read as a stream
+    and inserted in chunks; invalid rows and already-invited emails are
+    reported, not fatal.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, interview_id):
+        if request.user.user_type != 'hr':
+            return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+        interview = Interview.objects.filter(id=interview_id, user=request.user).first()
+        if interview is None:
+            return Response({'error': 'Interview not found'}, status=status.HTTP_404_NOT_FOUND)
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'Upload a CSV file in the "file" field'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            summary = import_invitations(interview, upload)
+        except UnicodeDecodeError:
+            return Response({'error': 'The file must be UTF-8 encoded CSV'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(summary, status=status.HTTP_201_CREATED if summary['created'] else status.HTTP_200_OK)
 
 
 class FeedbackByInterviewView(APIView):
@@ -273,53 +739,80 @@ class FeedbackByInterviewView(APIView):
         except Interview.DoesNotExist:
             return Response({'error': 'Interview not found'}, status=status.HTTP_404_NOT_FOUND)
 
-        serializer = FeedbackSerializer(feedbacks.order_by('-created_at'), many=True)
-        return Response({'results': serializer.data})
+        fieldset = serializer_fieldset(request, FeedbackSerializer)
+        serializer = values_serializer(FeedbackSerializer, fieldset.fields)
+        feedbacks = serializer.select(feedbacks)
+        if wants_stream(request):
+            return StreamingJSONResponse(feedbacks.order_by('-created_at', '-id'), serializer, request=request)
+        paginator = KeysetPagination()
+        feedbacks = paginator.paginate_queryset(feedbacks, request, view=self)
+        return paginator.get_paginated_response(serializer.to_representation_many(feedbacks))
+
+
+def invitation_response(invitation_id):
+    invitation = InterviewInvitation.objects.select_related('interview').get(id=invitation_id)
+    return Response(InterviewInvitationSerializer(invitation).data)
 
 
 class AcceptInvitationView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, invitation_id):
-        try:
-            invitation = InterviewInvitation.objects.get(id=invitation_id)
+        if accept_invitation(invitation_id, request.user):
+            return invitation_response(invitation_id)
+
+        # The conditional UPDATE matched nothing; only now read the row to say why
+        invitation = InterviewInvitation.objects.filter(id=invitation_id).values('candidate_email').first()
+        if invitation is None:
+            return Response({'error': 'Invitation not found'}, status=status.HTTP_404_NOT_FOUND)
+        if invitation['candidate_email'] != request.user.email:
+            return Response({'error': 'Invalid invitation'}, status=status.HTTP_403_FORBIDDEN)
+        return Response({'error': 'Invitation expired or already used'}, status=status.HTTP_400_BAD_REQUEST)
 
-            # Check if invitation is for this user's email
-            if invitation.candidate_email != request.user.email:
-                return Response({'error': 'Invalid invitation'}, status=status.HTTP_403_FORBIDDEN)
 
-            # Check if invitation is still valid
-            if invitation.status != 'pending' or invitation.expires_at < timezone.now():
-                return Response({'error': 'Invitation expired or already used'}, status=status.HTTP_400_BAD_REQUEST)
+class RevokeInvitationView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
 
-            # Update invitation
-            invitation.candidate = request.user
-            invitation.status = 'accepted'
-            invitation.save()
+    def post(self, request, invitation_id):
+        if revoke_invitation(invitation_id, request.user):
+            return invitation_response(invitation_id)
+        if not InterviewInvitation.objects.filter(id=invitation_id, interview__user=request.user).exists():
+            return Response({'error': 'Invitation not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'error': 'Invitation is already completed or revoked'}, status=status.HTTP_400_BAD_REQUEST)
 
-            serializer = InterviewInvitationSerializer(invitation)
-            return Response(serializer.data)
 
-        except InterviewInvitation.DoesNotExist:
+class ExtendInvitationView(APIView):
+    """
+    Push an invitation's expiry to `days` (default AI_INVITATION_DAYS) from now,
+    reopening it if it had expired.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, invitation_id):
+        serializer = ExtendInvitationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        days = serializer.validated_data.get('days') or getattr(settings, 'AI_INVITATION_DAYS', 30)
+
+        if extend_invitation(invitation_id, request.user, timezone.now() + timedelta(days=days)):
+            return invitation_response(invitation_id)
+        if not InterviewInvitation.objects.filter(id=invitation_id, interview__user=request.user).exists():
             return Response({'error': 'Invitation not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(
+            {'error': 'Invitation is completed, revoked or already valid for longer'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
 
 
 class InvitationByTokenView(APIView):
     permission_classes = [permissions.AllowAny]
 
     def get(self, request, token):
-        try:
-            invitation = InterviewInvitation.objects.select_related('interview').get(
-                invitation_token=token
-            )
-
-            # Check if invitation is still valid
-            if invitation.expires_at < timezone.now():
-                invitation.status = 'expired'
-                invitation.save()
-
-            serializer = InterviewInvitationSerializer(invitation)
-            return Response(serializer.data)
-
-        except InterviewInvitation.DoesNotExist:
-            return Response({'error': 'Invalid invitation token'}, status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+        invitation = find_invitation_by_token(token)
+        if invitation is None:
+            return Response({'error': 'Invalid invitation token'}, status=status.HTTP_404_NOT_FOUND)
+
+        # A lapsed invitation reads as expired; the row itself is updated by the
+        # expiry sweeper, not on this public GET
+        data = values_serializer(InterviewInvitationSerializer).to_representation(invitation)
+        data['status'] = effective_status(invitation['status'], invitation['expires_at'])
+        return Response(data)
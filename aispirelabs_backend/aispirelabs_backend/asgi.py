@@ -14,3 +14,11 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'aispirelabs_backend.settings')
 
 application = get_asgi_application()
+
+# Server processes expire lapsed invitations in the background when AI_INVITATION_SWEEP_SECONDS is set,
+# and re-queue AI jobs lost by earlier processes unless AI_JOB_RECOVERY interval_seconds is 0
+from acharya_ai.invitations import schedule_expiry_sweeps  # noqa: E402
+from acharya_ai.tasks import schedule_recovery  # noqa: E402
+
+schedule_expiry_sweeps()
+schedule_recovery()
@@ -53,6 +53,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'acharya_ai.metrics.MetricsMiddleware',
 ]
 
 ROOT_URLCONF = 'aispirelabs_backend.urls'
@@ -132,7 +133,12 @@ AUTH_USER_MODEL = 'users.User'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+    ),
+    # orjson-backed JSON (falls back to DRF's encoder when orjson isn't installed)
+    'DEFAULT_RENDERER_CLASSES': (
+        'acharya_ai.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
 
 from datetime import timedelta
@@ -169,6 +175,150 @@ GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 if not GEMINI_API_KEY:
     print("WARNING: GEMINI_API_KEY not found in environment variables. AI features will not work.")
 
+# Override the Gemini API endpoint, e.g. http://127.0.0.1:8765 for the local fake
+# server started with `python manage.py fake_gemini` (load testing without quota)
+GEMINI_BASE_URL = os.getenv('GEMINI_BASE_URL') or None
+
+# Gemini client: per-attempt timeout and overall deadline (seconds), retries with
+# jittered exponential backoff, and a circuit breaker that sends calls straight to
+# the fallback questions/feedback while the API keeps failing.
+GEMINI_TIMEOUT_SECONDS = float(os.getenv('GEMINI_TIMEOUT_SECONDS', 30))
+GEMINI_DEADLINE_SECONDS = float(os.getenv('GEMINI_DEADLINE_SECONDS', 60))
+GEMINI_MAX_RETRIES = int(os.getenv('GEMINI_MAX_RETRIES', 2))
+GEMINI_RETRY_BACKOFF_SECONDS = float(os.getenv('GEMINI_RETRY_BACKOFF_SECONDS', 0.5))
+GEMINI_RETRY_BACKOFF_MAX_SECONDS = float(os.getenv('GEMINI_RETRY_BACKOFF_MAX_SECONDS', 8))
+GEMINI_BREAKER_FAILURE_THRESHOLD = int(os.getenv('GEMINI_BREAKER_FAILURE_THRESHOLD', 5))
+GEMINI_BREAKER_RESET_SECONDS = float(os.getenv('GEMINI_BREAKER_RESET_SECONDS', 30))
+
+# Background AI job pools. Each pool has a fixed number of worker threads and a
+# bounded queue; submissions beyond workers + queue_depth are rejected so slow
+# Gemini calls cannot pile up without limit. Jobs slower than slow_threshold
+# (seconds) are counted and logged as slow.
+AI_JOB_POOLS = {
+    'questions': {
+        'workers': int(os.getenv('AI_QUESTION_WORKERS', 4)),
+        'queue_depth': int(os.getenv('AI_QUESTION_QUEUE_DEPTH', 32)),
+        'slow_threshold': float(os.getenv('AI_QUESTION_SLOW_SECONDS', 15)),
+    },
+    'feedback': {
+        'workers': int(os.getenv('AI_FEEDBACK_WORKERS', 2)),
+        'queue_depth': int(os.getenv('AI_FEEDBACK_QUEUE_DEPTH', 64)),
+        'slow_threshold': float(os.getenv('AI_FEEDBACK_SLOW_SECONDS', 30)),
+    },
+}
+# Run background jobs inline in the calling thread (useful for tests and debugging)
+AI_JOBS_EAGER = os.getenv('AI_JOBS_EAGER', 'false').lower() == 'true'
+# Jobs only live in the process that queued them. Rows whose job was lost (restart, deploy) are
+# found by `manage.py recover_ai_jobs` (cron) or in-process every interval_seconds (0 = off):
+# ones queued over stale_seconds ago are queued again, ones over fail_after_seconds old are failed.
+# Keep stale_seconds above the longest a job can wait in a pool queue.
+AI_JOB_RECOVERY = {
+    'interval_seconds': int(os.getenv('AI_JOB_RECOVERY_SECONDS', 300)),
+    'stale_seconds': int(os.getenv('AI_JOB_RECOVERY_STALE_SECONDS', 900)),
+    'fail_after_seconds': int(os.getenv('AI_JOB_RECOVERY_FAIL_AFTER_SECONDS', 24 * 3600)),
+    'batch_size': int(os.getenv('AI_JOB_RECOVERY_BATCH', 100)),
+}
+
+# Feedback transcripts above this many estimated tokens (after compaction) are scored
+# in question/answer chunks of at most this size, up to AI_FEEDBACK_MAP_CONCURRENCY at once
+AI_FEEDBACK_TOKEN_BUDGET = int(os.getenv('AI_FEEDBACK_TOKEN_BUDGET', 12000))
+AI_FEEDBACK_MAP_CONCURRENCY = int(os.getenv('AI_FEEDBACK_MAP_CONCURRENCY', 4))
+# Process-wide cap on concurrent Gemini scoring calls: whole transcripts and map chunks,
+# from the feedback pool, synchronous requests and SSE streams alike
+AI_FEEDBACK_SCORING_CONCURRENCY = int(os.getenv('AI_FEEDBACK_SCORING_CONCURRENCY', 4))
+
+# Bulk interview creation: max items per request and concurrent question generations
+AI_BULK_MAX_ITEMS = int(os.getenv('AI_BULK_MAX_ITEMS', 50))
+AI_BULK_CONCURRENCY = int(os.getenv('AI_BULK_CONCURRENCY', 4))
+
+# Generated question sets are cached by a fingerprint of the interview inputs and
+# GEMINI_MODEL, first in a per-process LRU and then in the database.
+AI_QUESTION_CACHE = {
+    'enabled': os.getenv('AI_QUESTION_CACHE_ENABLED', 'true').lower() == 'true',
+    'ttl': int(os.getenv('AI_QUESTION_CACHE_TTL', 7 * 24 * 3600)), # seconds
+    'memory_max_entries': int(os.getenv('AI_QUESTION_CACHE_MEMORY_ENTRIES', 256)),
+    'db_max_entries': int(os.getenv('AI_QUESTION_CACHE_DB_ENTRIES', 5000)),
+}
+
+# Question bank: generated questions are stored individually, tagged by role, level,
+# type and techstack, and reused before asking Gemini. Banked questions older than
+# max_age_days are no longer served; candidate_limit caps rows sampled per draw.
+AI_QUESTION_BANK = {
+    'enabled': os.getenv('AI_QUESTION_BANK_ENABLED', 'true').lower() == 'true',
+    'max_age_days': int(os.getenv('AI_QUESTION_BANK_MAX_AGE_DAYS', 180)),
+    'candidate_limit': int(os.getenv('AI_QUESTION_BANK_CANDIDATES', 500)),
+}
+
+# Shared cache (company analytics). Set REDIS_URL so every worker sees the same
+# entries and invalidations; the default per-process memory cache is fine for development.
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': REDIS_URL}}
+else:
+    CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+# Company analytics: results are cached per company for cache_seconds (and dropped on
+# writes); recruiters' rollups are aggregated chunk_size users per query.
+AI_COMPANY_ANALYTICS = {
+    'cache_seconds': int(os.getenv('AI_COMPANY_ANALYTICS_CACHE_SECONDS', 300)),
+    'chunk_size': int(os.getenv('AI_COMPANY_ANALYTICS_CHUNK_SIZE', 200)),
+    'popular_roles': 10,
+}
+
+# Default page size for cursor-paginated list endpoints (clients may pass ?page_size= up to 200)
+AI_LIST_PAGE_SIZE = int(os.getenv('AI_LIST_PAGE_SIZE', 50))
+# Invitations expire after AI_INVITATION_DAYS; CSV imports insert AI_INVITATION_IMPORT_CHUNK rows per transaction
+AI_INVITATION_DAYS = int(os.getenv('AI_INVITATION_DAYS', 30))
+AI_INVITATION_IMPORT_CHUNK = int(os.getenv('AI_INVITATION_IMPORT_CHUNK', 1000))
+# Lapsed invitations are marked expired by a sweeper (`manage.py expire_invitations` from cron,
+# or in-process every AI_INVITATION_SWEEP_SECONDS when > 0), AI_INVITATION_SWEEP_BATCH rows per UPDATE.
+# Reads show them as expired either way.
+AI_INVITATION_SWEEP_SECONDS = int(os.getenv('AI_INVITATION_SWEEP_SECONDS', 0))
+AI_INVITATION_SWEEP_BATCH = int(os.getenv('AI_INVITATION_SWEEP_BATCH', 1000))
+
+# Process-local caches in front of the public invitation-token lookup: found invitations for
+# `ttl` seconds, unknown tokens for `negative_ttl` seconds
+AI_INVITATION_TOKEN_CACHE = {
+    'max_entries': int(os.getenv('AI_INVITATION_TOKEN_CACHE_ENTRIES', 4096)),
+    'ttl': int(os.getenv('AI_INVITATION_TOKEN_CACHE_SECONDS', 30)),
+    'negative_max_entries': int(os.getenv('AI_INVITATION_TOKEN_NEGATIVE_ENTRIES', 16384)),
+    'negative_ttl': int(os.getenv('AI_INVITATION_TOKEN_NEGATIVE_SECONDS', 300)),
+}
+
+# Outgoing email. Requests only queue messages in the outbox table; `manage.py dispatch_outbox`
+# sends them in batches over one SMTP connection, retrying with backoff and dead-lettering
+# after max_attempts.
+EMAIL_HOST = os.getenv('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.getenv('EMAIL_PORT', 25))
+EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'false').lower() == 'true'
+EMAIL_TIMEOUT = int(os.getenv('EMAIL_TIMEOUT', 30))
+DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'Acharya AI <no-reply@aispirelabs.com>')
+EMAIL_OUTBOX = {
+    'batch_size': int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', 50)),
+    'rate_per_second': float(os.getenv('EMAIL_OUTBOX_RATE', 10)),
+    'max_attempts': int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', 5)),
+    'retry_base_seconds': 30,
+    'retry_max_seconds': 3600,
+    'lease_seconds': 300,
+    'poll_seconds': 5,
+}
+# Links in invitation emails point at the frontend
+FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:3000')
+
+# Interviews returned by the candidate dashboard endpoint (newest first)
+AI_DASHBOARD_INTERVIEWS = int(os.getenv('AI_DASHBOARD_INTERVIEWS', 50))
+# ?stream=true on large lists sends every row, fetched and serialized this many at a time
+AI_STREAM_CHUNK_SIZE = int(os.getenv('AI_STREAM_CHUNK_SIZE', 500))
+
+# Prometheus metrics at /metrics (AI call latency/tokens/fallbacks, request and DB timings).
+# Only staff users and scrapers sending "Authorization: Bearer <METRICS_AUTH_TOKEN>" may read
+# it; METRICS_PUBLIC=true opens it to anyone (e.g. when it is only reachable internally).
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+METRICS_AUTH_TOKEN = os.getenv('METRICS_AUTH_TOKEN') or None
+METRICS_PUBLIC = os.getenv('METRICS_PUBLIC', 'false').lower() == 'true'
+
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = [
     'http://localhost:3000',      # Next.js local development
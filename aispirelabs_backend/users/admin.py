@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import User
+from .models import User, OutboxEmail
 
 # Register your models here.
 class UserAdmin(admin.ModelAdmin):
@@ -8,4 +8,12 @@ class UserAdmin(admin.ModelAdmin):
     list_filter = ('email_verified', 'auth_provider', 'date_joined', 'last_login')
     ordering = ('-date_joined',)
 
-admin.site.register(User, UserAdmin)
\ No newline at end of file
+admin.site.register(User, UserAdmin)
+
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'to_email', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    search_fields = ('to_email', 'subject')
+    list_filter = ('status', 'kind', 'created_at')
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
+
+admin.site.register(OutboxEmail, OutboxEmailAdmin)
\ No newline at end of file
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.outbox import OutboxDispatcher, outbox_config, requeue_dead
+
+
+class Command(BaseCommand):
+    help = (
+        "Send queued emails (password resets, interview invitations) from the outbox table. "
+        "Runs until interrupted unless --once is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Send everything that is due, then exit (for cron).")
+        parser.add_argument('--batch-size', type=int, help="Emails per SMTP connection.")
+        parser.add_argument('--rate', type=float, help="Maximum emails per second.")
+        parser.add_argument('--requeue-dead', action='store_true', help="Retry dead-lettered emails first.")
+
+    def handle(self, *args, **options):
+        config = outbox_config()
+        if options['batch_size']:
+            config['batch_size'] = options['batch_size']
+        if options['rate'] is not None:
+            config['rate_per_second'] = options['rate']
+        if options['requeue_dead']:
+            self.stdout.write(f"Requeued {requeue_dead()} dead email(s)")
+
+        dispatcher = OutboxDispatcher(config)
+        try:
+            while True:
+                counts = dispatcher.dispatch_batch()
+                if counts['claimed']:
+                    self.stdout.write(
+                        f"Sent {counts['sent']}, retrying {counts['retried']}, dead {counts['dead']}, "
+                        f"deferred {counts['deferred']}, released {counts['released']}"
+                    )
+                if counts['claimed'] < config['batch_size'] or counts['deferred']:
+                    # Drained (or the mail server is down): wait before polling again
+                    if options['once']:
+                        break
+                    time.sleep(config['poll_seconds'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS("Outbox dispatcher stopped"))
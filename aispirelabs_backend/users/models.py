@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.utils import timezone
 import uuid
 
 class User(AbstractUser):
@@ -31,5 +32,51 @@ class User(AbstractUser):
     # We can use first_name as the main display name or add a new field 'name'
     # For now, let's assume 'first_name' will be used as 'name' or can be combined with 'last_name'
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # EmailBackend and password reset look users up by email
+            models.Index(fields=['email'], name='user_email_idx'),
+            # Company analytics look up all HR users of a company
+            models.Index(fields=['company', 'user_type'], name='user_company_type_idx'),
+        ]
+
     def __str__(self):
         return self.username
+
+
+class OutboxEmail(models.Model):
+    """
+    An email waiting for the outbox dispatcher (manage.py dispatch_outbox).
+
+    Requests only INSERT a row here, in the same transaction as the change the
+    email announces, and never talk to SMTP themselves.
+    """
+    KIND_CHOICES = (
+        ('password_reset', 'Password reset'),
+        ('interview_invitation', 'Interview invitation'),
+    )
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('dead', 'Dead'),  # Gave up after EMAIL_OUTBOX['max_attempts']
+    )
+
+    kind = models.CharField(max_length=40, choices=KIND_CHOICES)
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # The dispatcher polls for pending rows that are due
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} to {self.to_email} ({self.status})"
@@ -0,0 +1,201 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+
+def outbox_config():
+    config = {
+        'batch_size': 50,
+        'rate_per_second': 10,
+        'max_attempts': 5,
+        'retry_base_seconds': 30,
+        'retry_max_seconds': 3600,
+        'lease_seconds': 300,
+        'poll_seconds': 5,
+    }
+    config.update(getattr(settings, 'EMAIL_OUTBOX', {}))
+    return config
+
+
+def enqueue_email(kind, to_email, subject, body):
+    """
+    Queue one email for the dispatcher: a single INSERT, no SMTP.
+    """
+    return OutboxEmail.objects.create(kind=kind, to_email=to_email, subject=subject, body=body)
+
+
+def enqueue_emails(emails):
+    """
+    Queue unsaved OutboxEmail rows with bulk INSERTs.
+    """
+    return OutboxEmail.objects.bulk_create(emails, batch_size=500)
+
+
+def claim_due(batch_size, lease_seconds):
+    """
+    Take up to `batch_size` due emails and lease them for `lease_seconds`.
+
+    The lease (pushing next_attempt_at forward) keeps other dispatchers off
+    these rows while they are being sent; if this one dies mid-batch, they
+    become due again when it runs out.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True).filter(
+                status='pending', next_attempt_at__lte=now
+            ).order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        if emails:
+            OutboxEmail.objects.filter(id__in=[email.id for email in emails]).update(
+                next_attempt_at=now + timedelta(seconds=lease_seconds)
+            )
+    return emails
+
+
+class RateLimiter:
+    """
+    Space calls at least 1 / per_second seconds apart (no limit when per_second is 0).
+    """
+
+    def __init__(self, per_second, sleep=time.sleep, clock=time.monotonic):
+        self.interval = 1 / per_second if per_second else 0
+        self.sleep = sleep
+        self.clock = clock
+        self.next_at = 0
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = self.clock()
+        if now < self.next_at:
+            self.sleep(self.next_at - now)
+            now = self.next_at
+        self.next_at = now + self.interval
+
+
+class OutboxDispatcher:
+    """
+    Sends queued emails in batches, each batch over one SMTP connection.
+
+    A failed email is retried with exponential backoff and dead-lettered
+    (status 'dead', last_error kept) after max_attempts. When the SMTP server
+    can't be reached at all the batch is put back without using up attempts.
+    A batch that runs close to the end of its lease releases the emails it
+    hasn't sent yet instead of racing another dispatcher for them.
+    """
+
+    def __init__(self, config=None, sleep=time.sleep, clock=time.monotonic):
+        self.config = config or outbox_config()
+        self.clock = clock
+        self.limiter = RateLimiter(self.config['rate_per_second'], sleep=sleep, clock=clock)
+        # Worst case for one email: a send that times out, then a reconnect that times out
+        self.send_margin = 2 * (getattr(settings, 'EMAIL_TIMEOUT', None) or 30)
+        if self.config['lease_seconds'] <= self.send_margin:
+            raise ValueError(
+                f"EMAIL_OUTBOX lease_seconds ({self.config['lease_seconds']}) must be longer than "
+                f"two EMAIL_TIMEOUTs ({self.send_margin}s)"
+            )
+
+    def dispatch_batch(self):
+        """
+        Send one batch of due emails. Returns counts of what happened to them.
+        """
+        counts = {'claimed': 0, 'sent': 0, 'retried': 0, 'dead': 0, 'deferred': 0, 'released': 0}
+        emails = claim_due(self.config['batch_size'], self.config['lease_seconds'])
+        # Stop sending while the lease still covers a worst-case send, so another
+        # dispatcher can't re-claim (and send again) an email this batch is still on
+        stop_at = self.clock() + self.config['lease_seconds'] - self.send_margin
+        counts['claimed'] = len(emails)
+        if not emails:
+            return counts
+
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+        except Exception as e:
+            print(f"WARN: Outbox could not connect to the mail server: {e}")
+            counts['deferred'] = self.defer(emails)
+            return counts
+
+        sent = []
+        try:
+            for index, email in enumerate(emails):
+                self.limiter.wait()
+                if self.clock() >= stop_at:
+                    counts['released'] = self.release(emails[index:])
+                    break
+                try:
+                    connection.send_messages([self.message(email, connection)])
+                except Exception as e:
+                    counts[self.fail(email, e)] += 1
+                    # The session may be unusable after an error; start a fresh one
+                    connection.close()
+                    try:
+                        connection.open()
+                    except Exception as e:
+                        print(f"WARN: Outbox lost the mail server connection: {e}")
+                        counts['deferred'] = self.defer(emails[index + 1:])
+                        break
+                else:
+                    sent.append(email.id)
+        finally:
+            connection.close()
+            if sent:
+                OutboxEmail.objects.filter(id__in=sent).update(status='sent', sent_at=timezone.now(), last_error='')
+        counts['sent'] = len(sent)
+        return counts
+
+    @staticmethod
+    def message(email, connection):
+        return EmailMessage(
+            email.subject, email.body, settings.DEFAULT_FROM_EMAIL, [email.to_email], connection=connection
+        )
+
+    def fail(self, email, error):
+        """
+        Record a failed attempt; returns 'dead' or 'retried'.
+        """
+        email.attempts += 1
+        email.last_error = f"{type(error).__name__}: {error}"[:1000]
+        if email.attempts >= self.config['max_attempts']:
+            email.status = 'dead'
+            print(f"WARN: Outbox email {email.id} to {email.to_email} dead-lettered after {email.attempts} attempts: {email.last_error}")
+        else:
+            delay = min(self.config['retry_base_seconds'] * 2 ** (email.attempts - 1), self.config['retry_max_seconds'])
+            email.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+        email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+        return 'dead' if email.status == 'dead' else 'retried'
+
+    def defer(self, emails):
+        """
+        Put emails back for a later batch without counting an attempt.
+        """
+        if emails:
+            OutboxEmail.objects.filter(id__in=[email.id for email in emails]).update(
+                next_attempt_at=timezone.now() + timedelta(seconds=self.config['retry_base_seconds'])
+            )
+        return len(emails)
+
+    @staticmethod
+    def release(emails):
+        """
+        Hand leased emails that this batch didn't get to back to the next batch.
+        """
+        OutboxEmail.objects.filter(id__in=[email.id for email in emails]).update(next_attempt_at=timezone.now())
+        return len(emails)
+
+
+def requeue_dead():
+    """
+    Give dead-lettered emails a fresh set of attempts. Returns how many.
+    """
+    return OutboxEmail.objects.filter(status='dead').update(
+        status='pending', attempts=0, next_attempt_at=timezone.now()
+    )
@@ -1,8 +1,17 @@
+import socketserver
+import threading
+from datetime import timedelta
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
 from django.contrib.auth import get_user_model
 from users.models import User as CustomUserModel # Assuming this is your user model if get_user_model() is not specific enough
+from users.models import OutboxEmail
+from users.outbox import OutboxDispatcher, RateLimiter, outbox_config
 
 UserModel = get_user_model()
 
@@ -76,3 +85,177 @@ class AuthTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.user.refresh_from_db()
         self.assertEqual(self.user.first_name, 'Updated')
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode('ascii'))
+
+    def handle(self):
+        sink = self.server
+        with sink.lock:
+            sink.connections += 1
+        self.reply('220 sink ESMTP')
+        recipients = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command[:4].upper()
+            if verb == 'EHLO':
+                self.reply('250-sink')
+                self.reply('250 8BITMIME')
+            elif verb == 'RCPT':
+                address = command.split(':', 1)[1].strip().strip('<>')
+                if address in sink.reject:
+                    self.reply('550 Mailbox unavailable')
+                else:
+                    recipients.append(address)
+                    self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = []
+                for line in iter(self.rfile.readline, b''):
+                    if line == b'.\r\n':
+                        break
+                    data.append(line)
+                with sink.lock:
+                    sink.messages.append((list(recipients), b''.join(data)))
+                self.reply('250 OK')
+            elif verb in ('MAIL', 'RSET'):
+                recipients = []
+                self.reply('250 OK')
+            elif verb in ('HELO', 'NOOP'):
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    """
+    A local SMTP server that accepts everything (except `reject` recipients)
+    and records the messages and how many connections were opened.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, reject=()):
+        super().__init__(('127.0.0.1', 0), SMTPSinkHandler)
+        self.reject = set(reject)
+        self.messages = []
+        self.connections = 0
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        self.thread.join()
+
+
+class OutboxTests(TestCase):
+    def setUp(self):
+        self.sink = SMTPSink(reject={'bounce@example.com'})
+        self.addCleanup(self.sink.stop)
+        smtp = override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST='127.0.0.1', EMAIL_PORT=self.sink.server_address[1], EMAIL_USE_TLS=False,
+        )
+        smtp.enable()
+        self.addCleanup(smtp.disable)
+
+    def dispatcher(self, **config):
+        return OutboxDispatcher({**outbox_config(), 'rate_per_second': 0, **config})
+
+    def queue(self, *addresses):
+        return [
+            OutboxEmail.objects.create(kind='interview_invitation', to_email=address, subject='Hi', body='Hello')
+            for address in addresses
+        ]
+
+    def test_password_reset_only_queues_an_email(self):
+        UserModel.objects.create_user(username='resetme', email='resetme@example.com', password='password123')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('password_reset'), {'email': 'resetme@example.com'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        inserts = [q['sql'] for q in queries if q['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 1)
+        self.assertIn('users_outboxemail', inserts[0])
+        self.assertEqual(self.sink.connections, 0)
+
+        self.dispatcher().dispatch_batch()
+        self.assertEqual(self.sink.messages[0][0], ['resetme@example.com'])
+        self.assertIn(b'reset-password', self.sink.messages[0][1])
+
+    def test_batch_is_sent_over_one_connection(self):
+        self.queue(*[f'c{n}@example.com' for n in range(5)])
+        counts = self.dispatcher(batch_size=10).dispatch_batch()
+        self.assertEqual(counts['sent'], 5)
+        self.assertEqual(self.sink.connections, 1)
+        self.assertEqual(len(self.sink.messages), 5)
+        self.assertFalse(OutboxEmail.objects.exclude(status='sent').exists())
+
+    def test_failures_are_retried_then_dead_lettered(self):
+        bounce, ok = self.queue('bounce@example.com', 'ok@example.com')
+        dispatcher = self.dispatcher(max_attempts=2)
+
+        counts = dispatcher.dispatch_batch()
+        self.assertEqual((counts['sent'], counts['retried']), (1, 1))
+        bounce.refresh_from_db()
+        self.assertEqual((bounce.status, bounce.attempts), ('pending', 1))
+        self.assertGreater(bounce.next_attempt_at, timezone.now())
+        self.assertIn('550', bounce.last_error)
+
+        OutboxEmail.objects.filter(id=bounce.id).update(next_attempt_at=timezone.now())
+        self.assertEqual(dispatcher.dispatch_batch()['dead'], 1)
+        bounce.refresh_from_db()
+        self.assertEqual(bounce.status, 'dead')
+
+    def test_unreachable_server_defers_without_using_attempts(self):
+        email, = self.queue('c@example.com')
+        port = self.sink.server_address[1]
+        self.sink.stop()
+        with override_settings(EMAIL_PORT=port):
+            counts = self.dispatcher().dispatch_batch()
+        self.assertEqual(counts['deferred'], 1)
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('pending', 0))
+
+    def test_batch_releases_unsent_emails_before_its_lease_runs_out(self):
+        emails = self.queue(*[f'c{n}@example.com' for n in range(4)])
+        now = [0.0]
+
+        def clock():
+            # 100s pass per email; with a 300s lease and 60s of margin for a
+            # timed-out send and reconnect, only two fit before the batch must stop
+            now[0] += 100
+            return now[0]
+
+        with override_settings(EMAIL_TIMEOUT=30):
+            dispatcher = OutboxDispatcher({**outbox_config(), 'rate_per_second': 0, 'lease_seconds': 300}, clock=clock)
+            counts = dispatcher.dispatch_batch()
+        self.assertEqual((counts['claimed'], counts['sent'], counts['released']), (4, 2, 2))
+        released = OutboxEmail.objects.filter(id__in=[email.id for email in emails[2:]])
+        self.assertTrue(all(email.status == 'pending' and email.next_attempt_at <= timezone.now() for email in released))
+
+    def test_lease_must_outlast_a_worst_case_send(self):
+        with override_settings(EMAIL_TIMEOUT=200), self.assertRaises(ValueError):
+            self.dispatcher(lease_seconds=300)
+
+    def test_rate_limiter_spaces_sends(self):
+        now = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        limiter = RateLimiter(4, sleep=sleep, clock=lambda: now[0])
+        for _ in range(3):
+            limiter.wait()
+        self.assertEqual(sleeps, [0.25, 0.25])
@@ -5,12 +5,12 @@ from rest_framework.views import APIView
 from django.contrib.auth import authenticate, update_session_auth_hash
 from django.contrib.auth.tokens import default_token_generator
 from django.contrib.sites.shortcuts import get_current_site
-from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 from django.conf import settings
 from rest_framework_simplejwt.tokens import RefreshToken
+from .outbox import enqueue_email
 from .serializers import (
     UserSerializer, UserRegistrationSerializer, 
     ChangePasswordSerializer, PasswordResetSerializer,
@@ -139,13 +139,8 @@ class PasswordResetView(APIView):
                 Acharya AI Team
                 '''
                 
-                send_mail(
-                    subject,
-                    message,
-                    settings.DEFAULT_FROM_EMAIL,
-                    [email],
-                    fail_silently=False,
-                )
+                # Sent by the outbox dispatcher (manage.py dispatch_outbox), not on this request
+                enqueue_email('password_reset', email, subject, message)
                 
                 return Response(
                     {'message': 'Password reset email sent'},
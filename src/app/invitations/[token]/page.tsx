@@ -0,0 +1,142 @@
+'use client';
+
+import { useState, useEffect } from 'react';
+import { useParams, useRouter } from 'next/navigation';
+import { useAuth } from '@/lib/hooks/useAuth';
+import { acceptInvitation, getInvitationByToken } from '@/lib/api';
+import { InterviewInvitation } from '@/lib/types';
+import { ROUTES } from '@/lib/constants';
+import {
+  BriefcaseIcon,
+  ClockIcon,
+  EnvelopeIcon
+} from '@heroicons/react/24/outline';
+
+export default function InvitationPage() {
+  const { token } = useParams();
+  const router = useRouter();
+  const { user, isLoading: authLoading } = useAuth();
+  const [invitation, setInvitation] = useState<InterviewInvitation | null>(null);
+  const [loading, setLoading] = useState(true);
+  const [accepting, setAccepting] = useState(false);
+  const [error, setError] = useState('');
+
+  useEffect(() => {
+    if (token) {
+      fetchInvitation();
+    }
+  }, [token]);
+
+  const fetchInvitation = async () => {
+    try {
+      setLoading(true);
+      const data = await getInvitationByToken(token as string);
+      setInvitation(data);
+    } catch (err: any) {
+      setError(err.response?.status === 404 ? 'This invitation link is not valid' : 'Failed to fetch invitation');
+      console.error('Error fetching invitation:', err);
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  const handleAccept = async () => {
+    if (!invitation) return;
+    try {
+      setAccepting(true);
+      setError('');
+      const accepted = await acceptInvitation(invitation.id);
+      router.push(ROUTES.INTERVIEW(accepted.interview));
+    } catch (err: any) {
+      setError(err.response?.data?.error || 'Failed to accept invitation');
+      console.error('Error accepting invitation:', err);
+    } finally {
+      setAccepting(false);
+    }
+  };
+
+  if (loading || authLoading) {
+    return (
+      <div className="min-h-screen bg-gradient-to-br from-slate-900 via-blue-900 to-purple-900 flex items-center justify-center">
+        <div className="text-center">
+          <div className="animate-spin rounded-full h-12 w-12 border-b-2 border-blue-400 mx-auto mb-4"></div>
+          <p className="text-gray-300">Loading invitation...</p>
+        </div>
+      </div>
+    );
+  }
+
+  if (!invitation) {
+    return (
+      <div className="min-h-screen bg-gradient-to-br from-slate-900 via-blue-900 to-purple-900 flex items-center justify-center">
+        <div className="text-center">
+          <p className="text-red-400 text-lg mb-4">{error || 'Invitation not found'}</p>
+          <button
+            onClick={() => router.push(ROUTES.HOME)}
+            className="px-6 py-3 bg-blue-500 text-white rounded-lg hover:bg-blue-600 transition-colors"
+          >
+            Go to Home
+          </button>
+        </div>
+      </div>
+    );
+  }
+
+  const isPending = invitation.status === 'pending';
+
+  return (
+    <div className="min-h-screen bg-gradient-to-br from-slate-900 via-blue-900 to-purple-900 flex items-center justify-center px-4">
+      <div className="w-full max-w-lg bg-white/10 backdrop-blur-md rounded-xl border border-white/20 p-8">
+        <h1 className="text-2xl font-bold text-white mb-2">Interview Invitation</h1>
+        <p className="text-gray-300 mb-6">{invitation.interview_title || invitation.interview_role}</p>
+
+        <div className="space-y-3 text-gray-300 mb-8">
+          <div className="flex items-center gap-3">
+            <BriefcaseIcon className="h-5 w-5 text-blue-400" />
+            <span>{invitation.interview_role}</span>
+          </div>
+          <div className="flex items-center gap-3">
+            <EnvelopeIcon className="h-5 w-5 text-blue-400" />
+            <span>{invitation.candidate_email}</span>
+          </div>
+          <div className="flex items-center gap-3">
+            <ClockIcon className="h-5 w-5 text-blue-400" />
+            <span>Valid until {new Date(invitation.expires_at).toLocaleDateString()}</span>
+          </div>
+        </div>
+
+        {error && <p className="text-red-400 mb-4">{error}</p>}
+
+        {!isPending ? (
+          <p className="text-yellow-400">This invitation is {invitation.status}.</p>
+        ) : !user ? (
+          <div className="space-y-3">
+            <p className="text-gray-300">Sign in or create an account with {invitation.candidate_email} to accept.</p>
+            <div className="flex gap-4">
+              <button
+                onClick={() => router.push(ROUTES.LOGIN)}
+                className="flex-1 px-6 py-3 bg-blue-500 text-white rounded-lg hover:bg-blue-600 transition-colors"
+              >
+                Sign In
+              </button>
+              <button
+                onClick={() => router.push(ROUTES.REGISTER)}
+                className="flex-1 px-6 py-3 bg-white/10 text-white rounded-lg border border-white/20 hover:bg-white/20 transition-colors"
+              >
+                Sign Up
+              </button>
+            </div>
+          </div>
+        ) : (
+          <button
+            onClick={handleAccept}
+            disabled={accepting}
+            className="w-full px-6 py-3 bg-blue-500 text-white rounded-lg hover:bg-blue-600 transition-colors disabled:opacity-50"
+          >
+            {accepting ? 'Accepting...' : 'Accept and Continue'}
+          </button>
+        )}
+      </div>
+    </div>
+  );
+}
@@ -3,9 +3,9 @@
 import { useState, useEffect } from 'react';
 import { useRouter } from 'next/navigation';
 import { useAuth } from '@/lib/hooks/useAuth';
-import { getInterviews } from '@/lib/api';
+import { getDashboard } from '@/lib/api';
 import CreateInterviewModal from './CreateInterviewModal';
-import { Interview } from '@/lib/types';
+import { CandidateDashboardData, DashboardInterview, DashboardInvitation } from '@/lib/types';
 import { ROUTES } from '@/lib/constants';
 import { 
   BookOpenIcon,
@@ -19,7 +19,9 @@ import {
 export default function CandidateDashboard() {
   const { user, logout } = useAuth();
   const router = useRouter();
-  const [interviews, setInterviews] = useState<Interview[]>([]);
+  const [interviews, setInterviews] = useState<DashboardInterview[]>([]);
+  const [invitations, setInvitations] = useState<DashboardInvitation[]>([]);
+  const [summary, setSummary] = useState<CandidateDashboardData['stats'] | null>(null);
   const [loading, setLoading] = useState(true);
   const [showCreateModal, setShowCreateModal] = useState(false);
   const [showAllInterviews, setShowAllInterviews] = useState(false);
@@ -32,8 +34,10 @@ export default function CandidateDashboard() {
   const fetchInterviews = async () => {
     try {
       setLoading(true);
-      const data = await getInterviews();
-      setInterviews(data);
+      const data: CandidateDashboardData = await getDashboard();
+      setInterviews(data.interviews);
+      setInvitations(data.pending_invitations);
+      setSummary(data.stats);
     } catch (err: any) {
       setError('Failed to fetch interviews');
     } finally {
@@ -50,17 +54,12 @@ export default function CandidateDashboard() {
     router.push(ROUTES.INTERVIEW(interviewId));
   };
 
-  const getInterviewStats = () => {
-    const totalInterviews = interviews.length;
-    const totalAttempts = interviews.reduce((sum, interview) => sum + (interview.feedbacks?.length || 0), 0);
-    const avgScore = interviews.reduce((sum, interview) => {
-      const scores = interview.feedbacks?.map(f => f.total_score) || [];
-      const avgInterviewScore = scores.length > 0 ? scores.reduce((a, b) => a + b, 0) / scores.length : 0;
-      return sum + avgInterviewScore;
-    }, 0) / (totalInterviews || 1);
-
-    return { totalInterviews, totalAttempts, avgScore: Math.round(avgScore) };
-  };
+  // Totals come from the server, so they cover interviews beyond the ones listed
+  const getInterviewStats = () => ({
+    totalInterviews: summary?.total_interviews ?? 0,
+    totalAttempts: summary?.total_attempts ?? 0,
+    avgScore: Math.round(summary?.average_score ?? 0),
+  });
 
   const stats = getInterviewStats();
 
@@ -152,6 +151,31 @@ export default function CandidateDashboard() {
           </button>
         </div>
 
+        {/* Pending Invitations */}
+        {invitations.length > 0 && (
+          <div className="bg-white/10 backdrop-blur-md rounded-xl border border-white/20 mb-8">
+            <div className="px-6 py-4 border-b border-white/20">
+              <h3 className="text-xl font-semibold text-white">Pending Invitations</h3>
+            </div>
+            <div className="p-6 grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-4">
+              {invitations.map((invitation) => (
+                <div
+                  key={invitation.id}
+                  onClick={() => router.push(ROUTES.INVITATION(invitation.invitation_token))}
+                  className="bg-white/5 rounded-lg p-4 border border-white/10 hover:bg-white/10 cursor-pointer transition-colors"
+                >
+                  <h4 className="font-semibold text-white truncate">{invitation.interview_title || invitation.interview_role}</h4>
+                  <p className="text-gray-300 text-sm mb-2">{invitation.interview_role}</p>
+                  <div className="flex items-center justify-between text-xs text-gray-400">
+                    <span>{invitation.time_limit} min</span>
+                    <span>Expires {new Date(invitation.expires_at).toLocaleDateString()}</span>
+                  </div>
+                </div>
+              ))}
+            </div>
+          </div>
+        )}
+
         {/* Recent Interviews */}
         <div id="recent-interviews" className="bg-white/10 backdrop-blur-md rounded-xl border border-white/20">
           <div className="px-6 py-4 border-b border-white/20">
@@ -195,7 +219,7 @@ export default function CandidateDashboard() {
                     <p className="text-gray-400 text-xs mb-3">{interview.techstack}</p>
                     
                     <div className="flex items-center justify-between text-xs text-gray-400">
-                      <span>{interview.feedbacks?.length || 0} attempts</span>
+                      <span>{interview.attempts} attempts</span>
                       <span>{new Date(interview.created_at).toLocaleDateString()}</span>
                     </div>
                   </div>
@@ -118,11 +118,18 @@ export const createInterview = async (interviewData: {
   return response.data;
 };
 
-export const getInterviews = async () => {
-  const response = await api.get('/acharya_ai/interviews/');
+// Candidate dashboard: interviews with feedback summaries, stats and pending invitations in one call
+export const getDashboard = async () => {
+  const response = await api.get('/acharya_ai/dashboard/');
   return response.data;
 };
 
+// The interview list is paginated: { count, next, previous, results }
+export const getInterviews = async (page = 1, pageSize = 100) => {
+  const response = await api.get('/acharya_ai/interviews/', { params: { page, page_size: pageSize } });
+  return response.data.results;
+};
+
 export const getInterviewDetail = async (interviewId: string) => {
   const response = await api.get(`/acharya_ai/interviews/${interviewId}/`);
   return response.data;
@@ -158,11 +165,32 @@ export const getInterviewInvitations = async (interviewId: string) => {
   return response.data;
 };
 
+// CSV with one email per row (or an "email" column); returns { rows, created, skipped, invalid, errors }
+export const importInvitationsCsv = async (interviewId: string, file: File) => {
+  const formData = new FormData();
+  formData.append('file', file);
+  const response = await api.post(`/acharya_ai/interviews/${interviewId}/invitations/import/`, formData, {
+    headers: { 'Content-Type': 'multipart/form-data' },
+  });
+  return response.data;
+};
+
 export const acceptInvitation = async (invitationId: string) => {
   const response = await api.post(`/acharya_ai/invitations/${invitationId}/accept/`);
   return response.data;
 };
 
+export const revokeInvitation = async (invitationId: string) => {
+  const response = await api.post(`/acharya_ai/invitations/${invitationId}/revoke/`);
+  return response.data;
+};
+
+// Valid for `days` more days (default: the server's invitation lifetime); reopens an expired invitation
+export const extendInvitation = async (invitationId: string, days?: number) => {
+  const response = await api.post(`/acharya_ai/invitations/${invitationId}/extend/`, days ? { days } : {});
+  return response.data;
+};
+
 export const getInvitationByToken = async (token: string) => {
   const response = await api.get(`/acharya_ai/invitations/${token}/`);
   return response.data;
@@ -13,6 +13,7 @@ export const API_ENDPOINTS = {
     DASHBOARD: '/dashboard',
     HR_DASHBOARD: '/hr/dashboard',
     INTERVIEW: (id: string) => `/interview/${id}`,
+    INVITATION: (token: string) => `/invitations/${token}`,
     PROFILE: '/profile',
   } as const;
   
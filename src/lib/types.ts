@@ -63,7 +63,7 @@ export interface User {
     interview_role?: string;
     candidate_email: string;
     candidate?: string;
-    status: 'pending' | 'accepted' | 'completed' | 'expired';
+    status: 'pending' | 'accepted' | 'completed' | 'expired' | 'revoked';
     attempts_used: number;
     invitation_token: string;
     expires_at: string;
@@ -103,6 +103,51 @@ export interface User {
     content: string;
   }
   
+  // Candidate dashboard types (GET /acharya_ai/dashboard/)
+  export interface FeedbackSummary {
+    id: string;
+    status: 'pending' | 'completed' | 'failed';
+    total_score: number | null;
+    created_at: string;
+  }
+
+  export interface DashboardInterview {
+    id: string;
+    title?: string;
+    role: string;
+    type: 'technical' | 'behavioral' | 'mixed';
+    level: 'entry' | 'mid' | 'senior' | 'lead';
+    techstack: string[];
+    finalized: boolean;
+    cover_image?: string;
+    created_at: string;
+    attempts: number;
+    average_score: number | null;
+    latest_feedback: FeedbackSummary | null;
+  }
+
+  export interface DashboardInvitation {
+    id: string;
+    interview: string;
+    interview_title?: string;
+    interview_role?: string;
+    status: 'pending';
+    expires_at: string;
+    created_at: string;
+    invitation_token: string;
+    time_limit: number;
+  }
+
+  export interface CandidateDashboardData {
+    interviews: DashboardInterview[];
+    stats: {
+      total_interviews: number;
+      total_attempts: number;
+      average_score: number | null;
+    };
+    pending_invitations: DashboardInvitation[];
+  }
+
   // HR Analytics types
   export interface HRAnalytics {
     total_interviews: number;